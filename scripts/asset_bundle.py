@@ -0,0 +1,261 @@
+import argparse
+import mmap
+import os
+import struct
+import zlib
+
+from asset_file import AssetFile
+
+""" ---------------------------------------------------------------
+    AssetBundle Class
+
+    Packs the images, fonts, audio and data folders into a single
+    indexed file. At launch the bundle is memory mapped, and every
+    asset is loaded by its url straight out of the memory map.
+    When there is no bundle, as while developing, the assets are
+    loaded from the loose files instead.
+--------------------------------------------------------------- """
+class AssetBundle():
+	# The first bytes of every bundle file and the version of its layout.
+	file_magic = b"TTAB"
+	file_version = 1
+
+	# The header of the bundle: the magic, the version and the number of assets.
+	header_format = "<4sII"
+
+	# The index entry of every asset: the length of its name, its offset, its size
+	# and its crc32. The name follows the entry.
+	entry_format = "<HQQI"
+
+	def __init__(self, bundle_url, root_url):
+		#initialize the bundle file, the game folder the asset urls are relative to and the index
+		self.bundle_url = bundle_url
+		self.root_url = root_url
+		self.bundle_file = None
+		self.bundle_map = None
+		self.bundle_view = None
+		self.entries = {}
+
+	def open(self):
+		#Memory map the bundle and read its index. Returns False if there is no usable bundle,
+		#in which case the loose files are used
+		if not os.path.isfile(self.bundle_url):
+			return False
+
+		try:
+			self.bundle_file = open(self.bundle_url, "rb")
+			self.bundle_map = mmap.mmap(self.bundle_file.fileno(), 0, access = mmap.ACCESS_READ)
+			self.bundle_view = memoryview(self.bundle_map)
+			self.read_index()
+		except (OSError, ValueError, struct.error):
+			self.close()
+			return False
+
+		return True
+
+	def read_index(self):
+		#Read the offset, size and crc32 of every asset from the start of the bundle
+		magic, version, entry_count = struct.unpack_from(self.header_format, self.bundle_map, 0)
+
+		if magic != self.file_magic or version != self.file_version:
+			raise ValueError("Not an asset bundle: " + self.bundle_url)
+
+		position = struct.calcsize(self.header_format)
+		entry_size = struct.calcsize(self.entry_format)
+
+		for index in range(0, entry_count):
+			name_length, offset, size, crc = struct.unpack_from(self.entry_format, \
+					self.bundle_map, position)
+			position += entry_size
+			asset_name = bytes(self.bundle_view[position:position + name_length]).decode("utf-8")
+			position += name_length
+
+			if offset + size > len(self.bundle_map):
+				raise ValueError("Asset past the end of the bundle: " + asset_name)
+
+			self.entries[asset_name] = (offset, size, crc)
+
+	def close(self):
+		#Release the memory map and the bundle file. The loose files are used afterwards
+		self.entries = {}
+
+		if self.bundle_view is not None:
+			self.bundle_view.release()
+			self.bundle_view = None
+		if self.bundle_map is not None:
+			self.bundle_map.close()
+			self.bundle_map = None
+		if self.bundle_file is not None:
+			self.bundle_file.close()
+			self.bundle_file = None
+
+	def is_open(self):
+		#Check if the assets are loaded from the bundle
+		return self.bundle_map is not None
+
+	def get_asset_name(self, asset_url):
+		#Get the name of an asset in the bundle, which is its url relative to the game folder
+		return os.path.relpath(asset_url, self.root_url).replace(os.sep, "/")
+
+	def get_asset_view(self, asset_url):
+		#Get the bytes of a bundled asset as a view into the memory map, without copying them
+		#Returns None if the asset is not in the bundle
+		entry = self.entries.get(self.get_asset_name(asset_url))
+
+		if entry is None:
+			return None
+
+		return self.bundle_view[entry[0]:entry[0] + entry[1]]
+
+	def get_asset_source(self, asset_url):
+		#Get what pygame loads the asset from: a file over the memory map if the asset is bundled,
+		#or else the url of the loose file
+		asset_view = self.get_asset_view(asset_url)
+
+		if asset_view is None:
+			return asset_url
+
+		return AssetFile(asset_view, os.path.basename(asset_url))
+
+	def read_asset(self, asset_url):
+		#Read all the bytes of an asset
+		asset_view = self.get_asset_view(asset_url)
+
+		if asset_view is not None:
+			return bytes(asset_view)
+
+		with open(asset_url, "rb") as in_file:
+			return in_file.read()
+
+	def get_asset_stamp(self, asset_url):
+		#Get a text that changes whenever the asset changes: the size and crc32 of a bundled asset,
+		#or the size and modification time of a loose file
+		entry = self.entries.get(self.get_asset_name(asset_url))
+
+		if entry is not None:
+			return str(entry[1]) + " " + str(entry[2])
+
+		file_stat = os.stat(asset_url)
+
+		return str(file_stat.st_size) + " " + str(file_stat.st_mtime_ns)
+
+	@staticmethod
+	def build(bundle_url, root_url, folder_names, excluded_names):
+		#Pack every file of the folders into a new bundle. Returns the number of assets packed
+		#The excluded names are folders and files that must stay loose, like the cache
+		asset_names = []
+
+		for folder_name in folder_names:
+			for folder_url, child_folder_names, file_names in \
+					os.walk(os.path.join(root_url, folder_name)):
+				child_folder_names[:] = sorted(child_folder_name for child_folder_name in \
+						child_folder_names if os.path.relpath(os.path.join(folder_url, \
+						child_folder_name), root_url).replace(os.sep, "/") not in excluded_names)
+
+				for file_name in sorted(file_names):
+					asset_name = os.path.relpath(os.path.join(folder_url, file_name), \
+							root_url).replace(os.sep, "/")
+
+					if asset_name not in excluded_names:
+						asset_names.append(asset_name)
+
+		asset_datas = []
+
+		for asset_name in asset_names:
+			with open(os.path.join(root_url, asset_name), "rb") as in_file:
+				asset_datas.append(in_file.read())
+
+		#The assets follow the header and the index
+		index_size = struct.calcsize(AssetBundle.header_format)
+
+		for asset_name in asset_names:
+			index_size += struct.calcsize(AssetBundle.entry_format) + \
+					len(asset_name.encode("utf-8"))
+
+		temp_url = bundle_url + ".tmp"
+
+		with open(temp_url, "wb") as out_file:
+			out_file.write(struct.pack(AssetBundle.header_format, AssetBundle.file_magic, \
+					AssetBundle.file_version, len(asset_names)))
+
+			offset = index_size
+
+			for asset_name, asset_data in zip(asset_names, asset_datas):
+				encoded_name = asset_name.encode("utf-8")
+				out_file.write(struct.pack(AssetBundle.entry_format, len(encoded_name), \
+						offset, len(asset_data), zlib.crc32(asset_data)))
+				out_file.write(encoded_name)
+				offset += len(asset_data)
+
+			for asset_data in asset_datas:
+				out_file.write(asset_data)
+
+		os.replace(temp_url, bundle_url)
+
+		return len(asset_names)
+
+""" --------------------------------------------------
+    Initialize each AssetBundle object with:
+        - the url of the bundle file.
+	- the url of the game folder. The names of the assets
+	      are their urls relative to it, like images/block_red.png.
+	- the open bundle file.
+	- the memory map of the bundle file.
+	- a view of the memory map, sliced for every asset.
+	- the offset, size and crc32 of every asset.
+	      Keys are the asset names.
+-----------------------------------------------------
+    AssetBundle()::open()
+
+    Memory map the bundle and read its index.
+    Returns False if there is no usable bundle, in which
+    case the assets are loaded from the loose files.
+-----------------------------------------------------
+    AssetBundle()::read_index()
+
+    Read the offset, size and crc32 of every asset.
+-----------------------------------------------------
+    AssetBundle()::close()
+
+    Release the memory map and the bundle file.
+-----------------------------------------------------
+    AssetBundle()::is_open()
+
+    Check if the assets are loaded from the bundle.
+-----------------------------------------------------
+    AssetBundle()::get_asset_name()
+
+    Get the name of an asset in the bundle from its url.
+-----------------------------------------------------
+    AssetBundle()::get_asset_view()
+
+    Get the bytes of a bundled asset as a view into the
+    memory map. Returns None if the asset is not bundled.
+-----------------------------------------------------
+    AssetBundle()::get_asset_source()
+
+    Get what pygame loads the asset from: a file over the
+    memory map, or the url of the loose file.
+-----------------------------------------------------
+    AssetBundle()::read_asset()
+
+    Read all the bytes of an asset.
+-----------------------------------------------------
+    AssetBundle()::get_asset_stamp()
+
+    Get a text that changes whenever the asset changes.
+-----------------------------------------------------
+    AssetBundle()::build()
+
+    Pack every file of the folders into a new bundle,
+    leaving out the excluded folders and files.
+-------------------------------------------------- """
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Packs the game assets into a single bundle.")
+	parser.add_argument("--output", default = "../assets.bundle")
+	arguments = parser.parse_args()
+
+	asset_count = AssetBundle.build(arguments.output, "../", \
+			["images", "fonts", "audio", "data"], ["data/cache", "data/high_score.txt"])
+
+	print(str(asset_count) + " assets packed into " + arguments.output)
@@ -0,0 +1,48 @@
+import io
+
+"""A read only file over the bytes of a single asset of the asset bundle. Reading copies straight out of the memory map of the bundle, so pygame can load the asset without the whole asset being copied first."""
+class AssetFile(io.RawIOBase):
+	def __init__(self, asset_view, asset_name):
+		"""Initialized the asset file."""
+		super(AssetFile, self).__init__()
+
+		# The bytes of the asset. A view into the memory map of the asset bundle.
+		self.asset_view = asset_view
+
+		# The name of the asset, so pygame can tell the file type.
+		self.name = asset_name
+
+		# The current read position.
+		self.position = 0
+
+	def readable(self):
+		return True
+
+	def seekable(self):
+		return True
+
+	def readinto(self, buffer):
+		"""Copies the next bytes of the asset into the buffer. Returns the number of bytes copied."""
+		read_size = max(0, min(len(buffer), len(self.asset_view) - self.position))
+		buffer[0:read_size] = self.asset_view[self.position:self.position + read_size]
+		self.position += read_size
+
+		return read_size
+
+	def seek(self, offset, whence = io.SEEK_SET):
+		"""Moves the read position and returns it."""
+		if whence == io.SEEK_SET:
+			self.position = offset
+		elif whence == io.SEEK_CUR:
+			self.position += offset
+		elif whence == io.SEEK_END:
+			self.position = len(self.asset_view) + offset
+		else:
+			raise ValueError("Invalid whence: " + str(whence))
+
+		self.position = max(0, self.position)
+
+		return self.position
+
+	def tell(self):
+		return self.position
@@ -0,0 +1,97 @@
+import concurrent.futures
+import time
+
+""" ---------------------------------------------------------------
+    AssetLoader Class
+
+    Loads assets on a worker thread while the game keeps running.
+    Every asset is loaded by a function, and a future tells when
+    the asset is ready. The game only waits for an asset at the
+    moment it is needed.
+--------------------------------------------------------------- """
+class AssetLoader():
+	def __init__(self):
+		#initialize the worker thread, the futures and the load times of the assets
+		self.executor = None
+		self.futures = {}
+		self.load_times = {}
+
+	def load(self, asset_name, load_function, *args):
+		#Load an asset on the worker thread. Returns the future of the asset
+		if self.executor is None:
+			self.executor = concurrent.futures.ThreadPoolExecutor(1, "asset_loader")
+
+		future = self.executor.submit(self.run_load_function, asset_name, load_function, args)
+		self.futures[asset_name] = future
+
+		return future
+
+	def run_load_function(self, asset_name, load_function, args):
+		#Run the load function of an asset on the worker thread and remember how long it took
+		start_time = time.perf_counter()
+		asset = load_function(*args)
+		self.load_times[asset_name] = time.perf_counter() - start_time
+
+		return asset
+
+	def is_ready(self, asset_name):
+		#Check if an asset has finished loading
+		future = self.futures.get(asset_name)
+
+		return future is not None and future.done()
+
+	def get(self, asset_name):
+		#Get a loaded asset, waiting for it if it is still loading
+		#An error raised while loading the asset is raised again here
+		return self.futures[asset_name].result()
+
+	def pop_all(self):
+		#Wait for every asset, then forget the futures. Returns the loaded assets by name
+		assets = {}
+
+		for asset_name in self.futures:
+			assets[asset_name] = self.futures[asset_name].result()
+
+		self.futures = {}
+
+		return assets
+
+	def shutdown(self):
+		#Stop the worker thread once the assets already asked for are loaded
+		if self.executor is not None:
+			self.executor.shutdown(True)
+			self.executor = None
+
+""" --------------------------------------------------
+    Initialize each AssetLoader object with:
+        - the worker thread. It is started with the first asset.
+	- the future of every asset. Keys are the asset names.
+	- the time taken to load every asset, in seconds.
+-----------------------------------------------------
+    AssetLoader()::load()
+
+    Load an asset on the worker thread with a load function.
+    Returns the future of the asset.
+-----------------------------------------------------
+    AssetLoader()::run_load_function()
+
+    Run the load function of an asset on the worker
+    thread and remember how long it took.
+-----------------------------------------------------
+    AssetLoader()::is_ready()
+
+    Check if an asset has finished loading.
+-----------------------------------------------------
+    AssetLoader()::get()
+
+    Get a loaded asset, waiting for it if needed.
+-----------------------------------------------------
+    AssetLoader()::pop_all()
+
+    Wait for every asset and forget the futures.
+    Returns the loaded assets by name.
+-----------------------------------------------------
+    AssetLoader()::shutdown()
+
+    Stop the worker thread.
+-------------------------------------------------- """
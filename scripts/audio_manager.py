@@ -0,0 +1,170 @@
+import io
+
+import pygame
+
+""" ---------------------------------------------------------------
+    AudioManager Class
+
+    Plays the sound effects and the background music with the
+    pygame mixer. The game logic asks the settings to play a
+    sound by name, so it runs without a mixer when there is no
+    audio manager.
+    The sounds and the music can be decoded on the worker thread
+    of the asset loader and handed to the audio manager once
+    ready. A sound that is not loaded yet is not played.
+    The sounds triggered by the game logic are queued and played
+    once per frame, at most one for every channel. The music
+    stays loaded across games, so starting a new game only
+    restarts it.
+--------------------------------------------------------------- """
+class AudioManager():
+	# The file names of the sound effects. Keys are the sound names.
+	sound_file_names = {
+		"hit_floor": "hit_floor.ogg",
+		"rotate": "rotate.ogg",
+		"tetris": "tetris.ogg",
+	}
+
+	def __init__(self, audio_folder_url, asset_bundle):
+		#initialize the audio folder, the asset bundle, the channels and the sound effects
+		self.audio_folder_url = audio_folder_url
+		self.asset_bundle = asset_bundle
+		self.channels = []
+		self.sounds = {}
+		self.music_datas = {}
+		self.music_source = None
+		self.loaded_music_file_name = None
+		self.queued_sounds = {}
+
+	def init(self):
+		#Initialize the sound mixer and the sound channels
+		pygame.mixer.init(44100, -16, 1, 512)
+
+		for channel_index in range(0, 3):
+			self.channels.append(pygame.mixer.Channel(channel_index))
+
+	def load_sounds(self):
+		#Load every sound effect from the audio folder that is not decoded yet
+		for sound_name in self.sound_file_names:
+			if sound_name not in self.sounds:
+				self.load_sound(sound_name, self.sound_file_names[sound_name])
+
+	def load_sound(self, sound_name, sound_file_name):
+		#Load a single sound effect from the audio folder
+		self.sounds[sound_name] = self.decode_sound(sound_file_name)
+
+	def decode_sound(self, sound_file_name):
+		#Decode a sound effect from the audio folder and return it. Safe to call on a worker thread
+		return pygame.mixer.Sound(self.asset_bundle.get_asset_source( \
+				self.audio_folder_url + sound_file_name))
+
+	def read_music(self, music_file_name):
+		#Read the bytes of a music file so it can be played without reading the disk
+		#Safe to call on a worker thread
+		return self.asset_bundle.read_asset(self.audio_folder_url + music_file_name)
+
+	def play_sound(self, channel_index, sound_name):
+		#Play a sound effect on a channel, stopping the sound already playing on it
+		sound = self.sounds.get(sound_name)
+
+		if sound is not None:
+			self.channels[channel_index].play(sound, False)
+
+	def queue_sound(self, channel_index, sound_name):
+		#Queue a sound effect to be played on a channel with the next queued sounds
+		#A later sound for the same channel replaces the earlier one, as playing it would
+		self.queued_sounds[channel_index] = sound_name
+
+	def play_queued_sounds(self):
+		#Play the sound effects queued since the last call, one for every channel
+		if self.queued_sounds:
+			for channel_index in self.queued_sounds:
+				self.play_sound(channel_index, self.queued_sounds[channel_index])
+
+			self.queued_sounds.clear()
+
+	def play_music(self, music_file_name, loops):
+		#Play the background music from the start
+		#The music is only loaded if other music is loaded, from memory if it was read already
+		#The music is streamed while it plays, so the source is kept
+		if self.loaded_music_file_name != music_file_name:
+			music_data = self.music_datas.get(music_file_name)
+
+			if music_data is not None:
+				self.music_source = io.BytesIO(music_data)
+			else:
+				self.music_source = self.asset_bundle.get_asset_source( \
+						self.audio_folder_url + music_file_name)
+
+			pygame.mixer.music.load(self.music_source, music_file_name)
+			self.loaded_music_file_name = music_file_name
+
+		pygame.mixer.music.play(loops, 0.0)
+
+	def stop_music(self):
+		#Stop the background music
+		pygame.mixer.music.stop()
+
+""" --------------------------------------------------
+    Initialize each AudioManager object with:
+        - the url of the audio folder.
+	- the asset bundle the sounds and the music are loaded from.
+	- the sound channels.
+	      0 - the landing sound.
+	      1 - the rotate and save sound.
+	      2 - the line clear sound.
+	- the sound effects. Keys are the sound names.
+	- the bytes of the music files read already.
+	      Keys are the music file names.
+	- the source the background music is streamed from.
+	- the file name of the music loaded in the mixer.
+	- the sound effects queued for the next frame.
+	      Keys are the channel indexes.
+-----------------------------------------------------
+    AudioManager()::init()
+
+    Initialize the sound mixer and the sound channels.
+-----------------------------------------------------
+    AudioManager()::load_sounds()
+
+    Load all the sound effects not decoded yet.
+-----------------------------------------------------
+    AudioManager()::load_sound()
+
+    Load a single sound effect from the audio folder.
+-----------------------------------------------------
+    AudioManager()::decode_sound()
+
+    Decode a sound effect and return it.
+    Safe to call on a worker thread.
+-----------------------------------------------------
+    AudioManager()::read_music()
+
+    Read the bytes of a music file.
+    Safe to call on a worker thread.
+-----------------------------------------------------
+    AudioManager()::play_sound()
+
+    Play a sound effect on a channel.
+    A sound that is not loaded yet is not played.
+-----------------------------------------------------
+    AudioManager()::queue_sound()
+
+    Queue a sound effect to be played on a channel
+    with the next queued sounds.
+-----------------------------------------------------
+    AudioManager()::play_queued_sounds()
+
+    Play the sound effects queued since the last call,
+    one for every channel.
+-----------------------------------------------------
+    AudioManager()::play_music()
+
+    Play the background music from the start. It is
+    only loaded if other music is loaded, from memory
+    if the music file was read already.
+-----------------------------------------------------
+    AudioManager()::stop_music()
+
+    Stop the background music.
+-------------------------------------------------- """
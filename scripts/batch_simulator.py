@@ -0,0 +1,177 @@
+import argparse
+import json
+import multiprocessing
+import time
+
+from bot_input import BotInput
+from game_simulation import GameSimulation
+from random_input import RandomInput
+
+""" ---------------------------------------------------------------
+    BatchSimulator Class
+
+    Plays many games of the headless game simulation in a pool
+    of processes. Every game has its own seed for the tetronimos
+    and the random input, so any game can be played again
+    exactly. The stats of every game are collected by column.
+--------------------------------------------------------------- """
+class BatchSimulator():
+	# The names of the input sources that can play the games.
+	input_source_names = ("bot", "random")
+
+	# The names of the stats collected for every game.
+	column_names = ["seed", "score", "rows_cleared", "pieces_placed", "tick_count", \
+			"is_game_over", "ticks_per_second"]
+
+	def __init__(self, game_count, base_seed, process_count, max_tick_count, \
+			input_source_name):
+		#initialize the games to play, the pool size and the collected stats
+		self.game_count = game_count
+		self.base_seed = base_seed
+		self.process_count = process_count
+		self.max_tick_count = max_tick_count
+		self.input_source_name = input_source_name
+		self.columns = {}
+		self.total_time = 0.0
+
+		for column_name in self.column_names:
+			self.columns[column_name] = []
+
+	@staticmethod
+	def create_input_source(input_source_name, seed):
+		#Create the input source of a game. The random input is seeded by the game, and the bot
+		#never picks at random
+		if input_source_name == "bot":
+			return BotInput()
+
+		return RandomInput(seed)
+
+	@staticmethod
+	def simulate_games(seeds, max_tick_count, input_source_name):
+		#Play a chunk of games in a worker process and return the stats of every game
+		#A single game simulation is reused for every game of the chunk
+		simulation = GameSimulation()
+		rows = []
+
+		for seed in seeds:
+			input_source = BatchSimulator.create_input_source(input_source_name, seed)
+			simulation.start_game(seed)
+			start_time = time.perf_counter()
+
+			while not simulation.is_game_over and \
+					simulation.tick_count < max_tick_count:
+				input_source.update(simulation)
+				simulation.step(simulation.tick_period)
+
+			game_time = time.perf_counter() - start_time
+			settings = simulation.settings
+
+			rows.append((seed, settings.score, settings.rows_cleared, \
+					settings.pieces_placed, simulation.tick_count, \
+					simulation.is_game_over, simulation.tick_count / max(game_time, 1e-9)))
+
+		return rows
+
+	def run(self):
+		#Play every game in the process pool and collect the stats by column
+		seeds = list(range(self.base_seed, self.base_seed + self.game_count))
+
+		#Send the games in chunks so each process gets several chunks to balance the load
+		chunk_size = max(1, self.game_count // (self.process_count * 8))
+		chunks = []
+
+		for index in range(0, self.game_count, chunk_size):
+			chunks.append((seeds[index:index + chunk_size], self.max_tick_count, \
+					self.input_source_name))
+
+		start_time = time.perf_counter()
+
+		if self.process_count > 1:
+			with multiprocessing.Pool(self.process_count) as pool:
+				results = pool.starmap(BatchSimulator.simulate_games, chunks)
+		else:
+			results = [BatchSimulator.simulate_games(*chunk) for chunk in chunks]
+
+		self.total_time = time.perf_counter() - start_time
+
+		for rows in results:
+			for row in rows:
+				for column_index in range(0, len(self.column_names)):
+					self.columns[self.column_names[column_index]].append(row[column_index])
+
+		return self.columns
+
+	def get_total_tick_count(self):
+		#Get the number of frames played by every game
+		return sum(self.columns["tick_count"])
+
+	def save(self, file_url):
+		#Write the stats to a json file, one list for every column
+		results = {
+			"game_count": self.game_count,
+			"process_count": self.process_count,
+			"input_source": self.input_source_name,
+			"total_time": self.total_time,
+			"columns": self.columns,
+		}
+
+		with open(file_url, "w") as results_file:
+			json.dump(results, results_file)
+
+""" --------------------------------------------------
+    Initialize each BatchSimulator object with:
+        - the number of games to play.
+	- the seed of the first game. The games use the
+	      seeds that follow it.
+	- the number of processes of the pool.
+	- the maximum number of frames of a game.
+	- the name of the input source that plays the games.
+	- the stats of the games. Keys are the column names.
+	- the time taken to play every game, in seconds.
+-----------------------------------------------------
+    BatchSimulator()::create_input_source()
+
+    Create the input source of a game by its name. The
+    random input is seeded by the game.
+-----------------------------------------------------
+    BatchSimulator()::simulate_games()
+
+    Play a chunk of games in a worker process.
+    Returns the stats of every game as a row.
+-----------------------------------------------------
+    BatchSimulator()::run()
+
+    Split the seeds into chunks and play them in the
+    process pool. Then collect the stats by column.
+-----------------------------------------------------
+    BatchSimulator()::get_total_tick_count()
+
+    Get the number of frames played by every game.
+-----------------------------------------------------
+    BatchSimulator()::save()
+
+    Write the stats to a json file, one list for every column.
+-------------------------------------------------- """
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Plays many headless games at once.")
+	parser.add_argument("--games", type = int, default = 1000)
+	parser.add_argument("--seed", type = int, default = 0)
+	parser.add_argument("--processes", type = int, default = multiprocessing.cpu_count())
+	parser.add_argument("--max-ticks", type = int, default = 100000)
+	parser.add_argument("--input", default = "random", \
+			choices = BatchSimulator.input_source_names)
+	parser.add_argument("--output", default = "batch_results.json")
+	arguments = parser.parse_args()
+
+	batch_simulator = BatchSimulator(arguments.games, arguments.seed, \
+			arguments.processes, arguments.max_ticks, arguments.input)
+	batch_simulator.run()
+	batch_simulator.save(arguments.output)
+
+	total_tick_count = batch_simulator.get_total_tick_count()
+
+	print(str(arguments.games) + " games, " + str(total_tick_count) + " frames in " + \
+			"{:.2f}".format(batch_simulator.total_time) + " seconds with " + \
+			str(arguments.processes) + " processes")
+	print("{:.0f}".format(total_tick_count / batch_simulator.total_time) + \
+			" frames per second")
@@ -0,0 +1,880 @@
+"""Benchmarks of the game systems. Run from the scripts folder with the names of the benchmarks to run, or with no names to run every benchmark:
+
+	python benchmark.py [fixed_tick] [line_clear] [headless] [pool] [sprite_memory] [slots] [blit] [startup] [game_start] [hard_drop] [bot] [replay] [replay_seek] [snapshot] [perf_hud]
+"""
+import gc
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from asset_bundle import AssetBundle
+from bot_input import BotInput
+from game_simulation import GameSimulation
+from object_factory import ObjectFactory
+from placement_search import PlacementSearch
+from replay import Replay
+from sprite_atlas import SpriteAtlas
+from sprite_image import SpriteImage
+from tetronimo_board import TetronimoBoard
+
+class BenchmarkBlock():
+	def __init__(self, position_x, position_y):
+		"""A landed block with only the fields the board and the line clear use."""
+		self.position_x = position_x
+		self.position_y = position_y
+		self.is_active = True
+		self.block_state = 1
+		self.marked_for_deletion = False
+
+	def mark_for_deletion(self):
+		self.marked_for_deletion = True
+
+class DictObject():
+	"""An object with an attribute dictionary, the layout every game object had before the slots."""
+	pass
+
+def copy_to_dict_object(game_object):
+	"""Copies the slots of a game object into the attribute dictionary of a new object."""
+	dict_object = DictObject()
+
+	for cur_class in type(game_object).__mro__:
+		for name in getattr(cur_class, "__slots__", ()):
+			setattr(dict_object, name, getattr(game_object, name))
+
+	return dict_object
+
+def fill_board(board, blocks):
+	"""Fills the bottom 4 rows of the board and every other row but one cell, like a board just before a 4 line clear."""
+	for row in range(0, board.row_count):
+		position_y = board.get_position_y(row)
+
+		for column in range(0, board.column_count):
+			if row < board.row_count - 4 and column == row % board.column_count:
+				continue
+
+			position_x = board.origin_x + column * board.cell_size + board.cell_size // 2
+			block = BenchmarkBlock(position_x, position_y)
+			blocks.append(block)
+			board.occupy(position_x, position_y, block)
+
+def clear_lines_by_scanning(blocks):
+	"""The line clear done by going through every block: count the blocks of every row, then move every block above each full row down."""
+	row_counts = {}
+	row_objs = {}
+
+	for block in blocks:
+		if block.is_active and block.block_state == 1:
+			row_counts[block.position_y] = row_counts.get(block.position_y, 0) + 1
+			row_objs.setdefault(block.position_y, []).append(block)
+
+	for key in sorted(row_counts):
+		if row_counts[key] == 10:
+			for block in row_objs[key]:
+				block.mark_for_deletion()
+
+			for block in blocks:
+				if block.is_active and block.block_state == 1 and block.position_y <= key:
+					block.position_y += 32
+
+def clear_lines_on_board(board):
+	"""The line clear done with the board: the full rows are already known and the rows are collapsed in one pass."""
+	for block in board.collapse_full_rows():
+		block.mark_for_deletion()
+
+def benchmark_fixed_tick(frame_count = 6000):
+	"""Plays a game driven like the main loop with 16 ms frames, a little faster than the 60 Hz tick, so some frames run no tick. Checks with real key events that a hold tapped on a frame without a tick is applied on the next tick, whether the key is released on the same frame or on the next one. Then shows how many ticks the frames ran."""
+	import pygame
+
+	os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+	pygame.display.init()
+
+	from input_manager import InputManager
+
+	input_manager = InputManager(None)
+	simulation = GameSimulation(input_manager)
+
+	def run_frame(events, expected_tick_count):
+		# Post the key events of a frame, read them like the main loop does, then run the ticks.
+		for event_type in events:
+			pygame.event.post(pygame.event.Event(event_type, key = pygame.K_c, mod = 0, \
+					unicode = "c", scancode = 0))
+
+		input_manager.check_events()
+
+		assert simulation.advance(16.0) == expected_tick_count
+
+	for name, frame_events in (("released on the same frame", ((pygame.KEYDOWN, pygame.KEYUP), ())), \
+			("released on the next frame", ((pygame.KEYDOWN,), (pygame.KEYUP,)))):
+		# Run ticks until the first tetronimo is falling, with no time left over, so the next
+		# 16 ms frame runs no tick and the one after runs one.
+		simulation.start_game(0)
+		pygame.event.clear()
+
+		while simulation.settings.tetronimo_assembly_state != 0:
+			simulation.advance(simulation.tick_period)
+
+		run_frame(frame_events[0], 0)
+
+		assert simulation.settings.cached_tetronimo_falling is None, name
+
+		run_frame(frame_events[1], 1)
+
+		assert simulation.settings.cached_tetronimo_falling is not None, name
+		assert not input_manager.tapped_c and not input_manager.pressed_c, name
+
+	pygame.display.quit()
+
+	simulation.start_game(0)
+	input_manager.autoplay_input = BotInput()
+	frame_tick_counts = [0, 0, 0]
+	start_time = time.perf_counter()
+
+	for frame in range(0, frame_count):
+		frame_tick_counts[min(2, simulation.advance(16.0))] += 1
+
+	total_time = time.perf_counter() - start_time
+	input_manager.autoplay_input = None
+
+	print("fixed_tick: " + str(frame_count) + " frames of 16 ms played by the bot, hold tapped on " + \
+			"a frame without a tick is applied")
+
+	for name, count in zip(("no tick", "1 tick", "2 or more ticks"), frame_tick_counts):
+		print("  {:<20} {:>9d}".format(name, count))
+
+	print("  {:<20} {:>9.1f} us".format("mean frame", total_time / frame_count * 1000000.0))
+
+	return frame_tick_counts
+
+def benchmark_line_clear(repeat = 2000):
+	"""Times a 4 line clear on a full 10 by 24 board."""
+	setups = []
+
+	def setup():
+		board = TetronimoBoard(10, 24, 160, 16, 32)
+		blocks = []
+		fill_board(board, blocks)
+		setups.append((board, blocks))
+
+	def run_scanning():
+		board, blocks = setups.pop()
+		clear_lines_by_scanning(blocks)
+
+	def run_board():
+		board, blocks = setups.pop()
+		clear_lines_on_board(board)
+
+	# Check that both line clears leave the same blocks in the same place.
+	setup()
+	setup()
+	board, blocks = setups.pop()
+	clear_lines_by_scanning(blocks)
+	board_2, blocks_2 = setups.pop()
+	clear_lines_on_board(board_2)
+
+	assert [block.position_y for block in blocks if not block.marked_for_deletion] == \
+			[block.position_y for block in blocks_2 if not block.marked_for_deletion]
+
+	results = {}
+
+	for name, run in (("scan every block", run_scanning), ("board collapse", run_board)):
+		total_time = 0.0
+
+		for index in range(0, repeat):
+			setup()
+			total_time += timeit.timeit(run, number = 1)
+
+		results[name] = total_time / repeat
+
+	print("line_clear: 4 line clear on a full 10x24 board, " + str(repeat) + " runs")
+
+	for name in results:
+		print("  {:<20} {:>9.2f} us".format(name, results[name] * 1000000.0))
+
+	return results
+
+def benchmark_headless(game_count = 200):
+	"""Times whole games of the headless game simulation with random key presses."""
+	input_random = random.Random(0)
+	simulation = GameSimulation()
+	tick_count = 0
+	start_time = time.perf_counter()
+
+	for index in range(0, game_count):
+		simulation.start_game(index)
+
+		while not simulation.is_game_over and simulation.tick_count < 100000:
+			direction = input_random.random()
+			simulation.input_manager.set_keys(input_random.random() < 0.2, \
+					direction < 0.3, direction >= 0.7, input_random.random() < 0.3, \
+					input_random.random() < 0.1, input_random.random() < 0.02)
+			simulation.step(simulation.tick_period)
+
+		tick_count += simulation.tick_count
+
+	total_time = time.perf_counter() - start_time
+
+	print("headless: " + str(game_count) + " games, " + str(tick_count) + " frames")
+	print("  {:<20} {:>9.0f}".format("games per second", game_count / total_time))
+	print("  {:<20} {:>9.0f}".format("frames per second", tick_count / total_time))
+
+	return tick_count / total_time
+
+def benchmark_pool(round_count = 5, game_count = 40):
+	"""Plays rounds of headless games and shows the object pool misses and the garbage collections of every round. Once the pools are warm, both should stay flat."""
+	input_random = random.Random(0)
+	simulation = GameSimulation()
+	object_factory = simulation.object_factory
+	pools = (("falling pool", object_factory.tetronimo_falling_pool), \
+			("block pool", object_factory.tetronimo_block_pool))
+
+	print("pool: " + str(round_count) + " rounds of " + str(game_count) + " games")
+	print("  {:<8} {:>9} {:>9} {:>9} {:>9}".format("round", "pieces", "misses", \
+			"gc gen 0", "gc gen 2"))
+
+	for round_index in range(0, round_count):
+		miss_count = sum(pool.miss_count for name, pool in pools)
+		collection_counts = [stats["collections"] for stats in gc.get_stats()]
+		pieces_placed = 0
+
+		for index in range(0, game_count):
+			simulation.start_game(round_index * game_count + index)
+
+			while not simulation.is_game_over and simulation.tick_count < 100000:
+				direction = input_random.random()
+				simulation.input_manager.set_keys(input_random.random() < 0.2, \
+						direction < 0.3, direction >= 0.7, input_random.random() < 0.3, \
+						input_random.random() < 0.1, input_random.random() < 0.02)
+				simulation.step(simulation.tick_period)
+
+			pieces_placed += simulation.settings.pieces_placed
+
+		gc_stats = gc.get_stats()
+
+		print("  {:<8} {:>9} {:>9} {:>9} {:>9}".format(round_index, pieces_placed, \
+				sum(pool.miss_count for name, pool in pools) - miss_count, \
+				gc_stats[0]["collections"] - collection_counts[0], \
+				gc_stats[2]["collections"] - collection_counts[2]))
+
+	for name, pool in pools:
+		print("  {:<14} {}".format(name, pool.get_report()))
+
+	return object_factory.tetronimo_block_pool.miss_count
+
+def benchmark_sprite_memory():
+	"""Fills the board with tetronimo blocks that have sprites and shows the memory report of the object factory, next to the cost of giving every block its own sprite images."""
+	import pygame
+
+	simulation = GameSimulation()
+	object_factory = simulation.object_factory
+	board = simulation.settings.board
+	block_sprite_names = ["block_yellow.png", "block_skyblue.png", "block_orange.png", \
+			"block_blue.png", "block_green.png", "block_red.png", "block_purple.png", \
+			"block_grey.png"]
+	object_factory.pygame_sprites = {}
+
+	for sprite_name in block_sprite_names:
+		object_factory.pygame_sprites[sprite_name] = pygame.Surface((32, 32))
+
+	for row in range(0, board.row_count):
+		for column in range(0, board.column_count):
+			object_factory.create_tetronimo_block(board.origin_x + column * board.cell_size + \
+					board.cell_size // 2, board.get_position_y(row), (row + column) % 7, None)
+
+	# The sprite images every block used to have for itself.
+	unshared_sprites = {}
+	unshared_size = 0
+
+	for sprite_name in block_sprite_names:
+		unshared_sprites[sprite_name] = SpriteImage(0, object_factory.pygame_sprites[sprite_name])
+		unshared_size += ObjectFactory.get_object_size(unshared_sprites[sprite_name]) + \
+				sys.getsizeof(unshared_sprites[sprite_name].image_rect)
+
+	unshared_size += sys.getsizeof(unshared_sprites)
+	block_count = board.row_count * board.column_count
+
+	print("sprite_memory: " + str(block_count) + " tetronimo blocks")
+
+	for line in object_factory.get_memory_report().split("\n"):
+		print("  " + line)
+
+	print("  own sprite images per block: " + str(unshared_size) + " bytes, " + \
+			str(unshared_size * block_count) + " bytes for the board")
+
+	return unshared_size
+
+def benchmark_slots(repeat = 2000):
+	"""Compares the slotted tetronimo blocks of a full board with the same blocks using an attribute dictionary, by memory and by the time to read the attributes used every frame."""
+	simulation = GameSimulation()
+	object_factory = simulation.object_factory
+	board = simulation.settings.board
+	blocks = []
+
+	for row in range(0, board.row_count):
+		for column in range(0, board.column_count):
+			blocks.append(object_factory.create_tetronimo_block(board.origin_x + \
+					column * board.cell_size + board.cell_size // 2, \
+					board.get_position_y(row), (row + column) % 7, None))
+
+	dict_blocks = [copy_to_dict_object(block) for block in blocks]
+
+	def read_attributes(cur_blocks):
+		total = 0
+
+		for block in cur_blocks:
+			if block.is_active and block.block_state == 1:
+				total += block.position_x + block.position_y
+
+		return total
+
+	results = {}
+
+	for name, cur_blocks in (("slots", blocks), ("attribute dict", dict_blocks)):
+		memory = sum(ObjectFactory.get_object_size(block) for block in cur_blocks)
+		read_time = timeit.timeit(lambda: read_attributes(cur_blocks), number = repeat) / repeat
+		results[name] = (memory, read_time)
+
+	print("slots: " + str(len(blocks)) + " tetronimo blocks on a full board, " + \
+			str(repeat) + " runs")
+	print("  {:<20} {:>9} {:>14}".format("layout", "bytes", "read all (us)"))
+
+	for name in results:
+		memory, read_time = results[name]
+		print("  {:<20} {:>9} {:>14.2f}".format(name, memory, read_time * 1000000.0))
+
+	return results
+
+def benchmark_blit(frame_count = 300):
+	"""Times blitting a full board of blocks and the tetronimo displays every frame, with the images as loaded from the image folder and with the converted sprite atlas."""
+	import pygame
+
+	# Without a window, use the dummy video driver so the benchmark runs anywhere.
+	os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+	pygame.display.init()
+	backbuffer = pygame.display.set_mode((640, 800))
+
+	sprite_names = ["block_yellow.png", "block_skyblue.png", "block_orange.png", \
+			"block_blue.png", "block_green.png", "block_red.png", "block_purple.png", \
+			"block_grey.png", "display_none.png", "display_O.png", "display_I.png", \
+			"display_J.png", "display_L.png", "display_S.png", "display_Z.png", "display_T.png"]
+
+	start_time = time.perf_counter()
+	loose_sprites = {}
+
+	for sprite_name in sprite_names:
+		loose_sprites[sprite_name] = pygame.image.load("../images/" + sprite_name)
+
+	loose_load_time = time.perf_counter() - start_time
+
+	start_time = time.perf_counter()
+	atlas_sprites = SpriteAtlas("../images/", "../data/cache/", 512, \
+			AssetBundle("../assets.bundle", "../")).load(sprite_names)
+	atlas_load_time = time.perf_counter() - start_time
+
+	# The sprite and position of every blit of a frame.
+	blits = []
+
+	for row in range(0, 24):
+		for column in range(0, 10):
+			blits.append((sprite_names[(row + column) % 8], (160 + column * 32, 16 + row * 32)))
+	for index in range(0, 5):
+		blits.append((sprite_names[8 + index], (16, 54 + index * 144)))
+
+	results = {}
+
+	for name, sprites, load_time in (("loose images", loose_sprites, loose_load_time), \
+			("sprite atlas", atlas_sprites, atlas_load_time)):
+		start_time = time.perf_counter()
+
+		for frame in range(0, frame_count):
+			for sprite_name, position in blits:
+				backbuffer.blit(sprites[sprite_name], position)
+
+		results[name] = (load_time, len(blits) * frame_count / \
+				(time.perf_counter() - start_time))
+
+	pygame.display.quit()
+
+	print("blit: " + str(len(blits)) + " sprites a frame, " + str(frame_count) + " frames")
+	print("  {:<20} {:>9} {:>14}".format("sprites", "load (ms)", "blits a second"))
+
+	for name in results:
+		load_time, blit_rate = results[name]
+		print("  {:<20} {:>9.2f} {:>14.0f}".format(name, load_time * 1000.0, blit_rate))
+
+	return results
+
+# Starts the game system in a new process until the title screen is rendered, then waits for
+# the gameplay assets. Prints the startup times. The gameplay assets are loaded before the
+# first frame, or on the worker thread of the asset loader while the title screen is shown.
+startup_code = """
+import os
+import sys
+import time
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+from game_system import GameSystem
+game_system = GameSystem()
+game_system.asset_bundle.bundle_url = sys.argv[1]
+game_system.start_time = time.perf_counter()
+game_system.load_assets()
+if sys.argv[2] == "title_first":
+	game_system.start_loading_gameplay_assets()
+else:
+	game_system.load_sprites()
+	game_system.audio_manager.load_sounds()
+game_system.setup_title_screen()
+game_system.render_objects()
+game_system.time_to_first_frame = time.perf_counter() - game_system.start_time
+game_system.finish_loading_gameplay_assets()
+game_system.asset_loader.shutdown()
+print(game_system.asset_bundle.is_open(), game_system.time_to_first_frame, \\
+		game_system.gameplay_ready_time)
+"""
+
+def benchmark_startup(run_count = 5):
+	"""Times the start of the game system in new processes, until the first frame and until the gameplay assets are ready. The assets are loaded from the loose files or from a memory mapped asset bundle, and the gameplay assets are loaded before the title screen or while it is shown."""
+	bundle_folder = tempfile.mkdtemp()
+	bundle_url = os.path.join(bundle_folder, "assets.bundle")
+	asset_count = AssetBundle.build(bundle_url, "../", ["images", "fonts", "audio", "data"], \
+			["data/cache", "data/high_score.txt"])
+
+	results = {}
+
+	for name, cur_bundle_url, load_order in ( \
+			("loose, all first", os.path.join(bundle_folder, "none.bundle"), "all_first"), \
+			("loose, title first", os.path.join(bundle_folder, "none.bundle"), "title_first"), \
+			("bundle, all first", bundle_url, "all_first"), \
+			("bundle, title first", bundle_url, "title_first")):
+		first_frame_times = []
+		ready_times = []
+
+		# The first run also builds the sprite atlas cache, so it is not timed.
+		for index in range(0, run_count + 1):
+			output = subprocess.run([sys.executable, "-c", startup_code, cur_bundle_url, \
+					load_order], stdout = subprocess.PIPE, universal_newlines = True, \
+					check = True).stdout
+			is_open, first_frame_time, ready_time = output.split()[-3:]
+
+			if is_open != str(cur_bundle_url == bundle_url):
+				raise RuntimeError("The asset bundle was not used as expected: " + output)
+			if index > 0:
+				first_frame_times.append(float(first_frame_time))
+				ready_times.append(float(ready_time))
+
+		results[name] = (sum(first_frame_times) / run_count, sum(ready_times) / run_count)
+
+	os.remove(bundle_url)
+	os.rmdir(bundle_folder)
+
+	print("startup: mean of " + str(run_count) + " new processes, " + \
+			str(asset_count) + " assets in the bundle")
+	print("  {:<20} {:>16} {:>18}".format("assets", "first frame (ms)", "gameplay ready (ms)"))
+
+	for name in results:
+		first_frame_time, ready_time = results[name]
+		print("  {:<20} {:>16.2f} {:>18.2f}".format(name, first_frame_time * 1000.0, \
+				ready_time * 1000.0))
+
+	return results
+
+def benchmark_game_start(game_count = 20):
+	"""Times starting a game from the title screen until its first frame is rendered, with the music kept loaded across games and with the music loaded again for every game."""
+	import pygame
+
+	os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+	os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+	from game_system import GameSystem
+
+	game_system = GameSystem()
+	game_system.saved_game_url = os.devnull
+	game_system.load_assets()
+	game_system.load_sprites()
+	game_system.audio_manager.load_sounds()
+	game_system.setup_title_screen()
+
+	results = {}
+
+	for name, keep_music in (("music kept loaded", True), ("music loaded again", False)):
+		start_times = []
+
+		for index in range(0, game_count):
+			if not keep_music:
+				game_system.audio_manager.loaded_music_file_name = None
+
+			start_time = time.perf_counter()
+			game_system.setup_classic_game()
+			game_system.render_objects()
+			start_times.append(time.perf_counter() - start_time)
+
+			game_system.settings.stop_music()
+			game_system.load_map_game_over()
+			game_system.destroy_objects_marked_for_deletion()
+
+		results[name] = sum(start_times) / game_count
+
+	game_system.high_score_store.close()
+	pygame.quit()
+
+	print("game_start: mean of " + str(game_count) + " game starts")
+
+	for name in results:
+		print("  {:<20} {:>9.2f} ms".format(name, results[name] * 1000.0))
+
+	return results
+
+def hard_drop_by_scanning(falling_blocks, landed_blocks, bottom_y):
+	"""The hard drop done by going through every landed block for every block of the tetronimo falling, then checking the bottom of the board."""
+	shortest_y_distance = 999.0
+
+	for cur_block in falling_blocks:
+		for cur_block_other in landed_blocks.values():
+			if cur_block_other.block_state == 1 and \
+					cur_block.position_x == cur_block_other.position_x and \
+					cur_block.position_y < cur_block_other.position_y:
+				shortest_y_distance = min(shortest_y_distance, \
+						cur_block_other.position_y - cur_block.position_y - 32)
+
+	largest_y = max(block.position_y for block in falling_blocks)
+
+	return min(shortest_y_distance, bottom_y - largest_y - 16)
+
+def benchmark_hard_drop(repeat = 2000):
+	"""Times finding the hard drop distance of a tetronimo in every column of a half full board with overhangs, by scanning the landed blocks and with the column tops of the board. Also times a frame of the tetronimo ghost."""
+	simulation = GameSimulation()
+	simulation.start_game(0)
+	settings = simulation.settings
+	object_factory = simulation.object_factory
+	board = settings.board
+
+	# Fill the bottom half of the board, leaving a hole under the top block of every third column.
+	for row in range(board.row_count // 2, board.row_count):
+		for column in range(0, board.column_count):
+			if row == board.row_count // 2 + 1 and column % 3 == 0:
+				continue
+
+			block = object_factory.create_tetronimo_block(board.origin_x + \
+					column * board.cell_size + board.cell_size // 2, \
+					board.get_position_y(row), column % 7, None)
+			block.change_block_to_landed()
+
+	# An I tetronimo lying flat at the top, moved to every column it fits in.
+	tetronimo_falling = object_factory.create_tetronimo_falling(224, 48, 1)
+	tetronimo_falling.tetronimo_blocks.sort(key = lambda block: block.position_x)
+	falling_blocks = tetronimo_falling.tetronimo_blocks
+	start_x = falling_blocks[0].position_x
+	column_xs = list(range(board.origin_x + board.cell_size // 2, board.origin_x + \
+			(board.column_count - 3) * board.cell_size, board.cell_size))
+	bottom_y = settings.tetronimo_container_bounds[3]
+
+	def run_scanning():
+		for column_x in column_xs:
+			tetronimo_falling.move_blocks(column_x - falling_blocks[0].position_x, 0)
+			hard_drop_by_scanning(falling_blocks, settings.tetronimo_blocks, bottom_y)
+
+	def run_board():
+		for column_x in column_xs:
+			tetronimo_falling.move_blocks(column_x - falling_blocks[0].position_x, 0)
+			board.get_drop_distance(falling_blocks)
+
+	# Check that both hard drops find the same distance in every column.
+	for column_x in column_xs:
+		tetronimo_falling.move_blocks(column_x - falling_blocks[0].position_x, 0)
+
+		assert hard_drop_by_scanning(falling_blocks, settings.tetronimo_blocks, bottom_y) == \
+				board.get_drop_distance(falling_blocks)
+
+	results = {}
+
+	for name, run in (("scan every block", run_scanning), ("column tops", run_board)):
+		results[name] = timeit.timeit(run, number = repeat) / (repeat * len(column_xs))
+
+	tetronimo_falling.move_blocks(start_x - falling_blocks[0].position_x, 0)
+	settings.cur_tetronimo_falling = tetronimo_falling
+	settings.tetronimo_assembly_state = 0
+	tetronimo_ghost = object_factory.create_tetronimo_ghost()
+	results["ghost frame"] = timeit.timeit(lambda: tetronimo_ghost.update(0.0), \
+			number = repeat) / repeat
+
+	print("hard_drop: drop distance of an I tetronimo over " + str(len(settings.tetronimo_blocks) - 4) + \
+			" landed blocks, " + str(repeat) + " runs")
+
+	for name in results:
+		print("  {:<20} {:>9.2f} us".format(name, results[name] * 1000000.0))
+
+	return results
+
+def benchmark_bot(repeat = 50, game_count = 4, max_tick_count = 20000):
+	"""Times the placement search of the bot for every tetronimo type on a board filled up to the spawn rows, with holes and a jagged top. Then plays headless games with the bot and shows how long it survives."""
+	simulation = GameSimulation()
+	settings = simulation.settings
+	board = settings.board
+	placement_search = PlacementSearch(settings)
+	board_random = random.Random(0)
+
+	# Fill every row under the spawn rows but one cell, and leave a jagged top.
+	for row in range(placement_search.spawn_row_count + 1, board.row_count):
+		hole_column = board_random.randrange(0, board.column_count)
+
+		for column in range(0, board.column_count):
+			if column != hole_column and (row > placement_search.spawn_row_count + 2 or \
+					board_random.random() < 0.5):
+				board.occupy(board.origin_x + column * board.cell_size + \
+						board.cell_size // 2, board.get_position_y(row))
+
+	search_times = []
+
+	for index in range(0, repeat):
+		for tetronimo_type in range(0, 7):
+			start_time = time.perf_counter()
+			placement_search.find_best_placement(tetronimo_type, (tetronimo_type + 3) % 7)
+			search_times.append(time.perf_counter() - start_time)
+
+	print("bot: placement search with the next tetronimo on a " + \
+			str(board.row_count - placement_search.spawn_row_count - 1) + " row high board, " + \
+			str(len(search_times)) + " searches")
+	print("  {:<20} {:>9.2f} ms".format("mean", sum(search_times) / len(search_times) * 1000.0))
+	print("  {:<20} {:>9.2f} ms".format("max", max(search_times) * 1000.0))
+
+	print("  {:<8} {:>8} {:>8} {:>8} {:>10}".format("seed", "score", "rows", "pieces", "game over"))
+
+	for seed in range(0, game_count):
+		bot_input = BotInput()
+		simulation.start_game(seed)
+
+		while not simulation.is_game_over and simulation.tick_count < max_tick_count:
+			bot_input.update(simulation)
+			simulation.step(simulation.tick_period)
+
+		print("  {:<8} {:>8} {:>8} {:>8} {:>10}".format(seed, settings.score, \
+				settings.rows_cleared, settings.pieces_placed, str(simulation.is_game_over)))
+
+	return search_times
+
+def benchmark_replay(tick_count = 108000):
+	"""Records a 30 minute game played by the bot as a replay, then times playing the replay again without rendering and checks that it ends the same."""
+	simulation = GameSimulation()
+	bot_input = BotInput()
+	simulation.start_game(0)
+	simulation.replay = Replay(0)
+
+	start_time = time.perf_counter()
+
+	while not simulation.is_game_over and simulation.tick_count < tick_count:
+		bot_input.update(simulation)
+		simulation.step(simulation.tick_period)
+
+	record_time = time.perf_counter() - start_time
+	replay = simulation.replay
+	replay.record_stats(simulation.settings)
+	simulation.replay = None
+
+	replay_data = replay.to_bytes()
+	replay = Replay.from_bytes(replay_data)
+
+	start_time = time.perf_counter()
+	is_matching = simulation.play_replay(replay)
+	play_time = time.perf_counter() - start_time
+
+	print("replay: " + str(replay.tick_count) + " frames, " + str(replay.pieces_placed) + \
+			" pieces, " + str(len(replay.key_changes)) + " key changes")
+	print("  {:<20} {:>9} bytes".format("replay size", len(replay_data)))
+	print("  {:<20} {:>9.2f} s".format("played by the bot", record_time))
+	print("  {:<20} {:>9.2f} s".format("replayed", play_time))
+	print("  {:<20} {:>9}".format("matches", str(is_matching)))
+
+	return play_time
+
+def copy_with_keyframe_interval(replay, keyframe_interval):
+	"""Copies a replay with only the keyframes taken every keyframe interval of pieces. None copies it without keyframes."""
+	replay_copy = Replay(replay.seed, keyframe_interval or replay.keyframe_interval)
+	replay_copy.tick_count = replay.tick_count
+	replay_copy.record_stats(replay)
+	replay_copy.key_changes = replay.key_changes
+
+	if keyframe_interval is not None:
+		for tick, keyframe in zip(replay.keyframe_ticks, replay.keyframes):
+			if keyframe[0] % keyframe_interval == 0:
+				replay_copy.keyframe_ticks.append(tick)
+				replay_copy.keyframes.append(keyframe)
+
+	return replay_copy
+
+def benchmark_replay_seek(piece_count = 10000, seek_count = 10):
+	"""Records a game of 10,000 pieces played by the bot, with a keyframe every 25 pieces. Then shows the size of the replay and the time to jump to random frames with a keyframe every 25, 100 and 400 pieces, and with no keyframes."""
+	simulation = GameSimulation()
+	bot_input = BotInput()
+	simulation.start_game(0)
+	simulation.replay = Replay(0, 25)
+
+	while not simulation.is_game_over and simulation.settings.pieces_placed < piece_count:
+		bot_input.update(simulation)
+		simulation.step(simulation.tick_period)
+
+	replay = simulation.replay
+	replay.record_stats(simulation.settings)
+	simulation.replay = None
+
+	seek_ticks = random.Random(0).sample(range(0, replay.tick_count), seek_count)
+
+	print("replay_seek: " + str(replay.tick_count) + " frames, " + str(replay.pieces_placed) + \
+			" pieces, seek to " + str(seek_count) + " random frames")
+	print("  {:<20} {:>9} {:>9} {:>11} {:>11}".format("keyframe interval", "keyframes", \
+			"size", "mean seek", "max seek"))
+
+	for keyframe_interval in (25, 100, 400, None):
+		replay_data = copy_with_keyframe_interval(replay, keyframe_interval).to_bytes()
+		replay_copy = Replay.from_bytes(replay_data)
+		seek_times = []
+
+		for tick in seek_ticks:
+			start_time = time.perf_counter()
+			simulation.seek_replay(replay_copy, tick)
+			seek_times.append(time.perf_counter() - start_time)
+
+		print("  {:<20} {:>9} {:>8.0f}K {:>8.1f} ms {:>8.1f} ms".format( \
+				str(keyframe_interval or "none"), len(replay_copy.keyframes), \
+				len(replay_data) / 1024.0, sum(seek_times) / seek_count * 1000.0, \
+				max(seek_times) * 1000.0))
+
+	return len(replay_data)
+
+def rebuild_board(simulation, cells, is_bulk):
+	"""Destroys the landed blocks and empties the board, then creates a landed block for every cell again, in one bulk pass or through the object factory one block at a time."""
+	board = simulation.settings.board
+	object_factory = simulation.object_factory
+
+	for block in simulation.tetronimo_blocks.values():
+		block.mark_for_deletion()
+
+	simulation.object_registry.destroy_objects_marked_for_deletion()
+	board.clear()
+
+	if is_bulk:
+		board.load_blocks(object_factory.create_landed_tetronimo_blocks(cells))
+	else:
+		for position_x, position_y, tetronimo_type in cells:
+			block = object_factory.create_tetronimo_block(position_x, position_y, \
+					tetronimo_type, None)
+			block.change_block_to_landed()
+
+def benchmark_snapshot(repeat = 1000):
+	"""Times saving and restoring a game snapshot of a game with a board filled up to its top rows. Also times rebuilding the board with the landed blocks created in one bulk pass and through the object factory one at a time."""
+	simulation = GameSimulation()
+	simulation.start_game(0)
+	simulation.step(simulation.tick_period)
+	object_factory = simulation.object_factory
+	board = simulation.settings.board
+
+	# Fill every row under the spawn rows but one cell, so no row is full.
+	for row in range(4, board.row_count):
+		for column in range(0, board.column_count):
+			if column != row % board.column_count:
+				block = object_factory.create_tetronimo_block(board.origin_x + \
+						column * board.cell_size + board.cell_size // 2, \
+						board.get_position_y(row), column % 7, None)
+				block.change_block_to_landed()
+
+	snapshot = simulation.save_snapshot()
+	block_count = len(simulation.tetronimo_blocks)
+	cells = [(block.position_x, block.position_y, block.tetronimo_type) for row_blocks in \
+			board.row_blocks for block in row_blocks if block is not None]
+
+	results = {
+		"save": timeit.timeit(simulation.save_snapshot, number = repeat) / repeat,
+		"restore": timeit.timeit(lambda: simulation.restore_snapshot(snapshot), \
+				number = repeat) / repeat,
+		"board, bulk": timeit.timeit(lambda: rebuild_board(simulation, cells, True), \
+				number = repeat) / repeat,
+		"board, one by one": timeit.timeit(lambda: rebuild_board(simulation, cells, False), \
+				number = repeat) / repeat,
+	}
+
+	simulation.restore_snapshot(snapshot)
+	assert simulation.save_snapshot() == snapshot and \
+			len(simulation.tetronimo_blocks) == block_count
+
+	print("snapshot: " + str(len(cells)) + " landed blocks, " + str(len(snapshot)) + \
+			" bytes, " + str(repeat) + " runs")
+
+	for name in results:
+		print("  {:<20} {:>9.1f} us".format(name, results[name] * 1000000.0))
+
+	return results
+
+def benchmark_perf_hud(frame_count = 600):
+	"""Times frames of the game system played by the bot, with the performance overlay hidden, shown, and hidden again. A hidden overlay should cost nothing."""
+	import pygame
+
+	os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+	os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+	from game_system import GameSystem
+
+	game_system = GameSystem()
+	game_system.saved_game_url = os.devnull
+	game_system.load_assets()
+	game_system.load_sprites()
+	game_system.setup_title_screen()
+	simulation = game_system.simulation
+	results = {}
+
+	for name in ("hidden", "shown", "hidden again"):
+		if name != "hidden":
+			game_system.toggle_perf_hud()
+
+		# Every run plays the same game.
+		random.seed(0)
+		game_system.setup_classic_game()
+		game_system.settings.stop_music()
+		bot_input = BotInput()
+		start_time = time.perf_counter()
+
+		for frame in range(0, frame_count):
+			bot_input.update(simulation)
+			simulation.step(simulation.tick_period)
+			game_system.tetronimo_ghost.update(simulation.tick_period)
+			game_system.render_objects()
+
+		results[name] = (time.perf_counter() - start_time) / frame_count
+		game_system.load_map_game_over()
+		game_system.destroy_objects_marked_for_deletion()
+
+	game_system.high_score_store.close()
+	pygame.quit()
+
+	print("perf_hud: mean of " + str(frame_count) + " frames played by the bot")
+
+	for name in results:
+		print("  {:<20} {:>9.1f} us".format(name, results[name] * 1000000.0))
+
+	return results
+
+# The benchmarks by name.
+benchmarks = {
+	"fixed_tick": benchmark_fixed_tick,
+	"line_clear": benchmark_line_clear,
+	"headless": benchmark_headless,
+	"pool": benchmark_pool,
+	"sprite_memory": benchmark_sprite_memory,
+	"slots": benchmark_slots,
+	"blit": benchmark_blit,
+	"startup": benchmark_startup,
+	"game_start": benchmark_game_start,
+	"hard_drop": benchmark_hard_drop,
+	"bot": benchmark_bot,
+	"replay": benchmark_replay,
+	"replay_seek": benchmark_replay_seek,
+	"snapshot": benchmark_snapshot,
+	"perf_hud": benchmark_perf_hud,
+}
+
+if __name__ == "__main__":
+	names = sys.argv[1:] or list(benchmarks)
+
+	for name in names:
+		benchmarks[name]()
@@ -0,0 +1,87 @@
+from placement_search import PlacementSearch
+
+""" ---------------------------------------------------------------
+    BotInput Class
+
+    An input source that plays the game by itself. When a new
+    tetronimo falls, the placement search finds the best place
+    for it with the next tetronimo of the preview in mind, and
+    the keys that reach it are pressed one frame at a time.
+    It plays the headless game simulation like the random input,
+    and the pygame game as the autoplay of the input manager.
+--------------------------------------------------------------- """
+class BotInput():
+	def __init__(self):
+		#initialize the placement search, the tetronimo being placed and its keys
+		self.placement_search = None
+		self.cur_tetronimo_id = None
+		self.input_sequence = []
+		self.cur_input_index = 0
+
+	def update(self, simulation):
+		#Set the keys of the input state of the simulation for the next frame
+		input_state = simulation.input_manager
+		settings = simulation.settings
+		cur_tetronimo_falling = settings.cur_tetronimo_falling
+
+		if settings.tetronimo_assembly_state != 0 or cur_tetronimo_falling is None or \
+				cur_tetronimo_falling.marked_for_deletion:
+			input_state.set_keys(False, False, False, False, False, False)
+			return
+
+		#Search the placement of a new tetronimo once, on its first frame
+		if cur_tetronimo_falling.object_id != self.cur_tetronimo_id:
+			self.cur_tetronimo_id = cur_tetronimo_falling.object_id
+			self.plan_placement(settings, cur_tetronimo_falling.tetronimo_type)
+
+		#Once every key is pressed, keep dropping the tetronimo until it lands
+		keys = ("drop",)
+
+		if self.cur_input_index < len(self.input_sequence):
+			keys = self.input_sequence[self.cur_input_index]
+			self.cur_input_index += 1
+
+		input_state.set_keys(False, "left" in keys, "right" in keys, "rotate" in keys, \
+				"drop" in keys, False)
+
+	def plan_placement(self, settings, tetronimo_type):
+		#Find the best placement of the tetronimo and the keys to press to reach it
+		#If every placement ends the game, the tetronimo is dropped where it is
+		if self.placement_search is None:
+			self.placement_search = PlacementSearch(settings)
+
+		next_tetronimo_type = None
+
+		if len(settings.tetronimo_type_queue) > 0:
+			next_tetronimo_type = settings.tetronimo_type_queue[0]
+
+		placement = self.placement_search.find_best_placement(tetronimo_type, \
+				next_tetronimo_type)
+
+		if placement is None:
+			placement = (0, 0)
+
+		self.input_sequence = PlacementSearch.get_input_sequence(*placement)
+		self.cur_input_index = 0
+
+""" --------------------------------------------------
+    Initialize each BotInput object with:
+        - the placement search. It is created with the
+	      settings of the first game it plays.
+	- the id of the tetronimo falling being placed.
+	- the keys to press on every frame to place it.
+	- the index of the keys of the next frame.
+-----------------------------------------------------
+    BotInput()::update()
+
+    Set the keys of the input state of the simulation
+    for the next frame. A new tetronimo falling gets
+    its placement searched on its first frame. Then the
+    keys of the placement are pressed one frame at a time.
+-----------------------------------------------------
+    BotInput()::plan_placement()
+
+    Find the best placement of the tetronimo with the
+    next tetronimo of the preview, and the keys to press
+    on every frame to reach it.
+-------------------------------------------------- """
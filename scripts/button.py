@@ -8,7 +8,7 @@ import pygame
 --------------------------------------------------------------- """
 
 class Button():
-	def __init__(self, font, color, x, y, width, height, text = ''):
+	def __init__(self, font, color, x, y, width, height, text = '', text_surface_cache = None):
 		self.font = font
 		self.color = color
 		self.x = x
@@ -16,6 +16,7 @@ class Button():
 		self.width = width
 		self.height = height
 		self.text = text
+		self.text_surface_cache = text_surface_cache
 
 	def draw(self, win, outline = None):
 		# Call this method to draw the button on the screen
@@ -25,7 +26,10 @@ class Button():
 		pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.height), 0)
 
 		if self.text != '':
-			text = self.font.render(self.text, 1, (0, 0, 0))
+			if self.text_surface_cache is not None:
+				text = self.text_surface_cache.render(self.font, self.text, (0, 0, 0))
+			else:
+				text = self.font.render(self.text, 1, (0, 0, 0))
 			win.blit(text, (self.x + (self.width/2 - text.get_width()/2), self.y + (self.height/2 - text.get_height()/2)))
 
 	def isOver(self, pos):
@@ -43,11 +47,15 @@ class Button():
 	- a  y-locaiton
 	- the width of the button
 	- the height of the button	
+	- the text of the button
+	- the shared cache of rendered text surfaces
 -----------------------------------------------------
     Button()::draw()
     
     This function will be used to draw button objects
     by utilizing the pygame.draw.rect function.
+    The text is taken from the shared text surface cache
+    so it is not rendered again every frame.
 -----------------------------------------------------
     Button()::isOver()
     
@@ -0,0 +1,132 @@
+import collections
+import json
+import time
+
+""" ---------------------------------------------------------------
+    FrameTracer Class
+
+    Records how long every phase of the main loop took, frame by
+    frame, so a stutter can be opened in a trace viewer such as
+    Perfetto or chrome://tracing. The phases are the methods the
+    main loop and the ticks call, down to the expensive branches
+    of the settings update. They are wrapped on their objects with
+    a timer once the tracer is enabled, so a game played without
+    the tracer runs the methods directly. The events are kept in
+    a ring buffer, so only the last minutes of the game are kept
+    however long it runs, and the trace is written in the Chrome
+    trace event format.
+--------------------------------------------------------------- """
+class FrameTracer():
+	# The most events kept. At 60 frames per second this is the last few minutes of the game.
+	max_event_count = 200000
+
+	def __init__(self, game_system, max_event_count = max_event_count):
+		#initialize the traced methods, the ring buffer of events and the start of the trace
+		simulation = game_system.simulation
+		settings = game_system.settings
+		self.traced_methods = (
+			(game_system.input_manager, "check_events", "events"),
+			(game_system, "title_screen_update", "title screen"),
+			(simulation, "advance", "simulation"),
+			(simulation, "advance_turbo", "simulation"),
+			(simulation, "step", "tick"),
+			(settings, "update", "settings"),
+			(settings, "hold_tetronimo_falling", "hold swap"),
+			(settings, "find_full_rows", "row detection"),
+			(settings, "remove_full_rows", "row collapse"),
+			(settings, "change_all_blocks_to_grey", "game over"),
+			(settings, "fill_screen_with_grey_blocks", "game over fill"),
+			(simulation, "update_tetronimos_falling", "falling"),
+			(game_system.object_registry, "destroy_objects_marked_for_deletion", "destroy"),
+			(game_system.audio_manager, "play_queued_sounds", "audio"),
+			(game_system, "render_objects", "render"),
+			(game_system.render_queue, "update_render_states", "gather"),
+			(game_system.render_queue, "render", "blit"),
+		)
+		self.events = collections.deque(maxlen = max_event_count)
+		self.start_time = time.perf_counter()
+		self.frame_start_time = None
+		self.frame_count = 0
+
+	def enable(self):
+		#Wrap every traced method on its object with a timer that records an event
+		for owner, method_name, event_name in self.traced_methods:
+			setattr(owner, method_name, self.create_traced_method(getattr(owner, method_name), \
+					event_name))
+
+	def create_traced_method(self, method, event_name):
+		#Wrap a bound method so every call to it is recorded as an event
+		events = self.events
+		perf_counter = time.perf_counter
+
+		def traced_method(*args, **kwargs):
+			start_time = perf_counter()
+			result = method(*args, **kwargs)
+			events.append((event_name, start_time, perf_counter()))
+			return result
+
+		return traced_method
+
+	def begin_frame(self):
+		#Record the frame that ended as an event and start the next one
+		#A frame lasts until the next one starts, so it includes the wait for the clock
+		cur_time = time.perf_counter()
+
+		if self.frame_start_time is not None:
+			self.events.append(("frame " + str(self.frame_count), self.frame_start_time, cur_time))
+			self.frame_count += 1
+
+		self.frame_start_time = cur_time
+
+	def save(self, trace_url):
+		#Write the events kept to a file in the Chrome trace event format, in microseconds
+		trace_events = [
+			{"name": "process_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "Tetris"}},
+			{"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "main loop"}},
+		]
+
+		for event_name, start_time, end_time in self.events:
+			trace_events.append({"name": event_name, "ph": "X", "pid": 1, "tid": 1, \
+					"ts": round((start_time - self.start_time) * 1000000.0, 3), \
+					"dur": round((end_time - start_time) * 1000000.0, 3)})
+
+		with open(trace_url, "w") as trace_file:
+			json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, trace_file)
+
+""" --------------------------------------------------
+    Initialize each FrameTracer object with:
+        - the methods traced, as the object they are called
+	      on, the method name and the event name.
+	- the ring buffer of the events kept, as the event
+	      name, the start time and the end time. The
+	      oldest events are dropped once it is full.
+	- the time the trace started.
+	- the time the current frame started.
+	- the number of frames recorded.
+-----------------------------------------------------
+    FrameTracer()::enable()
+
+    Wrap every traced method on its object with a timer
+    that records an event. The tracer stays enabled
+    until the program exits.
+-----------------------------------------------------
+    FrameTracer()::create_traced_method()
+
+    Wrap a bound method so every call to it is recorded
+    as an event with its start and end time. Positional
+    and keyword arguments are passed on to the method.
+-----------------------------------------------------
+    FrameTracer()::begin_frame()
+
+    Record the frame that ended as an event numbered by
+    frame, and start the next one. Time in a frame not
+    covered by its phases is the wait for the clock.
+-----------------------------------------------------
+    FrameTracer()::save()
+
+    Write the events kept to a file as complete events
+    of the Chrome trace event format, in microseconds
+    from the start of the trace. Events nest by their
+    times, so every tick shows under its frame and
+    every branch of the settings under its tick.
+-------------------------------------------------- """
@@ -1,18 +1,24 @@
-import pygame
-
-from pygame.sprite import Sprite
-
 """ -----------------------------------------------------
     GameObject class
 
     The primary game object abstract class.
     All game object types are inherited from this class.
     It contains a dictionary of sprite images,
+    which is None for the game objects of the
+    headless game simulation,
     a position in 2D world space, and a collision box.
     The selection of the default sprite
     must be chosen by the inherited constuctor.
+    Every game object type lists its attributes
+    in __slots__, so the game objects have no
+    attribute dictionary and their attributes
+    are fast to read.
 ----------------------------------------------------- """
 class GameObject():
+	__slots__ = ("is_active", "marked_for_deletion", "object_id", "tag", "position_x", \
+			"position_y", "cur_sprite_image", "cur_sprite_name", "sprite_images", \
+			"collision_box", "registry", "pool")
+	
 	def __init__(self, object_id, tag, position_x, position_y, collision_box, sprite_images):		
 		self.is_active = True
 		self.marked_for_deletion = False
@@ -21,8 +27,34 @@ class GameObject():
 		self.position_x = position_x	
 		self.position_y = position_y
 		self.cur_sprite_image = None
+		self.cur_sprite_name = None
 		self.sprite_images = sprite_images
 		self.collision_box = collision_box
+		self.registry = None
+		self.pool = None
+		
+	def reset(self, object_id, position_x, position_y):
+		#Reset a game object taken from an object pool so it can be used again
+		self.is_active = True
+		self.marked_for_deletion = False
+		self.object_id = object_id
+		self.position_x = position_x
+		self.position_y = position_y
+		
+	def mark_for_deletion(self):
+		#Mark the game object for deletion and let the registry know about it
+		if not self.marked_for_deletion:
+			self.marked_for_deletion = True
+			
+			if self.registry is not None:
+				self.registry.mark_for_deletion(self)
+				
+	def set_sprite(self, sprite_name):
+		#Set the current sprite by its file name. Without sprite images, only the name is kept
+		self.cur_sprite_name = sprite_name
+		
+		if self.sprite_images is not None:
+			self.cur_sprite_image = self.sprite_images[sprite_name]
 """ --------------------------------------------------
     Initialize each Button object with:
         - a flag to check if the game object is active.
@@ -37,10 +69,30 @@ class GameObject():
 	      2 - GUI text object.
 	      3 - Teteronimo falling.
 	      4 - Teteronimo block.
+	      5 - Teteronimo display.
+	      6 - Teteronimo ghost and ghost block.
 	- an x position of the game object in 2D world space	
 	- a  y-locaiton of the game object in 2D world space
 	- the current sprite image object being used for rendering.
+	- the file name of the current sprite.
 	- the sprites to use. It is a dictionary of sprite image objects,
 	      where the key is the file name of the sprite.
 	- the collision box used for collision detection. It is of type pygame.Rect
+	- the object registry the game object belongs to.
+	- the object pool the game object goes back to once destroyed.
+-----------------------------------------------------
+    GameObject()::reset()
+    
+    Reset a game object taken from an object pool
+    with a new id and position.
+-----------------------------------------------------
+    GameObject()::mark_for_deletion()
+    
+    Mark the game object for deletion.
+    The object registry will remove it at the end of the frame.
+-----------------------------------------------------
+    GameObject()::set_sprite()
+    
+    Set the current sprite by its file name.
+    Game objects without sprite images only keep the name.
 -------------------------------------------------- """
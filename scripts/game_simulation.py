@@ -0,0 +1,278 @@
+import time
+
+from game_snapshot import GameSnapshot
+from input_state import InputState
+from object_factory import ObjectFactory
+from object_registry import ObjectRegistry
+from replay_input import ReplayInput
+from settings import Settings
+
+""" ---------------------------------------------------------------
+    GameSimulation Class
+
+    The core of the game. It runs the tetronimo assembly, the
+    falling tetronimos and the scoring one frame at a time
+    without a display, a sound mixer or sprites, so it does not
+    need pygame. The game system wraps it with the window, the
+    rendering, the sounds and the title screen.
+    Every frame of the simulation is a fixed tick of 1/60 of a
+    second, so the game plays the same at any frame rate.
+--------------------------------------------------------------- """
+class GameSimulation():
+	def __init__(self, input_manager = None):
+		#initialize the object registry, the input, the settings and the object factory
+		self.object_registry = ObjectRegistry()
+		self.game_objects = self.object_registry.game_objects
+		self.tetronimos_falling = self.object_registry.get_objects_with_tag(3)
+		self.tetronimo_blocks = self.object_registry.get_objects_with_tag(4)
+		self.tetronimo_displays = self.object_registry.get_objects_with_tag(5)
+		self.input_manager = input_manager
+		self.settings = Settings()
+		self.object_factory = ObjectFactory(self.object_registry, None, None)
+		self.tick_count = 0
+		self.is_game_over = False
+		self.tick_period = 1000.0 / 60.0
+		self.max_catch_up_tick_count = 5
+		self.time_accum = 0.0
+		self.replay = None
+
+		if self.input_manager is None:
+			self.input_manager = InputState()
+
+		#initialize the required settings
+		self.settings.object_factory = self.object_factory
+		self.settings.tetronimos_falling = self.tetronimos_falling
+		self.settings.tetronimo_blocks = self.tetronimo_blocks
+		self.settings.input_manager = self.input_manager
+		self.settings.game_system = self
+		self.object_factory.settings = self.settings
+		self.object_factory.input_manager = self.input_manager
+
+	def start_game(self, seed = None):
+		#Start a new classic game. The game objects of the previous game are destroyed first
+		#A seed makes the tetronimos of the game the same every time
+		if seed is not None:
+			self.settings.seed_random(seed)
+
+		for cur_game_obj in self.game_objects.values():
+			cur_game_obj.mark_for_deletion()
+
+		self.object_registry.destroy_objects_marked_for_deletion()
+
+		self.settings.reset_game()
+		self.settings.tetronimo_type_queue.clear()
+		self.settings.game_state = 0
+		self.settings.reset_tetronimo_assembly()
+
+		self.tick_count = 0
+		self.is_game_over = False
+		self.time_accum = 0.0
+
+	def step(self, delta_time):
+		#Update the game by a single frame
+		#A tetronimo falling created by the settings update is first updated on the next frame
+		#When the game plays by itself, the autoplay input sets the keys first
+		if self.input_manager.autoplay_input is not None:
+			self.input_manager.autoplay_input.update(self)
+		if self.replay is not None:
+			self.replay.record_tick(self)
+
+		tetronimos_falling = list(self.tetronimos_falling.values())
+		self.settings.update(delta_time)
+		self.update_tetronimos_falling(tetronimos_falling, delta_time)
+
+		for key in self.tetronimo_displays:
+			cur_object = self.tetronimo_displays[key]
+			if cur_object.is_active:
+				cur_object.update(delta_time)
+
+		self.object_registry.destroy_objects_marked_for_deletion()
+		self.input_manager.reset_tapped_keys()
+		self.tick_count += 1
+
+	def update_tetronimos_falling(self, tetronimos_falling, delta_time):
+		#Update the active tetronimos falling, and their blocks
+		for cur_object in tetronimos_falling:
+			if cur_object.is_active:
+				cur_object.update(delta_time)
+
+	def advance(self, elapsed_time):
+		#Run the fixed ticks that fit in the time elapsed since the last call, in milliseconds
+		#The time left over is kept for the next call. Returns the number of ticks that were run
+		self.time_accum += elapsed_time
+		tick_count = 0
+
+		while self.time_accum >= self.tick_period and self.settings.game_state == 0:
+			#If too far behind, drop the time left over instead of trying to catch up
+			if tick_count == self.max_catch_up_tick_count:
+				self.time_accum = 0.0
+				break
+
+			self.step(self.tick_period)
+			self.time_accum -= self.tick_period
+			tick_count += 1
+
+		return tick_count
+
+	def advance_turbo(self, time_budget):
+		#Run fixed ticks as fast as possible until the time budget of real time, in milliseconds,
+		#is used up. Returns the number of ticks that were run
+		end_time = time.perf_counter() + time_budget / 1000.0
+		tick_count = 0
+
+		while self.settings.game_state == 0:
+			self.step(self.tick_period)
+			tick_count += 1
+
+			if time.perf_counter() >= end_time:
+				break
+
+		self.time_accum = 0.0
+
+		return tick_count
+
+	def run_until_game_over(self, max_tick_count):
+		#Step the game until it is over or the maximum number of frames is reached
+		#Returns the number of frames that were run
+		start_tick_count = self.tick_count
+
+		while not self.is_game_over and \
+				self.tick_count - start_tick_count < max_tick_count:
+			self.step(self.tick_period)
+
+		return self.tick_count - start_tick_count
+
+	def save_snapshot(self):
+		#Pack the game in progress into a snapshot, or None if the game is lost
+		if not GameSnapshot.can_capture(self):
+			return None
+
+		return GameSnapshot.capture(self)
+
+	def restore_snapshot(self, snapshot):
+		#Start a new game and restore a snapshot of a game in progress on it
+		self.start_game()
+		GameSnapshot.restore(self, snapshot)
+
+	def play_replay(self, replay):
+		#Play a recorded game again as fast as possible, without rendering
+		#Returns True if the game ended with the recorded stats
+		autoplay_input = self.input_manager.autoplay_input
+		self.start_game(replay.seed)
+		self.input_manager.autoplay_input = ReplayInput(replay)
+		self.run_until_game_over(replay.tick_count)
+		self.input_manager.autoplay_input = autoplay_input
+
+		return replay.is_matching(self.settings)
+
+	def seek_replay(self, replay, tick):
+		#Jump to a frame of a recorded game. The game is restored from the last keyframe before
+		#the frame and played from there. The replay keeps setting the keys of the next frames
+		snapshot = replay.get_keyframe(tick)
+
+		if snapshot is None:
+			self.start_game(replay.seed)
+		else:
+			self.restore_snapshot(snapshot)
+
+		self.input_manager.autoplay_input = ReplayInput(replay, self.tick_count)
+		self.run_until_game_over(tick - self.tick_count)
+
+	def load_map_game_over(self):
+		#Called by the settings once the player loses. There is no game over map to load
+		self.is_game_over = True
+
+""" --------------------------------------------------
+    Initialize each GameSimulation object with:
+        - the object registry of the game objects.
+	- the game objects. Keys are the game object ids.
+	- the tetronimos falling, indexed by the object registry.
+	- the tetronimo blocks, indexed by the object registry.
+	- the tetronimo displays, indexed by the object registry.
+	      The headless game simulation has none.
+	- the input read by the game logic. An input state is
+	      created when no input manager is given.
+	- the settings running the tetronimo assembly.
+	- the object factory. It creates the game objects without
+	      sprite images until it is given the pygame sprites.
+	- the number of frames since the game started.
+	- a flag to check if the game is over.
+	- the time of a single fixed tick, in milliseconds.
+	- the most ticks run by a single advance to catch up.
+	- the time accumulated that has not been run as a tick yet.
+	- the replay the keys of every frame are recorded to,
+	      or None when the game is not recorded.
+-----------------------------------------------------
+    GameSimulation()::start_game()
+
+    Start a new classic game.
+    Seed the random number generator of the settings if a seed is given.
+    Destroy the game objects of the previous game and reset the
+    score, the timers, the tetronimo assembly and the time accumulated.
+-----------------------------------------------------
+    GameSimulation()::step()
+
+    Update the game by a single frame.
+        Let the autoplay input set the keys if there is one.
+        Record the keys and the keyframes to the replay if the game
+	      is recorded.
+        Take the tetronimos falling that exist before the update.
+	Update the settings.
+	Update the tetronimos falling and the tetronimo displays.
+	Destroy the game objects marked for deletion.
+	Reset the tapped keys.
+-----------------------------------------------------
+    GameSimulation()::update_tetronimos_falling()
+
+    Update the active tetronimos falling that existed
+    before the settings update, and their blocks.
+-----------------------------------------------------
+    GameSimulation()::advance()
+
+    Add the elapsed time to the time accumulated and run
+    a fixed tick for every tick period accumulated.
+    Ticks stop being run when the game leaves classic mode.
+    If more ticks than the catch up cap are due, the rest
+    of the time is dropped so a slow frame cannot make
+    every following frame slower.
+-----------------------------------------------------
+    GameSimulation()::advance_turbo()
+
+    Run fixed ticks back to back until the time budget of
+    real time is used up. Used for replays and benchmarks.
+-----------------------------------------------------
+    GameSimulation()::run_until_game_over()
+
+    Step the game until it is over or the maximum number of
+    frames is reached. Returns the number of frames run.
+-----------------------------------------------------
+    GameSimulation()::save_snapshot()
+
+    Pack the game in progress into a game snapshot.
+    Returns None if the game is over or lost.
+-----------------------------------------------------
+    GameSimulation()::restore_snapshot()
+
+    Start a new game and rebuild the state of a game
+    snapshot on it.
+-----------------------------------------------------
+    GameSimulation()::play_replay()
+
+    Start the game with the seed of a replay and play it
+    again as fast as possible, with the keys set by the
+    replay before every frame. Returns True if the game
+    ended with the recorded stats.
+-----------------------------------------------------
+    GameSimulation()::seek_replay()
+
+    Jump to a frame of a recorded game. Restore the last
+    keyframe on or before the frame, or start the game with
+    the seed of the replay if there is none, then play the
+    frames up to it. The replay input is left as the autoplay
+    input, so stepping the game goes on playing the replay.
+-----------------------------------------------------
+    GameSimulation()::load_map_game_over()
+
+    Called by the settings once the player loses.
+    Only marks the game as over.
+-------------------------------------------------- """
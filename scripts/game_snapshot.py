@@ -0,0 +1,195 @@
+import struct
+
+""" ---------------------------------------------------------------
+    GameSnapshot Class
+
+    The state of a game in progress packed into a small binary
+    blob, so the game can be saved when the player quits and
+    resumed later, and kept as the keyframes of a replay.
+    A snapshot keeps the score, the timers, the tetronimo queue,
+    the random number generator, the tetronimo falling, the
+    saved tetronimo and the tetronimo type of every cell of the
+    board. It is taken between two frames, so the rows found by
+    the tetronimo assembly are the full rows of the board.
+    A game that is filling the screen with grey blocks is lost
+    and has no snapshot.
+--------------------------------------------------------------- """
+class GameSnapshot():
+	# The first bytes of every snapshot and the version of its layout.
+	snapshot_magic = b"TTSV"
+	snapshot_version = 1
+	header_format = "<4sH"
+
+	# The fields of the settings kept by a snapshot and their layout, after the frame number
+	# and before the length of the tetronimo queue.
+	settings_field_names = ("tetronimo_assembly_state", "score", "rows_cleared", \
+			"pieces_placed", "next_tetronimo_type", "tetronimo_timer_cur", \
+			"tetronimo_timer_period", "tetronimo_timer_min_period", "remove_row_timer_period", \
+			"block_flash_period", "tetronimo_timer_period_cache", "delta_time_accum", \
+			"delta_time_accum_remove_row", "delta_time_accum_block_flash", "tetronimo_inc", \
+			"block_fill_pos_y")
+	settings_format = "<IBIIIBddddddddd?iB"
+
+	# The state of the random number generator: its 624 words, the index of the next word,
+	# and the next gaussian number if one is kept.
+	random_format = "<625I?d"
+
+	# The fields of a tetronimo falling kept by a snapshot and their layout, after a flag
+	# that is False when there is no tetronimo.
+	tetronimo_field_names = ("tetronimo_type", "position_x", "position_y", "rotation_state", \
+			"is_active", "is_falling", "can_move_left", "can_move_right", "can_rotate", \
+			"pressed_left", "pressed_right", "pressed_rotate", "pressed_autoland", \
+			"cur_horizontal_frame")
+	tetronimo_format = "<?BiiB?????????B"
+
+	@staticmethod
+	def can_capture(simulation):
+		#Check if a snapshot can be taken before the next frame of the game
+		settings = simulation.settings
+
+		return not simulation.is_game_over and settings.game_state == 0 and \
+				settings.tetronimo_assembly_state != 4
+
+	@staticmethod
+	def capture(simulation):
+		#Pack the state of the game before its next frame
+		settings = simulation.settings
+
+		data = bytearray(struct.pack(GameSnapshot.header_format, GameSnapshot.snapshot_magic, \
+				GameSnapshot.snapshot_version))
+		data.extend(struct.pack(GameSnapshot.settings_format, simulation.tick_count, \
+				*[getattr(settings, field_name) for field_name in \
+				GameSnapshot.settings_field_names], len(settings.tetronimo_type_queue)))
+		data.extend(settings.tetronimo_type_queue)
+
+		version, words, gauss_next = settings.random.getstate()
+		data.extend(struct.pack(GameSnapshot.random_format, *words, \
+				gauss_next is not None, gauss_next or 0.0))
+
+		#A tetronimo falling that has landed is destroyed at the end of its frame
+		for tetronimo_falling in (settings.cur_tetronimo_falling, \
+				settings.cached_tetronimo_falling):
+			if tetronimo_falling is None or tetronimo_falling.marked_for_deletion:
+				data.extend(struct.pack(GameSnapshot.tetronimo_format, False, 0, 0, 0, 0, \
+						*[False] * 9, 0))
+			else:
+				data.extend(struct.pack(GameSnapshot.tetronimo_format, True, \
+						*[getattr(tetronimo_falling, field_name) for field_name in \
+						GameSnapshot.tetronimo_field_names]))
+
+		#Every cell of the board is the tetronimo type of its landed block plus 1, or 0 if empty
+		data.extend(0 if block is None else block.tetronimo_type + 1 \
+				for row_blocks in settings.board.row_blocks for block in row_blocks)
+
+		return bytes(data)
+
+	@staticmethod
+	def restore(simulation, data):
+		#Rebuild the state of a snapshot on a game that was just started
+		settings = simulation.settings
+		board = settings.board
+		object_factory = simulation.object_factory
+
+		magic, version = struct.unpack_from(GameSnapshot.header_format, data, 0)
+
+		if magic != GameSnapshot.snapshot_magic or version != GameSnapshot.snapshot_version:
+			raise ValueError("Not a game snapshot")
+
+		position = struct.calcsize(GameSnapshot.header_format)
+		values = struct.unpack_from(GameSnapshot.settings_format, data, position)
+		position += struct.calcsize(GameSnapshot.settings_format)
+		simulation.tick_count = values[0]
+
+		for field_name, value in zip(GameSnapshot.settings_field_names, values[1:-1]):
+			setattr(settings, field_name, value)
+
+		queue_length = values[-1]
+		settings.tetronimo_type_queue[:] = data[position:position + queue_length]
+		position += queue_length
+
+		for index in range(0, len(settings.tetronimo_type_queue)):
+			settings.set_tetronimo_display_type(index, settings.tetronimo_type_queue[index])
+
+		values = struct.unpack_from(GameSnapshot.random_format, data, position)
+		position += struct.calcsize(GameSnapshot.random_format)
+		settings.random.setstate((3, values[:625], values[626] if values[625] else None))
+
+		tetronimos_falling = []
+
+		for index in range(0, 2):
+			values = struct.unpack_from(GameSnapshot.tetronimo_format, data, position)
+			position += struct.calcsize(GameSnapshot.tetronimo_format)
+
+			if not values[0]:
+				tetronimos_falling.append(None)
+				continue
+
+			tetronimo_falling = object_factory.create_tetronimo_falling(values[2], \
+					values[3], values[1])
+
+			for field_name, value in zip(GameSnapshot.tetronimo_field_names, values[1:]):
+				setattr(tetronimo_falling, field_name, value)
+
+			tetronimo_falling.rotate_blocks()
+
+			for block in tetronimo_falling.tetronimo_blocks:
+				block.is_active = tetronimo_falling.is_active
+
+			tetronimos_falling.append(tetronimo_falling)
+
+		settings.cur_tetronimo_falling, settings.cached_tetronimo_falling = tetronimos_falling
+
+		if settings.cached_tetronimo_falling is not None:
+			settings.set_tetronimo_display_type(settings.saved_tetronimo_display_index, \
+					settings.cached_tetronimo_falling.tetronimo_type)
+
+		#Create every landed block in one pass, then fill the board with them in one pass
+		cells = []
+		half_cell_size = board.cell_size // 2
+
+		for row in range(0, board.row_count):
+			position_y = board.get_position_y(row)
+
+			for column in range(0, board.column_count):
+				if data[position] != 0:
+					cells.append((board.origin_x + column * board.cell_size + half_cell_size, \
+							position_y, data[position] - 1))
+
+				position += 1
+
+		board.load_blocks(object_factory.create_landed_tetronimo_blocks(cells))
+
+		#The rows being cleared are the full rows of the board
+		settings.tetronimo_rows.clear()
+
+		if settings.tetronimo_assembly_state == 2:
+			for row in board.get_full_rows():
+				settings.tetronimo_rows[board.get_position_y(row)] = board.get_blocks_in_row(row)
+
+""" --------------------------------------------------
+    GameSnapshot()::can_capture()
+
+    Check if a snapshot can be taken before the next frame
+    of the game. The game must be playing and not filling
+    the screen with grey blocks.
+-----------------------------------------------------
+    GameSnapshot()::capture()
+
+    Pack the state of the game before its next frame:
+        - the magic and the version of the layout.
+	- the frame number, the fields of the settings and
+	      the tetronimo queue.
+	- the state of the random number generator.
+	- the tetronimo falling and the saved tetronimo.
+	      A tetronimo falling that has landed is left out.
+	- the tetronimo type of every cell of the board.
+-----------------------------------------------------
+    GameSnapshot()::restore()
+
+    Rebuild the state of a snapshot on a game that was
+    just started. Set the settings, the random number
+    generator and the tetronimos falling, then create
+    every landed block with a single call to the object
+    factory and fill the board with them in one pass.
+    Find the rows being cleared again from the board.
+-------------------------------------------------- """
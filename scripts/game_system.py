@@ -1,11 +1,26 @@
+import os
+import random
+import time
+
 import pygame
 
+from asset_bundle import AssetBundle
+from asset_loader import AssetLoader
 from game_object import GameObject
 from input_manager import InputManager
 from sprite_image import SpriteImage
-from object_factory import ObjectFactory
-from settings import Settings
 from button import Button
+from high_score_store import HighScoreStore
+from text_surface_cache import TextSurfaceCache
+from map_background import MapBackground
+from sprite_atlas import SpriteAtlas
+from render_queue import RenderQueue
+from audio_manager import AudioManager
+from game_simulation import GameSimulation
+from replay import Replay
+from game_snapshot import GameSnapshot
+from perf_hud import PerfHud
+from frame_tracer import FrameTracer
 
 """ ----------------------------------------------------------------
     GameSystem class
@@ -13,14 +28,68 @@ from button import Button
     The primary game system that is the skeleton of the entire game.
     It contains the setup functions as well as the main game loop
     and collision detection functions.
+    The gameplay itself is run by the game simulation, which the
+    game system drives with the pygame input, clock and display.
 ---------------------------------------------------------------- """
 class GameSystem:
+	# The sprites of the gameplay. They are loaded on the worker thread of the asset loader.
+	gameplay_sprite_names = [
+		"debug_1.png",
+		"debug_2.png",
+		"wall_in_up.png",
+		"wall_in_down.png",
+		"wall_in_left.png",
+		"wall_in_right.png",
+		"wall_in_upright.png",
+		"wall_in_downright.png",
+		"wall_in_downleft.png",
+		"wall_in_upleft.png",
+		"wall_in_center.png",
+		"wall_in_hor.png",
+		"wall_in_leftT.png",
+		"wall_in_rightT.png",
+		"wall_out_center.png",
+		"wall_out_hor.png",
+		"wall_out_vertical_left.png",
+		"wall_out_vertical_right.png",
+		"wall_out_vertical_left_fade.png",
+		"wall_out_vertical_right_fade.png",
+		"block_yellow.png",
+		"block_skyblue.png",
+		"block_orange.png",
+		"block_blue.png",
+		"block_green.png",
+		"block_red.png",
+		"block_purple.png",
+		"block_grey.png",
+		"display_none.png",
+		"display_O.png",
+		"display_I.png",
+		"display_J.png",
+		"display_L.png",
+		"display_S.png",
+		"display_Z.png",
+		"display_T.png",
+	]
+	
 	def __init__(self):
 		#initialize with a flag to check if active, a timer, a clock, and a backbuffer
+		#In turbo mode the simulation runs as fast as it can between frames
 		self.is_active = True
+		self.is_turbo = False
 		self.delta_time = 0.0
 		self.pygame_clock = None
 		self.backbuffer = None
+		self.start_time = 0.0
+		self.startup_time = 0.0
+		self.time_to_first_frame = None
+		self.gameplay_ready_time = None
+		self.game_start_time = None
+		self.time_to_first_game_frame = None
+		self.game_seed = None
+		self.replay_url = None
+		self.saved_game_url = "../data/saved_game.bin"
+		self.trace_url = None
 		
 		#initialize an assortment of RGB assigned colors
 		self.color_red = (255, 0, 0)
@@ -46,87 +115,118 @@ class GameSystem:
 		self.button_z = None
 		self.button_x = None
 		self.button_c = None	
+		self.button_a = None
 		
 		#initialize the necessary objects from other classes
 		self.input_manager = InputManager(self)
-		self.object_factory = None
-		self.settings = None
-		self.game_objects = {}
-		self.test_objects = {}
-		self.gui_tile_objects = {}
-		self.gui_text_objects = {}
-		self.tetronimos_falling = {}
-		self.tetronimo_blocks = {}
-		self.tetronimo_displays = {}
+		self.simulation = GameSimulation(self.input_manager)
+		self.object_registry = self.simulation.object_registry
+		self.render_queue = RenderQueue(3)
+		self.object_registry.render_queue = self.render_queue
+		self.game_objects = self.object_registry.game_objects
+		self.test_objects = self.object_registry.get_objects_with_tag(0)
+		self.gui_tile_objects = self.object_registry.get_objects_with_tag(1)
+		self.gui_text_objects = self.object_registry.get_objects_with_tag(2)
+		self.tetronimos_falling = self.object_registry.get_objects_with_tag(3)
+		self.tetronimo_blocks = self.object_registry.get_objects_with_tag(4)
+		self.tetronimo_displays = self.object_registry.get_objects_with_tag(5)
+		self.tetronimo_ghost = None
+		self.perf_hud = None
+		self.frame_tracer = None
 		self.pygame_sprites = {}
 		self.fonts = {}
-		self.settings = Settings()
-		self.object_factory = ObjectFactory(self.game_objects, self.pygame_sprites, self.fonts)
+		self.settings = self.simulation.settings
+		self.high_score_store = HighScoreStore("../data/high_score.txt")
+		self.text_surface_cache = TextSurfaceCache(256)
+		self.asset_bundle = AssetBundle("../assets.bundle", "../")
+		self.asset_loader = AssetLoader()
+		self.map_background = MapBackground(640, 800, 16, 40, "../images/", "../data/cache/", \
+				self.asset_bundle)
+		self.sprite_atlas = SpriteAtlas("../images/", "../data/cache/", 512, \
+				self.asset_bundle)
+		self.audio_manager = AudioManager("../audio/", self.asset_bundle)
+		self.object_factory = self.simulation.object_factory
 		
 		#initilaize the required settings
-		self.settings.object_factory = self.object_factory
-		self.settings.tetronimos_falling = self.tetronimos_falling
-		self.settings.tetronimo_blocks = self.tetronimo_blocks
-		self.settings.input_manager = self.input_manager
 		self.settings.game_system = self
-		self.object_factory.settings = self.settings
-		self.object_factory.input_manager = self.input_manager
+		self.settings.high_score_store = self.high_score_store
+		self.settings.audio_manager = self.audio_manager
+		self.object_factory.pygame_sprites = self.pygame_sprites
+		self.object_factory.fonts = self.fonts
+		self.object_factory.text_surface_cache = self.text_surface_cache
 		
 	def start_program(self):
 		#This function starts off the program, initializing pygame
 		# and loading all the sprites, sounds, and fonts
-		self.setup_pygame()
-		self.load_sprites()
-		self.load_fonts()
+		#The assets come from the asset bundle if there is one, or else from the loose files
+		#The title screen only needs the fonts, so it is shown while the gameplay assets load
+		#The frames are traced from the first frame of the main loop if there is a trace file
+		self.start_time = time.perf_counter()
+		self.load_assets()
+		self.start_loading_gameplay_assets()
 		self.setup_title_screen()
+		
+		if self.trace_url is not None:
+			self.frame_tracer = FrameTracer(self)
+			self.frame_tracer.enable()
+			
 		self.main_loop()
 		
+	def load_assets(self):
+		#Open the asset bundle, set up pygame and load the fonts
+		#Remember how long the cold start took
+		start_time = time.perf_counter()
+		
+		self.asset_bundle.open()
+		self.setup_pygame()
+		self.load_fonts()
+		
+		self.startup_time = time.perf_counter() - start_time
+		
 	def load_sprites(self):
-		#Assign the image folder url
-		image_folder_url = "../images/"
-		
-		#Load all the sprites from the image folder
-		self.load_sprite(image_folder_url, "debug_1.png")
-		self.load_sprite(image_folder_url, "debug_2.png")
-		self.load_sprite(image_folder_url, "wall_in_up.png")
-		self.load_sprite(image_folder_url, "wall_in_down.png")
-		self.load_sprite(image_folder_url, "wall_in_left.png")
-		self.load_sprite(image_folder_url, "wall_in_right.png")
-		self.load_sprite(image_folder_url, "wall_in_upright.png")
-		self.load_sprite(image_folder_url, "wall_in_downright.png")
-		self.load_sprite(image_folder_url, "wall_in_downleft.png")
-		self.load_sprite(image_folder_url, "wall_in_upleft.png")
-		self.load_sprite(image_folder_url, "wall_in_center.png")
-		self.load_sprite(image_folder_url, "wall_in_hor.png")
-		self.load_sprite(image_folder_url, "wall_in_leftT.png")
-		self.load_sprite(image_folder_url, "wall_in_rightT.png")
-		self.load_sprite(image_folder_url, "wall_out_center.png")
-		self.load_sprite(image_folder_url, "wall_out_hor.png")
-		self.load_sprite(image_folder_url, "wall_out_vertical_left.png")
-		self.load_sprite(image_folder_url, "wall_out_vertical_right.png")
-		self.load_sprite(image_folder_url, "wall_out_vertical_left_fade.png")
-		self.load_sprite(image_folder_url, "wall_out_vertical_right_fade.png")
-		self.load_sprite(image_folder_url, "block_yellow.png")
-		self.load_sprite(image_folder_url, "block_skyblue.png")
-		self.load_sprite(image_folder_url, "block_orange.png")
-		self.load_sprite(image_folder_url, "block_blue.png")
-		self.load_sprite(image_folder_url, "block_green.png")
-		self.load_sprite(image_folder_url, "block_red.png")
-		self.load_sprite(image_folder_url, "block_purple.png")
-		self.load_sprite(image_folder_url, "block_grey.png")
-		self.load_sprite(image_folder_url, "display_none.png")
-		self.load_sprite(image_folder_url, "display_O.png")
-		self.load_sprite(image_folder_url, "display_I.png")
-		self.load_sprite(image_folder_url, "display_J.png")
-		self.load_sprite(image_folder_url, "display_L.png")
-		self.load_sprite(image_folder_url, "display_S.png")
-		self.load_sprite(image_folder_url, "display_Z.png")
-		self.load_sprite(image_folder_url, "display_T.png")
-		
-	def load_sprite(self, image_folder_url, cur_sprite_image_name):
-		#Load a single sprite from the images folder.
-		self.pygame_sprites[cur_sprite_image_name] = pygame.image.load( \
-			image_folder_url + cur_sprite_image_name)
+		#Load all the gameplay sprites from the sprite atlas of the image folder right away
+		#The atlas is packed from the images and converted to the display format
+		self.pygame_sprites.update(self.sprite_atlas.load(self.gameplay_sprite_names))
+		self.create_ghost_sprites()
+		
+	def start_loading_gameplay_assets(self):
+		#Load the gameplay sprites, the sound effects and the music on the worker thread of the
+		#asset loader, while the title screen is shown. Every asset has its own future
+		self.asset_loader.load("sprites", self.sprite_atlas.load_surface, \
+				self.gameplay_sprite_names)
+		
+		for sound_name in self.audio_manager.sound_file_names:
+			self.asset_loader.load("sound " + sound_name, self.audio_manager.decode_sound, \
+					self.audio_manager.sound_file_names[sound_name])
+			
+		self.asset_loader.load("music tetris_a.ogg", self.audio_manager.read_music, \
+				"tetris_a.ogg")
+		
+	def finish_loading_gameplay_assets(self):
+		#Wait for the gameplay assets still loading and hand them out
+		#The sprite atlas is converted to the display format here, on the main thread
+		for asset_name, asset in self.asset_loader.pop_all().items():
+			asset_type, asset_key = (asset_name.split(" ", 1) + [None])[0:2]
+			
+			if asset_type == "sprites":
+				self.pygame_sprites.update(self.sprite_atlas.get_sprites( \
+						self.gameplay_sprite_names))
+				self.create_ghost_sprites()
+			elif asset_type == "sound":
+				self.audio_manager.sounds[asset_key] = asset
+			elif asset_type == "music":
+				self.audio_manager.music_datas[asset_key] = asset
+				
+		if self.gameplay_ready_time is None:
+			self.gameplay_ready_time = time.perf_counter() - self.start_time
+	
+	def create_ghost_sprites(self):
+		#Create the faded sprites of the ghost blocks from the block sprites
+		for sprite_name in self.gameplay_sprite_names:
+			if sprite_name.startswith("block_"):
+				ghost_sprite = self.pygame_sprites[sprite_name].copy()
+				ghost_sprite.set_alpha(80)
+				self.pygame_sprites["ghost_" + sprite_name[len("block_"):]] = ghost_sprite
 	
 	def load_fonts(self):
 		#Assign the fonts url
@@ -138,7 +238,8 @@ class GameSystem:
 	
 	def load_font(self, fonts_url, font_file_name, font_key_name, size):
 		#Load an individual font file
-		font1 = pygame.font.Font(fonts_url + font_file_name, size)
+		font1 = pygame.font.Font(self.asset_bundle.get_asset_source(fonts_url + \
+				font_file_name), size)
 		
 		# Assign the current font being loaded
 		self.fonts[font_key_name] = font1
@@ -148,42 +249,52 @@ class GameSystem:
 		#Get the pygame clock and backbuffer,
 		#And set the caption for the game window
 		pygame.init()
-		self.settings.init_audio()
+		self.audio_manager.init()
 		self.pygame_clock = pygame.time.Clock()
 		self.backbuffer = pygame.display.set_mode((640, 800))
 		pygame.display.set_caption("Tired of Tetris' Team - Tetris Game")
 		
 	def setup_title_screen(self):
 		#Assign the code for setting up the title screen
-		highscore = open("../data/high_score.txt", "a+")
-		highscore = open("../data/high_score.txt", "r+")
-		highscore = highscore.read()
-
-		#Assign the high score file
-		if not highscore: 
-			whighscore = open("../data/high_score.txt", "w+")
-			whighscore.write(str(0))
-			whighscore.close()
+		highscore = self.high_score_store.high_score
 
 		#Assign the high score number
 		self.button_game_title = Button(self.fonts["PressStart2P-medium"], \
-			self.color_cosmic_blue, 120, 0, 400, 100, "Let's Play Tetris")
+			self.color_cosmic_blue, 120, 0, 400, 100, "Let's Play Tetris", \
+			self.text_surface_cache)
+		#A game saved when the player last quit is resumed by the play button
+		play_text = 'Play Tetris'
+		
+		if os.path.isfile(self.saved_game_url):
+			play_text = 'Resume Tetris'
+			
 		self.button_play_tetris = Button(self.fonts["PressStart2P-medium"], \
-			self.color_green, 120, 100, 400, 100, 'Play Tetris')
+			self.color_green, 120, 100, 400, 100, play_text, \
+			self.text_surface_cache)
 		self.button_quit = Button(self.fonts["PressStart2P-medium"], \
-			self.color_blue, 120, 225, 400, 100, 'Quit')
+			self.color_blue, 120, 225, 400, 100, 'Quit', \
+			self.text_surface_cache)
 		self.button_high_score = Button(self.fonts["PressStart2P-medium"], \
-			self.color_pink, 20, 350, 600, 100, "High Score: " + str(highscore))
+			self.color_pink, 20, 350, 600, 100, "High Score: " + str(highscore), \
+			self.text_surface_cache)
 		self.button_q = Button(self.fonts["PressStart2P-small"], \
-			self.color_cosmic_blue, 20, 475, 600, 30, "Press q to quit.")
+			self.color_cosmic_blue, 20, 475, 600, 30, "Press q to save and quit.", \
+			self.text_surface_cache)
 		self.button_arrow = Button(self.fonts["PressStart2P-small"], \
-			self.color_cosmic_blue, 20, 500, 600, 30, "Press arrow keys to move tetrimino.")
+			self.color_cosmic_blue, 20, 500, 600, 30, "Press arrow keys to move tetrimino.", \
+			self.text_surface_cache)
 		self.button_z = Button(self.fonts["PressStart2P-small"], \
-			self.color_cosmic_blue, 20, 525, 600, 30, "Press z to rotate tetrimino.")
+			self.color_cosmic_blue, 20, 525, 600, 30, "Press z to rotate tetrimino.", \
+			self.text_surface_cache)
 		self.button_x = Button(self.fonts["PressStart2P-small"], \
-			self.color_cosmic_blue, 20, 550, 600, 30, "Press x to drop tetrimino.")
+			self.color_cosmic_blue, 20, 550, 600, 30, "Press x to drop tetrimino.", \
+			self.text_surface_cache)
 		self.button_c = Button(self.fonts["PressStart2P-small"], \
-			self.color_cosmic_blue, 20, 575, 600, 30, "Press c to save tetrimino.")
+			self.color_cosmic_blue, 20, 575, 600, 30, "Press c to save tetrimino.", \
+			self.text_surface_cache)
+		self.button_a = Button(self.fonts["PressStart2P-small"], \
+			self.color_cosmic_blue, 20, 600, 600, 30, "Press a to let the bot play.", \
+			self.text_surface_cache)
 			
 		
 	def title_screen_update(self):
@@ -215,6 +326,10 @@ class GameSystem:
 	
 	def setup_classic_game(self):	
 		#Setup a classic game map and load the gameplay
+		#The gameplay assets must have finished loading first
+		#A key tapped before the game started is not carried into its first tick
+		self.game_start_time = time.perf_counter()
+		self.finish_loading_gameplay_assets()
 		self.load_map_gameplay()
 		text = "NEXT:"
 		color = (0, 0, 0)
@@ -237,18 +352,10 @@ class GameSystem:
 		self.settings.text_box_score = self.object_factory.create_text_box(565, 145, str(self.settings.score), "PressStart2P-small", 
 				color_white, False)
 		
-		#Read in highscore from high_score.txt file
-		highscore = open("../data/high_score.txt", "r+")
-		highscore = highscore.read()
-
-		#If the score is less than or equal to highscore, then print high score
-		if int(self.settings.score) <= int(highscore):
-			self.settings.text_box_highscore = self.object_factory.create_text_box(565, 70, str(highscore), "PressStart2P-small", 
-				color_white, False)
-		#If the score is greater than the highscore then print highscore will wturn to score number
-		if int(self.settings.score) > int(highscore):
-			self.settings.text_box_highscore = self.object_factory.create_text_box(565, 70, str(self.settings.score), "PressStart2P-small", 
-				color_white, False)
+		#Read in highscore from the high score store
+		highscore = self.high_score_store.submit_score(self.settings.score)
+		self.settings.text_box_highscore = self.object_factory.create_text_box(565, 70, str(highscore), "PressStart2P-small", 
+			color_white, False)
 		
 		#Create the teteronimo display objects
 		self.settings.tetronimo_displays.append( \
@@ -262,108 +369,77 @@ class GameSystem:
 		self.settings.tetronimo_displays.append( \
 				self.object_factory.create_tetronimo_display(80, 726))
 		
+		#Create the ghost that shows where the teteronimo falling would land
+		self.tetronimo_ghost = self.object_factory.create_tetronimo_ghost()
+		
+		#Every game gets its own seed and starts with an empty tetronimo queue, so it can be
+		#recorded and played again
+		self.game_seed = random.getrandbits(32)
+		self.settings.seed_random(self.game_seed)
+		self.settings.tetronimo_type_queue.clear()
+		
 		self.settings.game_state = 0
 		self.settings.reset_tetronimo_assembly()
+		self.simulation.time_accum = 0.0
+		self.simulation.tick_count = 0
+		self.input_manager.reset_tapped_keys()
 		
-		pygame.mixer.music.load(self.settings.tetris_a_url)
-		pygame.mixer.music.play(8, 0.0)
+		if self.replay_url is not None:
+			self.simulation.replay = Replay(self.game_seed)
+			
+		self.resume_saved_game()
+		
+		self.audio_manager.play_music("tetris_a.ogg", 8)
+		
+	def save_game(self):
+		#Save the game in progress as a game snapshot, so the next game resumes it
+		#A lost game is not saved
+		if self.settings.game_state != 0:
+			return
+			
+		snapshot = self.simulation.save_snapshot()
+		
+		if snapshot is not None:
+			with open(self.saved_game_url, "wb") as out_file:
+				out_file.write(snapshot)
+				
+	def resume_saved_game(self):
+		#Restore the saved game on the game that was just set up, then remove the save
+		#A resumed game did not start from its seed, so it is not recorded
+		if not os.path.isfile(self.saved_game_url):
+			return
+			
+		with open(self.saved_game_url, "rb") as in_file:
+			snapshot = in_file.read()
+			
+		os.remove(self.saved_game_url)
+		GameSnapshot.restore(self.simulation, snapshot)
+		self.simulation.replay = None
 		
 	def load_map_gameplay(self):
 		#First clear the previous game objects
 		self.clear_gameplay_objects()
-		with open("../data/map_gameplay.txt", "r") as in_file:
-			map_text = in_file.read()
-			cur_position_x = 8
-			cur_position_y = 8
-			
-			#Use with to ensure that the file is read entirely, for all x,y positions and their characters
-			for char in map_text:
-				if not char == '\n':				
-					if char == 'C':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_center.png")
-					elif char == 'c' or char == ' ':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_out_center.png")
-					elif char == 'U':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_up.png")
-					elif char == 'D':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_down.png")
-					elif char == 'L':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_left.png")
-					elif char == 'R':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_right.png")
-					elif char == 'H':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_hor.png")
-					elif char == 'h':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_out_hor.png")
-					elif char == 'l':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_out_vertical_left.png")
-					elif char == 'r':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_out_vertical_right.png")
-					elif char == ',':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_out_vertical_left_fade.png")
-					elif char == '.':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_out_vertical_right_fade.png")
-					elif char == '/':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_upleft.png")
-					elif char == '\\':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_upright.png")
-					elif char == '[':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_downleft.png")
-					elif char == ']':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_downright.png")
-					elif char == 'T':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_leftT.png")
-					elif char == 't':
-						self.object_factory.create_gui_wall(
-								cur_position_x, cur_position_y, "wall_in_rightT.png")
-						
-					cur_position_x += 16
-
-					if cur_position_x >= (40 * 16) + 8:
-						cur_position_x = 8
-						cur_position_y += 16
+		
+		#The wall tiles never move, so they are baked into a single background surface
+		#instead of being created as game objects
+		self.map_background.load("../data/map_gameplay.txt", self.pygame_sprites)
 			
 	
 	def load_map_game_over(self):
 		#Loads the game over map after the player loses
+		#Save the replay of the game before its stats are reset
+		self.save_replay()
+		
 		#First clear the previous game objects
 		self.clear_gameplay_objects()
 		
+		#Write the high score back now that the game is over
+		self.high_score_store.flush()
+		
 		self.setup_title_screen()
 		
 		self.settings.game_state = 1
-		self.settings.score = 0
-		self.settings.tetronimo_assembly_state = 0
-		self.settings.tetronimo_timer_cur = 0
-		self.settings.next_tetronimo_type = 0
-		self.settings.rows_cleared = 0
-		self.settings.tetronimo_timer_period = 1000.0
-		self.settings.tetronimo_timer_min_period = 50.0
-		self.settings.remove_row_timer_period = 1000.0
-		self.settings.block_flash_period = 200.0
-		self.settings.tetronimo_timer_period_cache = self.settings.tetronimo_timer_period
-		self.settings.delta_time_accum = 0.0
-		self.settings.delta_time_accum_remove_row = 0.0
-		self.settings.delta_time_accum_block_flash = 0.0
-		self.settings.block_fill_pos_y = self.settings.tetronimo_container_bounds[3]
-		self.settings.tetronimo_inc = False
+		self.settings.reset_game()
 		self.settings.tetronimo_displays.clear()
 		
 	def clear_gameplay_objects(self):
@@ -375,20 +451,32 @@ class GameSystem:
 			cur_tag = cur_game_obj.tag
 			
 			if cur_tag == 0 or cur_tag == 1 or cur_tag == 2 or cur_tag == 3 or \
-					cur_tag == 4 or cur_tag == 5:
-				cur_game_obj.marked_for_deletion = True
+					cur_tag == 4 or cur_tag == 5 or cur_tag == 6:
+				cur_game_obj.mark_for_deletion()
+				
+		self.tetronimo_ghost = None
 			
 	def main_loop(self):
 		"""
 		The main loop for updating the game objects and updating all of the engine components.
 		At the entrance to the main loop,
 		    The game will continue to loop until is_active is set to false.
-		Manage the frame rate to 60 fps.
-		Reset the tapped keys in the input manager.
+		Manage the frame rate to 60 fps. The frame rate is not capped in turbo mode.
+		Start the next frame of the frame trace if the frames are traced, when
+		the game was started with --trace or TETRIS_TRACE. The frame that ended
+		is recorded, and F4 writes the frames kept to the trace file at once.
 		Check the keyboard input events.
+		    The tapped keys are not reset here. Every tick of the game
+		    simulation resets them after reading them, so a key tapped
+		    and released on a frame that runs no tick is read by the
+		    next tick.
 		If the q key is pressed, then exit the game.
 		Otherwise, update the game state.
-		    Gather the game object types
+		    Run a fixed tick of the game simulation for every 1/60 of a second
+		    that passed, up to a few ticks to catch up after a slow frame.
+		    In turbo mode, run ticks back to back for a frame of real time.
+		    Every tick does the following.
+		    Take the teteronimos falling that exist before the update
 		    Update the game objects
 		    Update the teteronimos falling.
 			The current game object being updated
@@ -397,14 +485,25 @@ class GameSystem:
 			The current game object being updated
 			Only pupdate game objects that are active
 			Update the collision detection
+		    Destroy the game objects marked for deletion
+		Play the sounds queued by the ticks of the frame
 		Render the game objects
+		Remember the time to the first frame once it is rendered,
+		and the time from a game start to its first frame.
 		Lastly, clean up the game engine when finished.
 		"""
 		
 		while self.is_active:
-			self.pygame_clock.tick(60)
+			if self.is_turbo:
+				self.pygame_clock.tick()
+			else:
+				self.pygame_clock.tick(60)
 			self.delta_time = self.pygame_clock.get_time()
-			self.input_manager.reset_tapped_keys()	
+			
+			if self.frame_tracer is not None:
+				self.frame_tracer.begin_frame()
+				
+			#A tapped key is reset by the tick that reads it, as a short frame may run no tick
 			self.input_manager.check_events()
 			
 			if self.input_manager.pressed_q:
@@ -412,65 +511,52 @@ class GameSystem:
 			else:
 				if self.settings.game_state == 1:
 					self.title_screen_update()
+				elif self.is_turbo:
+					#Run as many ticks as fit in a 60 fps frame of real time
+					self.simulation.advance_turbo(1000.0 / 60.0)
 				else:
-					self.gather_objects()
-					self.settings.update(self.delta_time)
-					
-					for key in self.tetronimos_falling:
-						cur_object = self.tetronimos_falling[key]
-						if cur_object.is_active:
-							cur_object.update(self.delta_time)		
-					for key in self.tetronimo_displays:
-						cur_object = self.tetronimo_displays[key]
-						if cur_object.is_active:
-							cur_object.update(self.delta_time)
-						
-					self.destroy_objects_marked_for_deletion()
-					self.destroy_objects_marked_for_deletion()
-					self.gather_objects()
+					#The game simulation runs a fixed tick for every 1/60 of a second that 
+					#passed. Every tick updates the settings, the teteronimos falling and 
+					#the teteronimo displays, then destroys the game objects marked for deletion
+					self.simulation.advance(self.delta_time)
 				
+				#The ghost only needs to follow the teteronimo falling once per frame
+				if self.tetronimo_ghost is not None and self.settings.game_state == 0:
+					self.tetronimo_ghost.update(self.delta_time)
+					
+				#Play the sounds triggered by the ticks of this frame together
+				self.audio_manager.play_queued_sounds()
 				self.render_objects()
 				
+				if self.time_to_first_frame is None:
+					self.time_to_first_frame = time.perf_counter() - self.start_time
+				if self.game_start_time is not None and self.settings.game_state == 0:
+					self.time_to_first_game_frame = time.perf_counter() - self.game_start_time
+					self.game_start_time = None
+				
 		self.clean_up()
 		
 	def destroy_objects_marked_for_deletion(self):
 		"""
 		Destroy the game objects that are marked for deletion
-		Initialize the empty keys of the dictionary
-		For each key,
-		    Assign the current game object to be deleted
-		If marked for deletion,
-		    remove the game object from the game object dictionary.
-		For all these keys, pop/remove the keys.
+		Only the game objects marked since the last call are visited.
+		The object registry removes them from the game objects and
+		from the index of their tag.
 		"""		
-		empty_keys = []
-		
-		for key in self.game_objects:
-			cur_object = self.game_objects[key]	
-			if cur_object.marked_for_deletion:
-				self.game_objects[key] = None
-				empty_keys.append(key)
-				
-		for key in empty_keys:
-			self.game_objects.pop(key, None)
+		self.object_registry.destroy_objects_marked_for_deletion()
 		
 	def render_objects(self):
 		"""
 		Render all the game objects to the screen.
-		Default set buffer to render a black screen.
-		Otherwise, fill the back ground with black first
-		Then, Render every object in the group. Render every object by layer from 0 to 3.
-		And for each object in the group, 
-		    Assign the current game object to be rendered.
-		Only render game obects that are active
-		If active,
-		    Assign the current sprite of the game object being rendered
-		    If no image, don't render it.
-		    Update the object rect for the rendering process
-		    Assign the current image being rendered.
-		    Assign the rect of the current image being rendered.
-		    Blit the sprite to the backbuffer.
-		Lastly, swap the backbuffer.		
+		On the title screen, draw the buttons and swap the whole backbuffer.
+		The game will be fully redrawn once it starts.
+		Otherwise, render with the render queue.
+		    Only the game objects that moved, changed sprite or were hidden
+		    get a new rect, and their old and new rects are marked dirty.
+		    For every dirty rect, blit the pre-rendered map background under it
+		    and then every visible game object touching it, by layer from 0 to 3.
+		    Lastly, update only the dirty rects of the display.
+		Draw the performance overlay over either screen if it is shown.
 		"""		
 		if self.settings.game_state == 1:
 			self.backbuffer.fill(self.color_cosmic_blue)
@@ -483,105 +569,149 @@ class GameSystem:
 			self.button_z.draw(self.backbuffer, self.color_Black)
 			self.button_x.draw(self.backbuffer, self.color_Black)
 			self.button_c.draw(self.backbuffer, self.color_Black)
+			self.button_a.draw(self.backbuffer, self.color_Black)
+			
+			if self.perf_hud is not None:
+				self.perf_hud.draw(self.backbuffer)
+				
+			pygame.display.flip()
+			
+			#The title screen covers the whole screen, so the game has to be redrawn fully
+			self.render_queue.invalidate()
 		else:
-			self.backbuffer.fill((0, 0, 0))
-	
-			for x in range (0, 3):
-				for key in self.game_objects:
-					cur_game_obj = self.game_objects[key]
-					
-					if cur_game_obj.is_active:
-						cur_sprite_image = cur_game_obj.cur_sprite_image
-						
-						if cur_sprite_image is not None and \
-							cur_sprite_image.image_layer == x and \
-							cur_sprite_image.image is not None and \
-							cur_sprite_image.image_rect is not None:	
-							cur_sprite_image.update_image_rect(cur_game_obj.position_x, cur_game_obj.position_y)
-							cur_image = cur_sprite_image.image
-							cur_rect = cur_sprite_image.image_rect
-							self.backbuffer.blit(cur_image, cur_rect)
-		pygame.display.flip()
-		
-	def gather_objects(self):
-		"""
-		Gathers all of the game objects by tag type for processing.
-		By First, clear all the previous game object references.
-		Then, gather all the game objects and place them in their proper dictionaries.
-		And for each object,
-		    Assign the current game object to be examined.
-		Assign the current game object id
-		Check the tag to tell which dictionary to put the object reference in.		
-		"""
-		self.test_objects.clear()
-		self.gui_tile_objects.clear()
-		self.gui_text_objects.clear()
-		self.tetronimos_falling.clear()
-		self.tetronimo_blocks.clear()
-		self.tetronimo_displays.clear()
-		for key in self.game_objects:
-			cur_game_obj = self.game_objects[key]
-			object_id = cur_game_obj.object_id
+			self.render_queue.render(self.backbuffer, self.map_background.surface)
+			
+			if self.perf_hud is not None:
+				self.perf_hud.draw(self.backbuffer)
+				pygame.display.update(self.perf_hud.panel_rect)
+				
+	def toggle_perf_hud(self):
+		#Show or hide the performance overlay. The screen under it is redrawn once it is hidden
+		if self.perf_hud is None:
+			self.perf_hud = PerfHud(self)
+			self.perf_hud.enable()
+		else:
+			self.perf_hud.disable()
+			self.render_queue.dirty_rects.append(self.perf_hud.panel_rect)
+			self.perf_hud = None
+		
+	def save_trace(self):
+		#Write the frames kept by the frame tracer to the trace file, if the frames are traced
+		if self.frame_tracer is not None:
+			self.frame_tracer.save(self.trace_url)
 			
-			if cur_game_obj.tag == 0:
-				self.test_objects[object_id] = cur_game_obj
-			elif cur_game_obj.tag == 1:
-				self.gui_tile_objects[object_id] = cur_game_obj
-			elif cur_game_obj.tag == 2:
-				self.gui_text_objects[object_id] = cur_game_obj
-			elif cur_game_obj.tag == 3:
-				self.tetronimos_falling[object_id] = cur_game_obj
-			elif cur_game_obj.tag == 4:
-				self.tetronimo_blocks[object_id] = cur_game_obj
-			elif cur_game_obj.tag == 5:
-				self.tetronimo_displays[object_id] = cur_game_obj
-	@staticmethod
-	def clean_up():
-		#Cleans up the game system after it is finished working. Exit pygame
+	def save_replay(self):
+		#Write the replay of the game being recorded with its stats so far
+		replay = self.simulation.replay
+		
+		if replay is not None:
+			replay.record_stats(self.settings)
+			replay.save(self.replay_url)
+			self.simulation.replay = None
+			
+	def clean_up(self):
+		#Cleans up the game system after it is finished working. Save the high score and exit pygame
+		#A game quit before it is over is saved to be resumed, and still has its replay saved
+		#The last frames are written to the trace file if the frames are traced
+		self.save_game()
+		self.save_replay()
+		self.save_trace()
+		self.asset_loader.shutdown()
+		self.high_score_store.close()
 		pygame.quit()
 """ -------------------------------------------------------------------------
     Initialize each GameSystem object with:
         - a flag that checks if the game is currently active.
+	- a flag that checks if the game runs in turbo mode.
 	- a time the current time elapsed in milliseconds.
 	- the pygame clock for limiting the framerate.
 	- a backbuffer being rendered to.
+	- the time the program started, in seconds.
+	- the time the cold start took until the fonts were loaded, in seconds.
+	- the time from the program start to the first frame, in seconds.
+	- the time from the program start until the gameplay assets were
+	      handed out, in seconds.
+	- the time the last game started, until its first frame is rendered.
+	- the time from the last game start to its first frame, in seconds.
+	- the seed of the tetronimos of the last game.
+	- the file every game is recorded to as a replay, or None.
+	- the file the game in progress is saved to when the player quits.
+	- the file the frame trace is written to, or None if the frames are
+	      not traced.
 	- an assortment of RGB assigned colors
 	- a collection of buttons for the title screen.
 	- an input manager for managing keyboard and mouse input.
-	- a game object factory for creating the game objects.
-	- a settings object for managing the gameplay code.
+	- the game simulation that runs the gameplay without pygame.
+	- a game object factory for creating the game objects,
+	      taken from the game simulation.
+	- a settings object for managing the gameplay code,
+	      taken from the game simulation.
+	- the object registry of the game simulation. It is updated by the
+	      object factory when game objects are created and destroyed.
+	- the render queue that redraws only what changed on screen.
 	- game objects for the game. Keys are the game object ids.
-	- test object references.
-	- GUI tile objects.
-	- GUI text objects.
-	- the tetronimos falling. This is updated every frame
-	      from objects gathered from the game_objects dictionary.
+	- test object references, indexed by the object registry.
+	- GUI tile objects, indexed by the object registry.
+	- GUI text objects, indexed by the object registry.
+	- the tetronimos falling, indexed by the object registry.
 	- the tetronimo blocks created by the tetronimos falling.
 	      Also includes blocks that have already landed.
 	- the tetronimo displays.
+	- the tetronimo ghost. Only exists during a game.
+	- the performance overlay. Only exists while it is shown.
+	- the frame tracer. Only exists when the frames are traced.
 	- the pygame sprite images.
 	- the fonts for the text boxes.
-	- an instance to create the settings object.
-	- an instance to create the game object factory.
-	- attach all the objects to the object_factory, tetronimos_falling,
-	      teteronimo_blocks, input_manager, game_system, settings, and
-	      the input manager	      
+	- the high score store that keeps the high score in memory.
+	- the text surface cache shared by the text boxes and buttons.
+	- the asset bundle the assets are loaded from. Without a bundle
+	      file, the assets are loaded from the loose files.
+	- the asset loader that loads the gameplay assets on a worker thread.
+	- the pre-rendered background of the gameplay map.
+	- the sprite atlas the sprites are packed into.
+	- the audio manager for the sounds and the music.
+	- attach the game system, the high score store and the audio manager
+	      to the settings, and the sprites, fonts and text surface cache
+	      to the object factory
 ----------------------------------------------------------------------------
     GameSystem()::start_program()
     
     This function starts off the program, initializing pygame
-    and loading all the sprites, sounds and fonts
+    and loading all the sprites, sounds and fonts.
+    The title screen only needs the fonts, so it is shown
+    while the gameplay assets load on a worker thread.
+    If there is a trace file, create the frame tracer and
+    wrap the traced methods before the main loop starts.
+----------------------------------------------------------------------------
+    GameSystem()::load_assets()
+    
+    Open the asset bundle, set up pygame and load the fonts.
+    Without a bundle file the loose files are loaded.
+    Remember how long the cold start took.
 ----------------------------------------------------------------------------
     GameSystem()::load_sprites()
     
-    Loads all of the sprites from the images folder.
-    Assign the image folder url.
-    The current sprite image being loaded.
-    Not to be confused with the sprite image class.
+    Loads all of the gameplay sprites right away from the sprite
+    atlas of the images folder. The atlas is packed from the images
+    and converted to the display format, and is cached so it is only
+    packed again when an image changes.
 ----------------------------------------------------------------------------
-    GameSystem()::load_sprite()
+    GameSystem()::start_loading_gameplay_assets()
     
-    Load a single sprite form the images folder.
+    Load the gameplay sprites, the sound effects and the music
+    on the worker thread of the asset loader. Every asset has
+    its own future.
+----------------------------------------------------------------------------
+    GameSystem()::finish_loading_gameplay_assets()
+    
+    Wait for the gameplay assets still loading and hand them
+    to the pygame sprites and the audio manager. The sprite
+    atlas is converted to the display format on the main thread.
+----------------------------------------------------------------------------
+    GameSystem()::create_ghost_sprites()
+    
+    Create the faded sprites of the ghost blocks. Every block
+    sprite is copied with a low alpha as a ghost sprite.
 ----------------------------------------------------------------------------
     GameSystem()::load_fonts()
     
@@ -605,7 +735,7 @@ class GameSystem:
     GameSystem()::setup_title_screen()
     
     Assign the code for setting up the title screen
-    Assign the high score file
+    Read the high score from the high score store
     Assign the high score number
     Button(font, color, x, y, width, height, text = '')
 ----------------------------------------------------------------------------
@@ -623,48 +753,75 @@ class GameSystem:
     GameSystem()::setup_classic_game()
     
     Sets up a classic game map
+    Wait for the gameplay assets to finish loading
     Load the gameplay game map
     The text for the text boxes
     The color of the text for the text boxes
     Create all the text boxes for the same gui.
-    Read in highscore from high_score.txt file
-    If the score is less than or equal to highscore, then print highscore
-    If the score is greater than the highscore then print highscore will turn to score number
+    Read in highscore from the high score store.
+    The store returns the score instead if it beats the highscore.
     Create the teteronimo display objects
+    Create the ghost that shows where the teteronimo falling would land
+    Seed the tetronimos of the game and empty the tetronimo queue.
+    Forget a key tapped before the game started.
+    Start recording the replay of the game if there is a replay file.
+    Resume the saved game if there is one.
+-------------------------------------------------------------------------
+    GameSystem()::save_game()
+    
+    Save the game in progress as a game snapshot when the
+    player quits. A lost game is not saved.
+-------------------------------------------------------------------------
+    GameSystem()::resume_saved_game()
+    
+    Restore the saved game snapshot on the game that was
+    just set up, then remove the saved game. A resumed game
+    is not recorded, since it did not start from its seed.
 ----------------------------------------------------------------------------
     GameSystem()::load_map_gameplay()
     
     Loads the game map for the classic tetris game.
     First clear the previous game objects.
-    Use with to ensure that the file is read entirely.
-        The text containing all the characters for the map objects.
-	The current x position of the current map object being read from.
-	The current y position of the current map object being read from.
-	    Go through every character and create the correct map object from it.
-		Choose a different sprite based on the character.
+    Then load the map background. Every wall tile of the map is
+    blitted once onto a single surface, which is cached on disk
+    by the hash of the map file.
 ----------------------------------------------------------------------------
     GameSystem()::load_map_game_over()
     
     Loads the game over map after the player loses.
+    Save the replay of the game before its stats are reset.
     First clear the previous game objects.
+    Write the high score back to the high score file.
+    Then reset the score and the timers of the settings.
 ----------------------------------------------------------------------------
     GameSystem()::clear_gameplay_objects()
     
     Clear all these gameplay objects.
     Assign the current game object from being deleted.
     Assign the tag of the current game object to be deleted.
+    The tetronimo ghost is deleted with the gameplay objects.
 ----------------------------------------------------------------------------
     GameSystem()::main_loop()
     
     The main loop for updating the game objects and updating all of the engine components.
     At the entrance to the main loop,
         The game will continue to loop until is_active is set to false.
-	Manage the frame rate to 60 fps.
-	Reset the tapped keys in the input manager.
+	Manage the frame rate to 60 fps. The frame rate is not capped in turbo mode.
+	Start the next frame of the frame trace if the frames are traced, when
+	the game was started with --trace or TETRIS_TRACE. The frame that ended
+	is recorded, and F4 writes the frames kept to the trace file at once.
 	Check the keyboard input events.
+	    The tapped keys are not reset here. Every tick of the game
+	    simulation resets them after reading them, so a key tapped
+	    and released on a frame that runs no tick is read by the
+	    next tick.
 	If the q key is pressed, then exit the game.
 	Otherwise, update the game state.
-	    Gather the game object types
+	    Run a fixed tick of the game simulation for every 1/60 of a second
+	    that passed, up to a few ticks to catch up after a slow frame.
+	    In turbo mode, run ticks back to back for a frame of real time.
+	    Every tick does the following.
+	    Take the teteronimos falling that exist before the update
 	    Update the game objects
 	    Update the teteronimos falling.
 	        The current game object being updated
@@ -673,48 +830,57 @@ class GameSystem:
 	        The current game object being updated
 		Only pupdate game objects that are active
             Update the collision detection
+	    Destroy the game objects marked for deletion
+	Move the teteronimo ghost under the teteronimo falling,
+	once per frame instead of once per tick.
+	Play the sounds queued by the ticks of the frame
 	Render the game objects
+	Remember the time to the first frame once it is rendered,
+	and the time from a game start to its first frame.
     Lastly, clean up the game engine when finished.
 ----------------------------------------------------------------------------    
     GameSystem()::destroy_objects_marked_for_deletion()
     
     Destroy the game objects that are marked for deletion
-    Initialize the empty keys of the dictionary
-    For each key,
-        Assign the current game object to be deleted
-	If marked for deletion,
-	    remove the game object from the game object dictionary.
-	For all these keys, pop/remove the keys.
+    Only the game objects marked since the last call are visited.
+    The object registry removes them from the game objects and
+    from the index of their tag.
 ----------------------------------------------------------------------------
     GameSystem()::render_objects()
     
     Render all the game objects to the screen.
-    Default set buffer to render a black screen.
-    Otherwise, fill the back ground with black first
-    Then, Render every object in the group. Render every object by layer from 0 to 3.
-    And for each object in the group, 
-        Assign the current game object to be rendered.
-	Only render game obects that are active
-	If active,
-	    Assign the current sprite of the game object being rendered
-	    If no image, don't render it.
-	    Update the object rect for the rendering process
-	    Assign the current image being rendered.
-	    Assign the rect of the current image being rendered.
-	    Blit the sprite to the backbuffer.
-    Lastly, swap the backbuffer.
+    On the title screen, draw the buttons and swap the whole backbuffer.
+    The game will be fully redrawn once it starts.
+    Otherwise, render with the render queue.
+        Only the game objects that moved, changed sprite or were hidden
+	get a new rect, and their old and new rects are marked dirty.
+	For every dirty rect, blit the pre-rendered map background under it
+	and then every visible game object touching it, by layer from 0 to 3.
+	Lastly, update only the dirty rects of the display.
+    Draw the performance overlay over either screen if it is shown.
+----------------------------------------------------------------------------
+    GameSystem()::toggle_perf_hud()
+    
+    Show or hide the performance overlay. Showing it wraps the
+    timed methods, and hiding it removes the wrappers and
+    redraws the screen under it.
+----------------------------------------------------------------------------
+    GameSystem()::save_trace()
+    
+    Write the frames kept by the frame tracer to the trace
+    file. Does nothing if the frames are not traced.
 ----------------------------------------------------------------------------
-    GameSystem()::gather_objects()
+    GameSystem()::save_replay()
     
-    Gathers all of the game objects by tag type for processing.
-    By First, clear all the previous game object references.
-    Then, gather all the game objects and place them in their proper dictionaries.
-    And for each object,
-        Assign the current game object to be examined.
-	Assign the current game object id
-	Check the tag to tell which dictionary to put the object reference in.
+    Write the replay of the game being recorded to the
+    replay file, with the stats of the game so far.
 ----------------------------------------------------------------------------
     GameSystem()::clean_up()
     
-    Cleans up the game system after it is finished working. Exit pygame
+    Cleans up the game system after it is finished working.
+    Save the game in progress and the replay of a game
+    that is not over yet.
+    Write the last frames to the trace file if the frames
+    are traced.
+    Save the high score and exit pygame
 ------------------------------------------------------------------------- """
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+
+"""The high score store. Loads the high score file once at startup and keeps the high score in memory. Changes are written back to the file atomically by a background writer thread."""
+class HighScoreStore():
+	def __init__(self, file_url):
+		"""Initialized the high score store."""
+
+		# The url of the high score file.
+		self.file_url = file_url
+
+		# The high score kept in memory.
+		self.high_score = 0
+
+		# The high score that was last written to the high score file.
+		self.saved_high_score = None
+
+		# The lock guarding the high score values shared with the writer thread.
+		self.lock = threading.Lock()
+
+		# Set whenever the writer thread must check if the high score needs to be
+		# written.
+		self.write_event = threading.Event()
+
+		# Checks if the writer thread is running.
+		self.is_running = True
+
+		self.load()
+
+		# The background thread that writes the high score file.
+		self.writer_thread = threading.Thread(target=self.run_writer, \
+				name="HighScoreWriter", daemon=True)
+		self.writer_thread.start()
+
+		# If the file was missing, empty or unreadable, write the default high score.
+		if self.saved_high_score is None:
+			self.flush()
+
+	def load(self):
+		"""Reads the high score from the high score file. Only called once."""
+		try:
+			with open(self.file_url, "r") as in_file:
+				self.high_score = int(in_file.read())
+				self.saved_high_score = self.high_score
+		except (IOError, ValueError):
+			self.high_score = 0
+			self.saved_high_score = None
+
+	def submit_score(self, score):
+		"""Updates the high score if the score beats it. Returns the high score."""
+		if score > self.high_score:
+			with self.lock:
+				self.high_score = score
+			self.flush()
+		return self.high_score
+
+	def flush(self):
+		"""Asks the writer thread to write the high score if it has changed."""
+		self.write_event.set()
+
+	def close(self):
+		"""Stops the writer thread after writing any unsaved high score."""
+		self.is_running = False
+		self.write_event.set()
+		self.writer_thread.join()
+		self.write()
+
+	def run_writer(self):
+		"""The loop of the writer thread."""
+		while self.is_running:
+			self.write_event.wait()
+			self.write_event.clear()
+			self.write()
+
+	def write(self):
+		"""Writes the high score to a temporary file and renames it over the high score file."""
+		with self.lock:
+			high_score = self.high_score
+
+		if high_score == self.saved_high_score:
+			return
+
+		# The folder of the high score file. The temporary file must be on the same
+		# file system for the rename to be atomic.
+		folder_url = os.path.dirname(os.path.abspath(self.file_url))
+
+		file_handle, temp_url = tempfile.mkstemp(prefix=".high_score", dir=folder_url)
+		try:
+			with os.fdopen(file_handle, "w") as out_file:
+				out_file.write(str(high_score))
+			os.replace(temp_url, self.file_url)
+		except OSError:
+			if os.path.exists(temp_url):
+				os.remove(temp_url)
+			return
+
+		self.saved_high_score = high_score
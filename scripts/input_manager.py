@@ -1,35 +1,27 @@
 import pygame
 
+from bot_input import BotInput
+from input_state import InputState
+
 """ ---------------------------------------------------------------
     InputManager Class
     
     This class takes care of the keybindings and mouse presses.
-    Keybindings are Up, Down, Left, Right, Q, Z, X, C.
+    Keybindings are Up, Down, Left, Right, Q, Z, X, C, A, F3 and F4.
     Button Presses are based on location on screen.
+    The key states are inherited from the input state.
 --------------------------------------------------------------- """
 
-class InputManager:
+class InputManager(InputState):
 	def __init__(self, game_system):
 		#initialize keybindings
-		self.pressed_up = False
-		self.pressed_down = False
-		self.pressed_left = False
-		self.pressed_right = False
-		self.pressed_q = False
-		self.pressed_z = False
-		self.pressed_x = False
-		self.pressed_c = False
-		self.tapped_c = False
+		super(InputManager, self).__init__()
 		self.mouse_button_pressed = False
 		self.mouse_x = 0
 		self.mouse_y = 0
 		self.pos = None
 		self.game_system = game_system
 
-	def reset_tapped_keys(self):
-		#reset tapped keys
-		self.tapped_c = False
-		
 	def check_events(self):
 		#this function will be used to respond to keypress
 		#and keyrelease events based on the mouse location.
@@ -58,6 +50,12 @@ class InputManager:
 				elif event.key == pygame.K_c:
 					self.tapped_c = True
 					self.pressed_c = True
+				elif event.key == pygame.K_a:
+					self.toggle_autoplay()
+				elif event.key == pygame.K_F3:
+					self.game_system.toggle_perf_hud()
+				elif event.key == pygame.K_F4:
+					self.game_system.save_trace()
 			elif event.type == pygame.KEYUP:
 				if event.key == pygame.K_RIGHT:
 					self.pressed_right = False
@@ -74,31 +72,27 @@ class InputManager:
 				elif event.key == pygame.K_x:
 					self.pressed_x = False
 				elif event.key == pygame.K_c:
+					#A tap released before the next tick is still read by that tick
 					self.pressed_c = False
-					self.tapped_c = False
 			elif event.type == pygame.MOUSEBUTTONDOWN:
 				self.mouse_button_pressed = True
 				
+	def toggle_autoplay(self):
+		#Let the bot play the game by itself, or give the keys back to the player
+		if self.autoplay_input is None:
+			self.autoplay_input = BotInput()
+		else:
+			self.autoplay_input = None
+			self.set_keys(False, False, False, False, False, False)
+				
 """ --------------------------------------------------
     Initialize each InputManager object with:
-        - a keybinding for Up
-	- a keybinding for Down
-	- a keybinding for Left
-	- a keybinding for Right
-	- a keybinding for Q
-	- a keybinding for Z
-	- a keybinding for X
-	- a keybinding for C
-	- a flag to check if tapped
+        - the key states of the input state
 	- a flag to check if button pressed
 	- the x location of the mouse
 	- the y location of the mouse
 	- the pos
 	- the assigned game system	
------------------------------------------------------
-    InputManager()::reset_tapped_keys()
-    
-    This function will reset the tapped keys
 -----------------------------------------------------
     InputManager()::check_events()
     
@@ -109,4 +103,10 @@ class InputManager:
         Do the Quit functions.
 	Do the Keydown functions.
 	Do the Keyup events.
+-----------------------------------------------------
+    InputManager()::toggle_autoplay()
+    
+    Let the bot play the game by itself, or give the
+    keys back to the player. The bot sets the keys
+    before every frame of the game simulation.
 -------------------------------------------------- """
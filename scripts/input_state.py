@@ -0,0 +1,62 @@
+""" ---------------------------------------------------------------
+    InputState Class
+
+    The state of the game keys read by the game logic. It does
+    not depend on pygame, so the headless game simulation can be
+    driven by setting the keys directly. The input manager fills
+    it in from the pygame events.
+--------------------------------------------------------------- """
+class InputState():
+	def __init__(self):
+		#initialize the key states
+		self.pressed_up = False
+		self.pressed_down = False
+		self.pressed_left = False
+		self.pressed_right = False
+		self.pressed_q = False
+		self.pressed_z = False
+		self.pressed_x = False
+		self.pressed_c = False
+		self.tapped_c = False
+		self.autoplay_input = None
+
+	def reset_tapped_keys(self):
+		#reset tapped keys
+		self.tapped_c = False
+
+	def set_keys(self, pressed_down, pressed_left, pressed_right, pressed_z, \
+			pressed_x, pressed_c):
+		#Set the keys used by the game logic at once. Pressing c taps it.
+		self.pressed_down = pressed_down
+		self.pressed_left = pressed_left
+		self.pressed_right = pressed_right
+		self.pressed_z = pressed_z
+		self.pressed_x = pressed_x
+		self.tapped_c = pressed_c and not self.pressed_c
+		self.pressed_c = pressed_c
+
+""" --------------------------------------------------
+    Initialize each InputState object with:
+        - a key state for Up
+	- a key state for Down
+	- a key state for Left
+	- a key state for Right
+	- a key state for Q
+	- a key state for Z
+	- a key state for X
+	- a key state for C
+	- a flag to check if C was tapped since the last tick
+	- the input source that sets the keys before every
+	      frame when the game plays by itself, or None
+-----------------------------------------------------
+    InputState()::reset_tapped_keys()
+
+    This function will reset the tapped keys. The game
+    simulation calls it after every tick, once the tick
+    has read them. Releasing a key does not reset its tap.
+-----------------------------------------------------
+    InputState()::set_keys()
+
+    Set the keys used by the game logic at once.
+    C is tapped when it was not pressed before.
+-------------------------------------------------- """
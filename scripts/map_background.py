@@ -0,0 +1,149 @@
+import hashlib
+import os
+
+import pygame
+
+"""The static background of a game map. The wall tiles of the map are composed once into a single pre-rendered surface, which is cached on disk by the hash of the map file and of the tile sprites it uses."""
+class MapBackground():
+	# The sprite used for each character of the map file.
+	tile_sprite_names = {
+		'C': "wall_in_center.png",
+		'c': "wall_out_center.png",
+		' ': "wall_out_center.png",
+		'U': "wall_in_up.png",
+		'D': "wall_in_down.png",
+		'L': "wall_in_left.png",
+		'R': "wall_in_right.png",
+		'H': "wall_in_hor.png",
+		'h': "wall_out_hor.png",
+		'l': "wall_out_vertical_left.png",
+		'r': "wall_out_vertical_right.png",
+		',': "wall_out_vertical_left_fade.png",
+		'.': "wall_out_vertical_right_fade.png",
+		'/': "wall_in_upleft.png",
+		'\\': "wall_in_upright.png",
+		'[': "wall_in_downleft.png",
+		']': "wall_in_downright.png",
+		'T': "wall_in_leftT.png",
+		't': "wall_in_rightT.png",
+	}
+
+	def __init__(self, width, height, tile_size, tiles_per_row, image_folder_url, cache_folder_url, \
+			asset_bundle):
+		"""Initialized the map background."""
+
+		# The size of the background surface.
+		self.width = width
+		self.height = height
+
+		# The width and height of a single tile.
+		self.tile_size = tile_size
+
+		# The number of tiles in a single row of the map.
+		self.tiles_per_row = tiles_per_row
+
+		# The folder the tile sprites are loaded from.
+		self.image_folder_url = image_folder_url
+
+		# The folder where the pre-rendered backgrounds are cached.
+		self.cache_folder_url = cache_folder_url
+
+		# The asset bundle the map files and the tile sprites are loaded from.
+		self.asset_bundle = asset_bundle
+
+		# The hash of the map file and the tile sprites the surface was built from.
+		self.map_hash = None
+
+		# The pre-rendered background surface.
+		self.surface = None
+
+	def load(self, map_url, pygame_sprites):
+		"""Loads the background for the map file. Uses the cached background if neither the map file nor its tile sprites have changed."""
+		map_bytes = self.asset_bundle.read_asset(map_url)
+
+		# The hash of the map file and its tile sprites.
+		map_hash = self.get_hash(map_bytes)
+
+		# The background is already built for this map.
+		if map_hash == self.map_hash and self.surface is not None:
+			return self.surface
+
+		# The file name of the cached background.
+		map_name = os.path.splitext(os.path.basename(map_url))[0]
+		cache_url = os.path.join(self.cache_folder_url, \
+				map_name + "_" + map_hash + ".png")
+
+		surface = None
+
+		if os.path.isfile(cache_url):
+			try:
+				surface = pygame.image.load(cache_url)
+			except pygame.error:
+				surface = None
+
+		if surface is None:
+			surface = self.compose(map_bytes.decode("utf-8"), pygame_sprites)
+			self.save(surface, cache_url)
+
+		# Convert the surface to the display format so that blitting it is fast.
+		if pygame.display.get_surface() is not None:
+			surface = surface.convert()
+
+		self.map_hash = map_hash
+		self.surface = surface
+
+		return self.surface
+
+	def get_hash(self, map_bytes):
+		"""Hashes the map file and the names and asset stamps of the tile sprites it uses. A changed map file or tile sprite gives a new hash."""
+		map_hash = hashlib.sha1(map_bytes)
+		map_text = map_bytes.decode("utf-8")
+
+		# The tile sprites used by the map, in a fixed order.
+		sprite_names = sorted(set(self.tile_sprite_names[char] for char in map_text \
+				if char in self.tile_sprite_names))
+
+		for sprite_name in sprite_names:
+			asset_stamp = self.asset_bundle.get_asset_stamp(os.path.join( \
+					self.image_folder_url, sprite_name))
+			map_hash.update((sprite_name + " " + asset_stamp + "\n").encode("utf-8"))
+
+		return map_hash.hexdigest()
+
+	def compose(self, map_text, pygame_sprites):
+		"""Blits every tile of the map onto a single surface."""
+		surface = pygame.Surface((self.width, self.height))
+		surface.fill((0, 0, 0))
+
+		# The top left position of the current tile.
+		cur_position_x = 0
+		cur_position_y = 0
+
+		for char in map_text:
+			if char == '\n':
+				continue
+
+			sprite_name = self.tile_sprite_names.get(char)
+
+			if sprite_name is not None:
+				surface.blit(pygame_sprites[sprite_name], (cur_position_x, cur_position_y))
+
+			cur_position_x += self.tile_size
+
+			if cur_position_x >= self.tiles_per_row * self.tile_size:
+				cur_position_x = 0
+				cur_position_y += self.tile_size
+
+		return surface
+
+	def save(self, surface, cache_url):
+		"""Writes the background to the cache folder. A failed write only skips the cache."""
+		temp_url = cache_url + ".tmp.png"
+
+		try:
+			os.makedirs(self.cache_folder_url, exist_ok=True)
+			pygame.image.save(surface, temp_url)
+			os.replace(temp_url, cache_url)
+		except (OSError, pygame.error):
+			if os.path.exists(temp_url):
+				os.remove(temp_url)
@@ -1,64 +1,42 @@
-import pygame
+import sys
 
-from pygame.sprite import Sprite
+from object_pool import ObjectPool
 from sprite_image import SpriteImage
 from game_object import GameObject
 from text_box import TextBox
 from tetronimo_falling import TetronimoFalling
 from tetronimo_block import TetronimoBlock
 from tetronimo_display import TetronimoDisplay
+from tetronimo_ghost import TetronimoGhost
 
 """ ---------------------------------------------------------------
     ObjectFactory Class
     
     The object factory for creating game objects of different types.
+    Without pygame sprites, the tetronimo game objects are created
+    without sprite images for the headless game simulation.
+    Tetronimo blocks and tetronimos falling are taken from object
+    pools when possible, so a long session does not keep creating
+    new game objects.
+    A single sprite image is created for every pygame sprite and
+    shared by every game object that uses it. The game objects only
+    keep a reference to a shared set of sprite images and the
+    current sprite, so the sprite images must never be changed.
 --------------------------------------------------------------- """
 class ObjectFactory():
-	def __init__(self, game_objects, pygame_sprites, fonts):
+	def __init__(self, object_registry, pygame_sprites, fonts):
 		#initialize with the necessary objects and sprites
 		self.cur_game_obj_id = 0		
-		self.game_objects = game_objects		
+		self.object_registry = object_registry		
 		self.pygame_sprites = pygame_sprites		
 		self.fonts = fonts
+		self.text_surface_cache = None
 		self.settings = None	
 		self.input_manager = None
-		
-	def create_test_obj(self, position_x, position_y, obj_type):
-		#this function creates the test object
-		debug_sprites = {}
-		sprite_name = ""
-		
-		if obj_type == 0:
-			sprite_name = "debug_1.png"
-		else:
-			sprite_name = "debug_2.png"
-		
-		sprite_debug_1 = SpriteImage(0, self.pygame_sprites[sprite_name])
-		debug_sprites[sprite_name] = sprite_debug_1
-		debug_1_object = GameObject(self.cur_game_obj_id, 0, position_x, position_y, 
-				None, debug_sprites)
-		debug_1_object.cur_sprite_image = sprite_debug_1
-		
-		self.game_objects[self.cur_game_obj_id] = debug_1_object
-		self.cur_game_obj_id += 1
-		
-		return cur_object
-		
-	def create_gui_wall(self, position_x, position_y, sprite_name):
-		#this function creates the gui wall object
-		cur_sprites = {}
-		
-		sprite_1 = SpriteImage(0, self.pygame_sprites[sprite_name])
-		cur_sprites[sprite_name] = sprite_1
-			
-		cur_object = GameObject(self.cur_game_obj_id, 1, position_x, position_y, 
-				None, cur_sprites)		
-		cur_object.cur_sprite_image = sprite_1
-		
-		self.game_objects[self.cur_game_obj_id] = cur_object
-		self.cur_game_obj_id += 1
-		
-		return cur_object
+		self.tetronimo_falling_pool = ObjectPool()
+		self.tetronimo_block_pool = ObjectPool()
+		self.sprite_records = {}
+		self.sprite_sets = {}
 		
 	def create_text_box(self, position_x, position_y, text, font_name, color, \
 			align_bottom_left):
@@ -67,138 +45,230 @@ class ObjectFactory():
 		#assign the text box being created
 		cur_font = self.fonts[font_name]
 		cur_object = TextBox(self.cur_game_obj_id, 2, position_x, position_y, text, \
-				cur_font, color, align_bottom_left, None, None)
+				cur_font, color, align_bottom_left, self.text_surface_cache, None, None)
 		
-		self.game_objects[self.cur_game_obj_id] = cur_object
+		self.object_registry.add(cur_object)
 		self.cur_game_obj_id += 1
 		
 		return cur_object
 		
 	def create_tetronimo_falling(self, position_x, position_y, tetronimo_type):
 		#This function will create the teteronimo falling
-		#Assign the teteronimo falling to be created
-		cur_object = TetronimoFalling(self.cur_game_obj_id, 3, position_x, position_y, \
-				tetronimo_type, self, self.settings, self.input_manager, None, None)
-
-		self.game_objects[self.cur_game_obj_id] = cur_object
+		#Take the id first, since the teteronimo falling creates its blocks while it is constructed
+		#Reuse a teteronimo falling from the pool, or assign a new one if the pool is empty
+		object_id = self.cur_game_obj_id
 		self.cur_game_obj_id += 1
 		
+		cur_object = self.tetronimo_falling_pool.acquire()
+		
+		if cur_object is not None:
+			cur_object.reset(object_id, position_x, position_y, tetronimo_type)
+		else:
+			cur_object = TetronimoFalling(object_id, 3, position_x, position_y, \
+					tetronimo_type, self, self.settings, self.input_manager, None, None)
+			cur_object.pool = self.tetronimo_falling_pool
+
+		self.object_registry.add(cur_object)
+		
 		return cur_object
 		
 	def create_tetronimo_block(self, position_x, position_y, tetronimo_type, owner):
 		"""
 		This function creates the teteronimo falling.
-		Assign the sprites for the teteronimo block.
-		Assign the name of the current sprite being gathered.
-		Assign the current sprites to be gathered.
+		Reuse a teteronimo block from the pool, which keeps its sprites.
+		Otherwise assign the sprites for the teteronimo block.
 		Assign the teteronimo falling to be created.
 		"""
-		sprites = {}
-		sprite_name = "block_yellow.png"
-		
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
-		
-		sprite_name = "block_skyblue.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		cur_object = self.tetronimo_block_pool.acquire()
 		
-		sprite_name = "block_orange.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		if cur_object is not None:
+			cur_object.reset(self.cur_game_obj_id, position_x, position_y, \
+					tetronimo_type, owner)
+		else:
+			sprites = self.get_sprite_images(["block_yellow.png", "block_skyblue.png", \
+					"block_orange.png", "block_blue.png", "block_green.png", "block_red.png", \
+					"block_purple.png", "block_grey.png"])
+			
+			cur_object = TetronimoBlock(self.cur_game_obj_id, 4, position_x, position_y, \
+					tetronimo_type, owner, self.settings, None, sprites)
+			cur_object.pool = self.tetronimo_block_pool
+			
+		self.object_registry.add(cur_object)		
+		self.cur_game_obj_id += 1
 		
-		sprite_name = "block_blue.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		return cur_object
+
+	def create_landed_tetronimo_blocks(self, cells):
+		"""
+		This function creates the landed teteronimo blocks of a whole board in one pass.
+		Every cell is the x position, the y position and the teteronimo type of a block.
+		The blocks are taken from the pool in one slice and the rest are created.
+		Every block is added to the object registry with a single update.
+		"""
+		blocks = self.tetronimo_block_pool.acquire_many(len(cells))
+		sprites = self.get_sprite_images(["block_yellow.png", "block_skyblue.png", \
+				"block_orange.png", "block_blue.png", "block_green.png", "block_red.png", \
+				"block_purple.png", "block_grey.png"])
+		object_id = self.cur_game_obj_id
+		
+		for index in range(0, len(cells)):
+			position_x, position_y, tetronimo_type = cells[index]
+			
+			if index < len(blocks):
+				blocks[index].reset(object_id, position_x, position_y, tetronimo_type, None)
+			else:
+				cur_object = TetronimoBlock(object_id, 4, position_x, position_y, \
+						tetronimo_type, None, self.settings, None, sprites)
+				cur_object.pool = self.tetronimo_block_pool
+				blocks.append(cur_object)
+				
+			blocks[index].block_state = 1
+			object_id += 1
+			
+		self.cur_game_obj_id = object_id
+		self.object_registry.add_many(blocks, 4)
 		
-		sprite_name = "block_green.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		return blocks
 		
-		sprite_name = "block_red.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+	def create_tetronimo_display(self, position_x, position_y):
+		"""
+		This functions creates the teteronimo display.
+		Assign the sprites for the teteronimo display.
+		Assign the teteroimo displaybeing created.
+		"""
+		sprites = self.get_sprite_images(["display_none.png", "display_O.png", \
+				"display_I.png", "display_J.png", "display_L.png", "display_S.png", \
+				"display_Z.png", "display_T.png"])
 		
-		sprite_name = "block_purple.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		cur_object = TetronimoDisplay(self.cur_game_obj_id, 5, position_x, position_y, \
+				None, sprites)
+		self.object_registry.add(cur_object)
+		self.cur_game_obj_id += 1
 		
-		sprite_name = "block_grey.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		return cur_object
 		
-		cur_object = TetronimoBlock(self.cur_game_obj_id, 4, position_x, position_y, \
-				tetronimo_type, owner, self.settings, None, sprites)
-		self.game_objects[self.cur_game_obj_id] = cur_object		
+	def create_tetronimo_ghost(self):
+		"""
+		This function creates the teteronimo ghost and its 4 ghost blocks.
+		Assign the sprites for the ghost blocks.
+		The ghost itself has no sprite.
+		"""
+		sprites = self.get_sprite_images(TetronimoGhost.ghost_sprite_names)
+		ghost_blocks = []
+		
+		for index in range(0, 4):
+			ghost_block = GameObject(self.cur_game_obj_id, 6, 0, 0, None, sprites)
+			ghost_block.set_sprite(TetronimoGhost.ghost_sprite_names[0])
+			self.object_registry.add(ghost_block)
+			self.cur_game_obj_id += 1
+			ghost_blocks.append(ghost_block)
+			
+		cur_object = TetronimoGhost(self.cur_game_obj_id, 6, 0, 0, self.settings, \
+				ghost_blocks, None, None)
+		self.object_registry.add(cur_object)
 		self.cur_game_obj_id += 1
 		
 		return cur_object
-
-	def create_tetronimo_display(self, position_x, position_y):
+		
+	def get_sprite_images(self, sprite_names):
 		"""
-		This functions creates the teteronimo display.
-		Assign the sprites for the teteronimo block.
-		Assign the name of the current sprite being gathered.
-		Assign the current sprites being gathered
-		Assign the teteroimo displaybeing created.
+		This function gets the shared sprite images of a game object.
+		The keys are the sprite names.
+		Every game object asking for the same sprite names gets the same dictionary.
+		Without pygame sprites, there are no sprite images.
 		"""
-		sprites = {}
-		sprite_name = "display_none.png"
+		if self.pygame_sprites is None:
+			return None
 		
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		sprite_set_key = tuple(sprite_names)
+		sprites = self.sprite_sets.get(sprite_set_key)
 		
-		sprite_name = "display_O.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		if sprites is None:
+			sprites = {}
+			
+			for sprite_name in sprite_names:
+				sprites[sprite_name] = self.get_sprite_record(sprite_name)
+				
+			self.sprite_sets[sprite_set_key] = sprites
+			
+		return sprites
 		
-		sprite_name = "display_I.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+	def get_sprite_record(self, sprite_name):
+		"""
+		This function gets the single sprite image of a pygame sprite.
+		The sprite image is created the first time it is asked for.
+		"""
+		sprite_record = self.sprite_records.get(sprite_name)
 		
-		sprite_name = "display_J.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		if sprite_record is None:
+			sprite_record = SpriteImage(0, self.pygame_sprites[sprite_name])
+			self.sprite_records[sprite_name] = sprite_record
+			
+		return sprite_record
 		
-		sprite_name = "display_L.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+	def get_memory_report(self):
+		"""
+		This function gets the memory used by the game objects of every type as text.
+		Every game object is counted with its attribute dictionary.
+		The shared sprite images are counted once, apart from the game objects.
+		"""
+		object_sizes = {}
 		
-		sprite_name = "display_S.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		for cur_object in self.object_registry.game_objects.values():
+			type_name = type(cur_object).__name__
+			object_size = self.get_object_size(cur_object)
+			
+			object_count, total_size = object_sizes.get(type_name, (0, 0))
+			object_sizes[type_name] = (object_count + 1, total_size + object_size)
+			
+		lines = []
 		
-		sprite_name = "display_Z.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		for type_name in sorted(object_sizes):
+			object_count, total_size = object_sizes[type_name]
+			lines.append(type_name + ": " + str(object_count) + " objects, " + \
+					str(total_size // object_count) + " bytes per object, " + \
+					str(total_size) + " bytes")
+			
+		shared_size = 0
 		
-		sprite_name = "display_T.png"
-		cur_sprite = SpriteImage(0, self.pygame_sprites[sprite_name])
-		sprites[sprite_name] = cur_sprite
+		for sprite_record in self.sprite_records.values():
+			shared_size += self.get_object_size(sprite_record) + \
+					sys.getsizeof(sprite_record.image_rect)
+		for sprites in self.sprite_sets.values():
+			shared_size += sys.getsizeof(sprites)
+			
+		lines.append("shared sprite images: " + str(len(self.sprite_records)) + \
+				" sprite images in " + str(len(self.sprite_sets)) + " sets, " + \
+				str(shared_size) + " bytes")
+			
+		return "\n".join(lines)
 		
-		cur_object = TetronimoDisplay(self.cur_game_obj_id, 5, position_x, position_y, \
-				None, sprites)
-		self.game_objects[self.cur_game_obj_id] = cur_object
-		self.cur_game_obj_id += 1
+	@staticmethod
+	def get_object_size(cur_object):
+		"""
+		This function gets the size of an object in bytes.
+		Objects without slots are counted with their attribute dictionary.
+		"""
+		object_size = sys.getsizeof(cur_object)
 		
-		return cur_object
+		if hasattr(cur_object, "__dict__"):
+			object_size += sys.getsizeof(cur_object.__dict__)
+			
+		return object_size
 	
 """ --------------------------------------------------
     Initialize each ObjectFactory object with:
         - The current dynamic game object id. Incremented after every game object is created.
-	- The game objects being created.
-	- The pygame sprites being used for creating the game objects.
+	- The object registry that the created game objects are added to.
+	- The pygame sprites being used for creating the game objects. None when headless.
 	- The fonts for the text boxes.		
+	- A reference to the text surface cache shared by the text boxes.
 	- A reference to the settings.
 	- A reference to the input manager. 
------------------------------------------------------
-    ObjectFactory()::create_test_obj()
-    
-    This function creates the test object.
------------------------------------------------------
-    ObjectFactory()::create_gui_wall()
-    
-    This function creates the gui wall object.
+	- The object pool of the teteronimos falling.
+	- The object pool of the teteronimo blocks.
+	- The shared sprite images. Keys are the sprite names.
+	- The shared sets of sprite images. Keys are tuples of sprite names.
 -----------------------------------------------------
     ObjectFactory()::create_text_box()
     
@@ -209,21 +279,59 @@ class ObjectFactory():
     ObjectFactory()::create_teteronimo_falling()
     
     This function will create the teteronimo falling.
-    Assign the teteronimo falling to be created.
+    Take the id first, since the teteronimo falling creates
+    its blocks while it is constructed.
+    Reuse a teteronimo falling from the pool, or assign
+    a new one if the pool is empty.
 -----------------------------------------------------
     ObjectFactory()::create_teteronimo_block()
     
     This function creates the teteronimo falling.
-    Assign the sprites for the teteronimo block.
-    Assign the name of the current sprite being gathered.
-    Assign the current sprites to be gathered.
+    Reuse a teteronimo block from the pool, which keeps its sprites.
+    Otherwise assign the sprites for the teteronimo block.
     Assign the teteronimo falling to be created.
+-----------------------------------------------------
+    ObjectFactory()::create_landed_tetronimo_blocks()
+    
+    This function creates the landed teteronimo blocks
+    of a whole board in one pass.
+    Take the blocks from the pool in one slice and create the rest.
+    Add every block to the object registry with a single update.
 -----------------------------------------------------
     ObjectFactory()::create_teteronimo_display()
     
     This functions creates the teteronimo display.
-    Assign the sprites for the teteronimo block.
-    Assign the name of the current sprite being gathered.
-    Assign the current sprites being gathered
+    Assign the sprites for the teteronimo display.
     Assign the teteroimo displaybeing created.
+-----------------------------------------------------
+    ObjectFactory()::create_teteronimo_ghost()
+    
+    This function creates the teteronimo ghost and its 4 ghost blocks.
+    Assign the sprites for the ghost blocks.
+    The ghost itself has no sprite.
+-----------------------------------------------------
+    ObjectFactory()::get_sprite_images()
+    
+    This function gets the shared sprite images of a game object.
+    The keys are the sprite names.
+    Every game object asking for the same sprite names
+    gets the same dictionary.
+    Without pygame sprites, there are no sprite images.
+-----------------------------------------------------
+    ObjectFactory()::get_sprite_record()
+    
+    This function gets the single sprite image of a pygame sprite.
+    The sprite image is created the first time it is asked for.
+-----------------------------------------------------
+    ObjectFactory()::get_memory_report()
+    
+    This function gets the memory used by the game objects
+    of every type as text. The shared sprite images are
+    counted once, apart from the game objects.
+-----------------------------------------------------
+    ObjectFactory()::get_object_size()
+    
+    This function gets the size of an object in bytes.
+    Objects without slots are counted with their
+    attribute dictionary.
 -------------------------------------------------- """
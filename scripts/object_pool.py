@@ -0,0 +1,45 @@
+"""The object pool. Keeps the destroyed game objects of one type so the object factory can hand them out again instead of creating new ones."""
+class ObjectPool():
+	def __init__(self):
+		"""Initialized the object pool."""
+
+		# The destroyed game objects that are ready to be handed out again.
+		self.free_objects = []
+
+		# The number of game objects that were taken from the pool.
+		self.hit_count = 0
+
+		# The number of game objects that had to be created because the pool was empty.
+		self.miss_count = 0
+
+		# The number of game objects that were given back to the pool.
+		self.release_count = 0
+
+	def acquire(self):
+		"""Takes a game object from the pool. Returns None if the pool is empty, in which case the caller creates a new one."""
+		if len(self.free_objects) > 0:
+			self.hit_count += 1
+			return self.free_objects.pop()
+
+		self.miss_count += 1
+		return None
+
+	def acquire_many(self, count):
+		"""Takes up to a number of game objects from the pool in one slice. The caller creates the rest."""
+		split_index = max(0, len(self.free_objects) - count)
+		game_objects = self.free_objects[split_index:]
+		del self.free_objects[split_index:]
+		self.hit_count += len(game_objects)
+		self.miss_count += count - len(game_objects)
+		return game_objects
+
+	def release(self, game_object):
+		"""Gives a destroyed game object back to the pool."""
+		self.free_objects.append(game_object)
+		self.release_count += 1
+
+	def get_report(self):
+		"""Returns the hit and miss counts of the pool as text."""
+		return "hits " + str(self.hit_count) + ", misses " + str(self.miss_count) + \
+				", released " + str(self.release_count) + ", free " + \
+				str(len(self.free_objects))
@@ -0,0 +1,105 @@
+""" ---------------------------------------------------------------
+    ObjectRegistry Class
+
+    The registry of every game object in the game. It is updated
+    by the object factory when a game object is created and when a
+    game object is marked for deletion, so the game objects never
+    have to be gathered by tag every frame. Destroyed game objects
+    that came from an object pool are given back to it.
+--------------------------------------------------------------- """
+class ObjectRegistry():
+	def __init__(self):
+		#initialize the game objects, the per tag indexes and the pending deletions
+		self.game_objects = {}
+		self.tagged_objects = {}
+		self.pending_deletion = set()
+		self.render_queue = None
+
+		for tag in range(0, 6):
+			self.tagged_objects[tag] = {}
+
+	def add(self, game_object):
+		#Add a newly created game object to the registry and its tag index
+		object_id = game_object.object_id
+
+		self.game_objects[object_id] = game_object
+		self.tagged_objects.setdefault(game_object.tag, {})[object_id] = game_object
+		game_object.registry = self
+
+		if self.render_queue is not None:
+			self.render_queue.add(game_object)
+
+	def add_many(self, game_objects, tag):
+		#Add newly created game objects that all have the same tag, updating each index once
+		objects_by_id = {game_object.object_id: game_object for game_object in game_objects}
+
+		self.game_objects.update(objects_by_id)
+		self.tagged_objects.setdefault(tag, {}).update(objects_by_id)
+
+		for game_object in game_objects:
+			game_object.registry = self
+
+		if self.render_queue is not None:
+			for game_object in game_objects:
+				self.render_queue.add(game_object)
+
+	def get_objects_with_tag(self, tag):
+		#Get the dictionary of game objects with a tag. The dictionary is kept up to date.
+		return self.tagged_objects.setdefault(tag, {})
+
+	def mark_for_deletion(self, game_object):
+		#Remember the game object so it is removed at the end of the frame
+		self.pending_deletion.add(game_object.object_id)
+
+	def destroy_objects_marked_for_deletion(self):
+		#Remove every game object that was marked for deletion since the last call
+		for object_id in self.pending_deletion:
+			cur_object = self.game_objects.pop(object_id, None)
+
+			if cur_object is not None:
+				self.tagged_objects[cur_object.tag].pop(object_id, None)
+				cur_object.registry = None
+
+				if self.render_queue is not None:
+					self.render_queue.remove(cur_object)
+
+				if cur_object.pool is not None:
+					cur_object.pool.release(cur_object)
+
+		self.pending_deletion.clear()
+
+""" --------------------------------------------------
+    Initialize each ObjectRegistry object with:
+        - the game objects. Keys are the game object ids.
+	- the game objects of each tag. Keys are the tags and
+	      the values are dictionaries keyed by game object id.
+	- the ids of the game objects marked for deletion.
+	- the render queue that is told about added and destroyed game objects.
+-----------------------------------------------------
+    ObjectRegistry()::add()
+
+    Add a newly created game object to the registry.
+    Also add it to the index of its tag and to the render queue.
+-----------------------------------------------------
+    ObjectRegistry()::add_many()
+
+    Add newly created game objects with the same tag to
+    the registry and the index of their tag, with a single
+    update of each, then to the render queue.
+-----------------------------------------------------
+    ObjectRegistry()::get_objects_with_tag()
+
+    Get the dictionary of game objects with a tag.
+    The same dictionary is kept up to date as game
+    objects are added and destroyed.
+-----------------------------------------------------
+    ObjectRegistry()::mark_for_deletion()
+
+    Remember the id of a game object marked for deletion.
+-----------------------------------------------------
+    ObjectRegistry()::destroy_objects_marked_for_deletion()
+
+    Remove every game object marked for deletion from
+    the registry, the index of its tag and the render queue.
+    Give the game objects that came from an object pool back to it.
+-------------------------------------------------- """
@@ -0,0 +1,238 @@
+import collections
+import time
+
+import pygame
+
+""" ---------------------------------------------------------------
+    PerfHud Class
+
+    An overlay that shows where the time of every frame goes.
+    While it is shown, the methods it times are wrapped on their
+    objects, and the wrappers are removed when it is hidden, so
+    a hidden overlay leaves nothing behind in the game loop.
+    The timings are summed over the ticks of a frame, and the
+    text is only rendered again a few times a second so it can
+    be read. Every frame the rolling frame time histogram is
+    drawn under it.
+--------------------------------------------------------------- """
+class PerfHud():
+	# The number of frames the text shows the mean of, before it is rendered again.
+	refresh_frame_count = 15
+
+	# The number of frames kept for the frame time histogram.
+	histogram_frame_count = 120
+
+	# The upper edge of every bucket of the histogram, in milliseconds. The last bucket
+	# has no upper edge.
+	histogram_edges = (8.0, 17.0, 25.0, 33.0, 50.0)
+
+	# The names of the object tags, by tag.
+	tag_names = ("test", "gui", "text", "falling", "block", "display", "ghost")
+
+	def __init__(self, game_system):
+		#initialize the area of the overlay, its font, the timed methods and the frame timings
+		self.game_system = game_system
+		self.panel_rect = pygame.Rect(484, 176, 152, 400)
+		self.line_height = 11
+
+		if "PressStart2P-tiny" not in game_system.fonts:
+			game_system.load_font("../fonts/", "PressStart2P.ttf", "PressStart2P-tiny", 8)
+
+		self.font = game_system.fonts["PressStart2P-tiny"]
+		self.timer_names = ("settings", "falling", "destroy", "gather", "render")
+		self.timed_methods = (
+			(game_system.settings, "update", "settings"),
+			(game_system.simulation, "update_tetronimos_falling", "falling"),
+			(game_system.object_registry, "destroy_objects_marked_for_deletion", "destroy"),
+			(game_system.render_queue, "update_render_states", "gather"),
+			(game_system.render_queue, "render", "render"),
+		)
+		self.timer_sums = dict.fromkeys(self.timer_names, 0.0)
+		self.tick_count = 0
+		self.frame_count = 0
+		self.frame_time_sum = 0.0
+		self.frame_times = collections.deque(maxlen = self.histogram_frame_count)
+		self.last_frame_time = None
+		self.replaced_methods = []
+		self.text_surfaces = []
+		self.bucket_surfaces = []
+
+		#The bucket labels are the upper edges, and never change, so they are rendered once
+		bucket_names = [str(int(edge)) for edge in self.histogram_edges]
+		bucket_names.append("+")
+
+		for bucket_name in bucket_names:
+			self.bucket_surfaces.append(self.font.render(bucket_name, False, (255, 255, 255)))
+
+	def enable(self):
+		#Wrap every timed method on its object with a timer
+		#A method may already be wrapped on its object by the frame tracer
+		self.replaced_methods = []
+
+		for owner, method_name, timer_name in self.timed_methods:
+			self.replaced_methods.append(vars(owner).get(method_name))
+			setattr(owner, method_name, self.create_timed_method(getattr(owner, method_name), \
+					timer_name))
+
+		self.last_frame_time = time.perf_counter()
+
+	def disable(self):
+		#Remove the wrappers, so the methods they replaced are called directly again
+		for (owner, method_name, timer_name), replaced_method in zip(self.timed_methods, \
+				self.replaced_methods):
+			if replaced_method is None:
+				delattr(owner, method_name)
+			else:
+				setattr(owner, method_name, replaced_method)
+
+	def create_timed_method(self, method, timer_name):
+		#Wrap a bound method so the time spent in it is added to its timer
+		timer_sums = self.timer_sums
+		perf_counter = time.perf_counter
+
+		def timed_method(*args, **kwargs):
+			start_time = perf_counter()
+			result = method(*args, **kwargs)
+			timer_sums[timer_name] += perf_counter() - start_time
+			return result
+
+		if timer_name == "settings":
+			#The settings update once every tick, so it also counts the ticks
+			def counted_method(*args, **kwargs):
+				self.tick_count += 1
+				return timed_method(*args, **kwargs)
+
+			return counted_method
+
+		return timed_method
+
+	def draw(self, backbuffer):
+		#Add the time of the frame that ended and draw the overlay on the backbuffer
+		cur_time = time.perf_counter()
+		frame_time = (cur_time - self.last_frame_time) * 1000.0
+		self.last_frame_time = cur_time
+		self.frame_times.append(frame_time)
+		self.frame_time_sum += frame_time
+		self.frame_count += 1
+
+		if self.frame_count >= self.refresh_frame_count or len(self.text_surfaces) == 0:
+			self.render_text()
+
+		backbuffer.fill((0, 0, 0), self.panel_rect)
+		position_y = self.panel_rect.top + 4
+
+		for text_surface in self.text_surfaces:
+			backbuffer.blit(text_surface, (self.panel_rect.left + 4, position_y))
+			position_y += self.line_height
+
+		self.draw_histogram(backbuffer, position_y + 4)
+
+	def render_text(self):
+		#Render the mean timings of the frames since the last refresh, the object counts
+		#and the blit count
+		frame_count = max(1, self.frame_count)
+		frame_time = self.frame_time_sum / frame_count
+		object_registry = self.game_system.object_registry
+		lines = [
+			"frame    {:6.2f}ms".format(frame_time),
+			"fps      {:6.1f}".format(1000.0 / frame_time if frame_time > 0.0 else 0.0),
+			"ticks    {:6.1f}".format(self.tick_count / frame_count),
+		]
+
+		for timer_name in self.timer_names:
+			lines.append("{:<8} {:6.2f}ms".format(timer_name, \
+					self.timer_sums[timer_name] * 1000.0 / frame_count))
+			self.timer_sums[timer_name] = 0.0
+
+		lines.append("blits    {:6d}".format(self.game_system.render_queue.blit_count))
+		lines.append("")
+		lines.append("objects")
+
+		for tag in range(0, len(self.tag_names)):
+			lines.append("{} {:<8} {:5d}".format(tag, self.tag_names[tag], \
+					len(object_registry.get_objects_with_tag(tag))))
+
+		lines.append("")
+		lines.append("frame times ms")
+		self.text_surfaces = [self.font.render(line, False, (255, 255, 255)) for line in lines]
+		self.tick_count = 0
+		self.frame_count = 0
+		self.frame_time_sum = 0.0
+
+	def draw_histogram(self, backbuffer, top):
+		#Draw a bar for every bucket of the frame times kept, as a share of the frames kept
+		bucket_counts = [0] * (len(self.histogram_edges) + 1)
+
+		for frame_time in self.frame_times:
+			bucket_index = 0
+
+			while bucket_index < len(self.histogram_edges) and \
+					frame_time >= self.histogram_edges[bucket_index]:
+				bucket_index += 1
+
+			bucket_counts[bucket_index] += 1
+
+		bar_width = (self.panel_rect.width - 8) // len(bucket_counts)
+		bar_height = self.panel_rect.bottom - top - 4 - self.line_height
+
+		for bucket_index in range(0, len(bucket_counts)):
+			height = bar_height * bucket_counts[bucket_index] // self.histogram_frame_count
+			backbuffer.fill((0, 190, 0) if bucket_index < 2 else (255, 0, 0), \
+					(self.panel_rect.left + 4 + bucket_index * bar_width, top + bar_height - height, \
+					bar_width - 2, height))
+			backbuffer.blit(self.bucket_surfaces[bucket_index], (self.panel_rect.left + 4 + \
+					bucket_index * bar_width, top + bar_height + 2))
+
+""" --------------------------------------------------
+    Initialize each PerfHud object with:
+        - the game system it shows the timings of.
+	- the area of the screen the overlay is drawn to.
+	- the height of a line of text.
+	- the small font of the overlay, loaded the first time
+	      the overlay is shown.
+	- the names of the timers, in the order they are shown.
+	- the methods timed, as the object they are called on,
+	      the method name and the timer name.
+	- the methods the wrappers replaced on their objects,
+	      or None where the method of the class was used.
+	- the time spent in every timer since the last refresh.
+	- the ticks, the frames and the frame time since the
+	      last refresh.
+	- the frame times of the last frames, in milliseconds.
+	- the time the last frame ended.
+	- the rendered lines of text.
+	- the rendered label of every bucket of the histogram.
+-----------------------------------------------------
+    PerfHud()::enable()
+
+    Wrap every timed method on its object with a timer,
+    keeping the methods already set on the objects.
+-----------------------------------------------------
+    PerfHud()::disable()
+
+    Remove the wrappers from the objects, so the methods
+    they replaced are called directly again.
+-----------------------------------------------------
+    PerfHud()::create_timed_method()
+
+    Wrap a bound method so the time spent in it is added to
+    its timer. The settings update also counts the ticks.
+-----------------------------------------------------
+    PerfHud()::draw()
+
+    Add the time of the frame that ended, render the text
+    again if it is time to, and draw the overlay and the
+    histogram on the backbuffer.
+-----------------------------------------------------
+    PerfHud()::render_text()
+
+    Render the mean frame time, ticks and timings of the
+    frames since the last refresh, the blit count and the
+    number of game objects of every tag.
+-----------------------------------------------------
+    PerfHud()::draw_histogram()
+
+    Draw a bar for every bucket of the frame times kept,
+    with its label under it. The buckets within a 60 fps
+    frame are green and the slower ones red.
+-------------------------------------------------- """
@@ -0,0 +1,334 @@
+from tetronimo_tables import TetronimoTables
+
+"""The placement search of the bot. Finds every placement a tetronimo can reach from its spawn position by rotating and moving sideways, drops it on a compact copy of the board and scores the board left behind. The next tetronimo of the preview is searched the same way on top of the best placements. Placements are made and taken back with an undo stack, so the board is only copied once for every search."""
+class PlacementSearch():
+	# The weights of the board heuristic: the sum of the column heights, the rows cleared,
+	# the empty cells under a filled cell and the height differences of neighbouring columns.
+	weights = {
+		"height": -0.510066,
+		"lines": 0.760666,
+		"holes": -0.35663,
+		"bumpiness": -0.184483,
+	}
+
+	def __init__(self, settings, lookahead_count = 6):
+		"""Initialized the placement search."""
+
+		# A reference to the board of landed tetronimo blocks.
+		self.board = settings.board
+
+		# The number of columns and rows of the board.
+		self.column_count = self.board.column_count
+		self.row_count = self.board.row_count
+
+		# The bitmask of a row with every column filled.
+		self.full_row_mask = self.board.full_row_mask
+
+		# A tetronimo that lands with a block in this row or above it ends the game.
+		self.game_over_row = self.board.get_row(64)
+
+		# The number of best placements of the current tetronimo that are searched again
+		# with the next tetronimo on top of them.
+		self.lookahead_count = lookahead_count
+
+		# The bitmask of every row of the board being searched, from the top row to the
+		# bottom row.
+		self.rows = [0] * self.row_count
+
+		# The number of filled cells of the board being searched.
+		self.cell_count = 0
+
+		# The top filled row of every column of the board being searched.
+		self.column_tops = [self.row_count] * self.column_count
+
+		# The blocks placed and the rows cleared by every placement, so it can be undone.
+		self.undo_stack = []
+
+		# The cells and the kick cells of every rotation of every tetronimo type at its spawn
+		# position. Indexed by tetronimo type and then by rotation state.
+		self.spawn_cells = []
+		self.spawn_kick_cells = []
+
+		for tetronimo_type in range(0, len(TetronimoTables.rotations)):
+			spawn_position = settings.tetronimo_spawn_pos_D
+
+			if tetronimo_type == 0:
+				spawn_position = settings.tetronimo_spawn_pos_O
+			elif tetronimo_type == 1:
+				spawn_position = settings.tetronimo_spawn_pos_I
+
+			self.spawn_cells.append(tuple(self.get_cells(spawn_position, rotation) \
+					for rotation in TetronimoTables.rotations[tetronimo_type]))
+			self.spawn_kick_cells.append(tuple(self.get_cells(spawn_position, \
+					rotation_kicks) for rotation_kicks in \
+					TetronimoTables.kick_positions[tetronimo_type]))
+
+		# The number of rows at the top of the board that a tetronimo can touch while it is
+		# rotated and moved into place.
+		self.spawn_row_count = 1 + max(row for cells in self.spawn_cells + \
+				self.spawn_kick_cells for rotation_cells in cells for column, row in rotation_cells)
+
+		# The reachable placements of every tetronimo type while the rows at the top of the
+		# board are empty. They only depend on the walls then. Keys are the tetronimo types.
+		self.open_placements = {}
+
+	def get_cells(self, spawn_position, offsets):
+		"""Gets the column and row of every position relative to the spawn position."""
+		return tuple((self.board.get_column(spawn_position[0] + offset[0]), \
+				self.board.get_row(spawn_position[1] + offset[1])) for offset in offsets)
+
+	def load(self):
+		"""Copies the rows of the board to search them."""
+		self.rows[:] = self.board.rows
+		self.cell_count = sum(bin(row).count("1") for row in self.rows)
+		self.column_tops = self.get_column_tops()
+		self.undo_stack.clear()
+
+	def is_free(self, cells, column_offset):
+		"""Checks if every cell, moved by the column offset, is inside the board and empty."""
+		rows = self.rows
+
+		for column, row in cells:
+			column += column_offset
+
+			if column < 0 or column >= self.column_count or row < 0 or \
+					row >= self.row_count or (rows[row] >> column) & 1:
+				return False
+
+		return True
+
+	def is_reachable(self, tetronimo_type, rotation_state, column_offset):
+		"""Checks if the tetronimo can reach the rotation and the column offset from its spawn position. Every step of the inputs rotates first and then moves one column, as the tetronimo falling does on a single frame. A rotation that would need a kick is not reachable."""
+		spawn_cells = self.spawn_cells[tetronimo_type]
+		spawn_kick_cells = self.spawn_kick_cells[tetronimo_type]
+		direction = 1 if column_offset > 0 else -1
+		cur_rotation_state = 0
+		cur_column_offset = 0
+
+		if not self.is_free(spawn_cells[0], 0):
+			return False
+
+		for step in range(0, max(rotation_state, abs(column_offset))):
+			if step < rotation_state:
+				cur_rotation_state += 1
+
+				if not self.is_free(spawn_cells[cur_rotation_state], cur_column_offset) or \
+						not self.is_free(spawn_kick_cells[cur_rotation_state], cur_column_offset):
+					return False
+
+			if step < abs(column_offset):
+				cur_column_offset += direction
+
+				if not self.is_free(spawn_cells[cur_rotation_state], cur_column_offset):
+					return False
+
+		return True
+
+	def get_placements(self, tetronimo_type):
+		"""Gets the rotation state and the column offset of every reachable placement. Rotations that fill the same cells as a rotation with fewer presses are left out."""
+		is_open = not any(self.rows[0:self.spawn_row_count])
+
+		if is_open and tetronimo_type in self.open_placements:
+			return self.open_placements[tetronimo_type]
+
+		placements = []
+		seen_cells = set()
+		spawn_cells = self.spawn_cells[tetronimo_type]
+
+		for rotation_state in range(0, 4):
+			cells = spawn_cells[rotation_state]
+
+			if cells in seen_cells:
+				continue
+
+			seen_cells.add(cells)
+			columns = [column for column, row in cells]
+
+			for column_offset in range(-min(columns), self.column_count - max(columns)):
+				if self.is_reachable(tetronimo_type, rotation_state, column_offset):
+					placements.append((rotation_state, column_offset))
+
+		if is_open:
+			self.open_placements[tetronimo_type] = placements
+
+		return placements
+
+	def get_column_tops(self):
+		"""Gets the top filled row of every column, or the row count if the column is empty. Only needed when the board is loaded and when rows are cleared, since a placement only raises the tops of its columns."""
+		column_tops = [self.row_count] * self.column_count
+		filled_mask = 0
+
+		for row_index in range(0, self.row_count):
+			row = self.rows[row_index]
+			new_mask = row & ~filled_mask
+
+			while new_mask:
+				bit = new_mask & -new_mask
+				column_tops[bit.bit_length() - 1] = row_index
+				new_mask ^= bit
+
+			filled_mask |= row
+
+			# Every column has its top once the rows above fill every column.
+			if filled_mask == self.full_row_mask:
+				break
+
+		return column_tops
+
+	def get_drop_distance(self, cells, column_offset, column_tops):
+		"""Gets the number of rows the cells fall before they land. A cell above the top of its column lands on it. A cell under the top of its column is under an overhang, so the column is scanned down from it."""
+		rows = self.rows
+		drop_distance = self.row_count
+
+		for column, row in cells:
+			column += column_offset
+			landing_row = column_tops[column]
+
+			if row >= landing_row:
+				landing_row = row + 1
+
+				while landing_row < self.row_count and not (rows[landing_row] >> column) & 1:
+					landing_row += 1
+
+			if landing_row - row - 1 < drop_distance:
+				drop_distance = landing_row - row - 1
+
+		return drop_distance
+
+	def place(self, tetronimo_type, rotation_state, column_offset):
+		"""Drops the tetronimo at a placement and clears the full rows. Returns the number of rows cleared, or -1 if the tetronimo lands high enough to end the game. Undo the placement with undo()."""
+		rows = self.rows
+		cells = self.spawn_cells[tetronimo_type][rotation_state]
+		previous_column_tops = self.column_tops
+		column_tops = list(previous_column_tops)
+		drop_distance = self.get_drop_distance(cells, column_offset, column_tops)
+		placed_cells = []
+		is_game_over = False
+
+		for column, row in cells:
+			column += column_offset
+			row += drop_distance
+			rows[row] |= 1 << column
+			placed_cells.append((column, row))
+
+			if row < column_tops[column]:
+				column_tops[column] = row
+			if row <= self.game_over_row:
+				is_game_over = True
+
+		# Clear the full rows from the top row down, so the rows still to be cleared keep their
+		# index.
+		cleared_rows = sorted(set(row for column, row in placed_cells \
+				if rows[row] == self.full_row_mask))
+
+		for row in cleared_rows:
+			del rows[row]
+			rows.insert(0, 0)
+
+		self.column_tops = column_tops
+
+		if len(cleared_rows) > 0:
+			self.column_tops = self.get_column_tops()
+
+		self.cell_count += len(placed_cells) - len(cleared_rows) * self.column_count
+		self.undo_stack.append((placed_cells, cleared_rows, previous_column_tops))
+
+		if is_game_over:
+			return -1
+
+		return len(cleared_rows)
+
+	def undo(self):
+		"""Takes back the last placement."""
+		rows = self.rows
+		placed_cells, cleared_rows, self.column_tops = self.undo_stack.pop()
+
+		for row in reversed(cleared_rows):
+			del rows[0]
+			rows.insert(row, self.full_row_mask)
+
+		for column, row in placed_cells:
+			rows[row] &= ~(1 << column)
+
+		self.cell_count -= len(placed_cells) - len(cleared_rows) * self.column_count
+
+	def evaluate(self, line_count):
+		"""Scores the board with the weighted heuristic. Higher is better. Every cell under the top of its column is either filled or a hole, so the holes are the cells under the column tops less the filled cells."""
+		weights = self.weights
+		column_tops = self.column_tops
+		height = self.row_count * self.column_count - sum(column_tops)
+		hole_count = height - self.cell_count
+		bumpiness = sum(abs(column_top - next_column_top) for column_top, next_column_top \
+				in zip(column_tops, column_tops[1:]))
+
+		return weights["height"] * height + weights["lines"] * line_count + \
+				weights["holes"] * hole_count + weights["bumpiness"] * bumpiness
+
+	def search_placements(self, tetronimo_type, line_count):
+		"""Scores every placement of the tetronimo on the current board. Returns the score, the rotation state and the column offset of every placement that does not end the game."""
+		results = []
+
+		for rotation_state, column_offset in self.get_placements(tetronimo_type):
+			placed_line_count = self.place(tetronimo_type, rotation_state, column_offset)
+
+			if placed_line_count >= 0:
+				results.append((self.evaluate(line_count + placed_line_count), \
+						rotation_state, column_offset))
+
+			self.undo()
+
+		return results
+
+	def find_best_placement(self, tetronimo_type, next_tetronimo_type = None):
+		"""Finds the best placement of the tetronimo on the board. The best placements are searched again with the next tetronimo on top, and scored by the best board the next tetronimo can leave. Returns the rotation state and the column offset, or None if every placement ends the game."""
+		self.load()
+		results = self.search_placements(tetronimo_type, 0)
+
+		if len(results) == 0:
+			return None
+
+		results.sort(key = lambda result: -result[0])
+
+		if next_tetronimo_type is None:
+			return results[0][1:]
+
+		best_score = None
+		best_placement = results[0][1:]
+
+		for score, rotation_state, column_offset in results[0:self.lookahead_count]:
+			line_count = self.place(tetronimo_type, rotation_state, column_offset)
+			next_results = self.search_placements(next_tetronimo_type, line_count)
+			self.undo()
+
+			if len(next_results) > 0:
+				score = max(next_results)[0]
+
+				if best_score is None or score > best_score:
+					best_score = score
+					best_placement = (rotation_state, column_offset)
+
+		return best_placement
+
+	@staticmethod
+	def get_input_sequence(rotation_state, column_offset):
+		"""Gets the keys to press on every frame to reach a placement and drop the tetronimo. A rotation and a move can be pressed on the same frame. The keys are released on the frame after, since they only act when first pressed, and the tetronimo is dropped on the last frame."""
+		move_key = "right" if column_offset > 0 else "left"
+		input_sequence = []
+
+		for step in range(0, max(rotation_state, abs(column_offset))):
+			keys = []
+
+			if step < rotation_state:
+				keys.append("rotate")
+			if step < abs(column_offset):
+				keys.append(move_key)
+
+			input_sequence.append(tuple(keys))
+			input_sequence.append(())
+
+		if len(input_sequence) > 0:
+			input_sequence.pop()
+
+		input_sequence.append(("drop",))
+
+		return input_sequence
@@ -0,0 +1,48 @@
+import random
+
+""" ---------------------------------------------------------------
+    RandomInput Class
+
+    A scripted input source for the headless game simulation. It
+    presses random keys from its own seeded random number
+    generator and holds them for a few frames, so the same seed
+    always plays the same game.
+--------------------------------------------------------------- """
+class RandomInput():
+	def __init__(self, seed, hold_frame_count = 12):
+		#initialize the random number generator and the number of frames to hold the keys
+		#The seed is turned into a string so the key presses differ from the tetronimos of the same seed
+		self.random = random.Random("input " + str(seed))
+		self.hold_frame_count = hold_frame_count
+		self.cur_hold_frame = 0
+
+	def update(self, simulation):
+		#Set the keys of the input state of the simulation for the next frame
+		input_state = simulation.input_manager
+
+		if self.cur_hold_frame > 0:
+			self.cur_hold_frame -= 1
+
+			#Only drop the tetronimo on the first frame the keys are pressed
+			input_state.pressed_x = False
+			return
+
+		self.cur_hold_frame = self.hold_frame_count - 1
+		direction = self.random.random()
+
+		input_state.set_keys(self.random.random() < 0.2, direction < 0.3, \
+				direction >= 0.7, self.random.random() < 0.3, \
+				self.random.random() < 0.15, self.random.random() < 0.03)
+
+""" --------------------------------------------------
+    Initialize each RandomInput object with:
+        - the random number generator for the key presses.
+	- the number of frames the keys are held for.
+	- the number of frames left to hold the current keys.
+-----------------------------------------------------
+    RandomInput()::update()
+
+    Set the keys of the input state of the simulation
+    for the next frame. New random keys are pressed
+    once the current keys have been held long enough.
+-------------------------------------------------- """
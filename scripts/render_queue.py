@@ -0,0 +1,203 @@
+import pygame
+
+""" ---------------------------------------------------------------
+    RenderQueue Class
+
+    Keeps the game objects bucketed by the layer of their sprite
+    image and remembers where each one was last drawn. Only the
+    areas of the screen that changed since the previous frame are
+    redrawn and sent to the display.
+--------------------------------------------------------------- """
+class RenderQueue():
+	def __init__(self, layer_count):
+		#initialize the layer buckets, the render states and the frame counters
+		self.layers = []
+		self.render_states = {}
+		self.dirty_rects = []
+		self.needs_full_redraw = True
+		self.blit_count = 0
+		self.dirty_area = 0
+
+		for layer in range(0, layer_count):
+			self.layers.append({})
+
+	def add(self, game_object):
+		#Add a newly created game object to the bucket of its layer
+		#The render state holds the sprite image, position, visibility, rect and layer
+		self.render_states[game_object.object_id] = [None, None, None, False, None, 0]
+		self.layers[0][game_object.object_id] = game_object
+
+	def remove(self, game_object):
+		#Remove a destroyed game object and redraw the area where it was last drawn
+		render_state = self.render_states.pop(game_object.object_id, None)
+
+		if render_state is not None:
+			self.layers[render_state[5]].pop(game_object.object_id, None)
+
+			if render_state[3]:
+				self.dirty_rects.append(render_state[4])
+
+	def invalidate(self):
+		#Redraw the whole screen on the next frame
+		self.needs_full_redraw = True
+
+	def update_render_states(self):
+		#Recompute the rects of the game objects that moved, changed sprite or were hidden
+		#Returns the rects of the visible game objects of every layer
+		visible_objects = []
+		visible_rects = []
+		moved_objects = []
+
+		for layer_index in range(0, len(self.layers)):
+			cur_visible_objects = []
+			cur_visible_rects = []
+
+			for object_id, cur_game_obj in self.layers[layer_index].items():
+				render_state = self.render_states[object_id]
+				cur_sprite_image = cur_game_obj.cur_sprite_image
+				is_visible = cur_game_obj.is_active and cur_sprite_image is not None and \
+						cur_sprite_image.image is not None
+
+				if cur_sprite_image is not render_state[0] or \
+						cur_game_obj.position_x != render_state[1] or \
+						cur_game_obj.position_y != render_state[2] or \
+						is_visible != render_state[3]:
+
+					if render_state[3]:
+						self.dirty_rects.append(render_state[4])
+
+					render_state[0] = cur_sprite_image
+					render_state[1] = cur_game_obj.position_x
+					render_state[2] = cur_game_obj.position_y
+					render_state[3] = is_visible
+
+					if is_visible:
+						cur_rect = cur_sprite_image.image.get_rect()
+						cur_rect.center = (cur_game_obj.position_x, cur_game_obj.position_y)
+						render_state[4] = cur_rect
+						self.dirty_rects.append(cur_rect)
+
+						if cur_sprite_image.image_layer != layer_index:
+							moved_objects.append(cur_game_obj)
+
+				if is_visible and cur_sprite_image.image_layer == layer_index:
+					cur_visible_objects.append(cur_game_obj)
+					cur_visible_rects.append(render_state[4])
+
+			visible_objects.append(cur_visible_objects)
+			visible_rects.append(cur_visible_rects)
+
+		#Move the game objects whose sprite image changed layer into their new bucket
+		for cur_game_obj in moved_objects:
+			render_state = self.render_states[cur_game_obj.object_id]
+			layer_index = cur_game_obj.cur_sprite_image.image_layer
+
+			self.layers[render_state[5]].pop(cur_game_obj.object_id, None)
+			self.layers[layer_index][cur_game_obj.object_id] = cur_game_obj
+			render_state[5] = layer_index
+
+			visible_objects[layer_index].append(cur_game_obj)
+			visible_rects[layer_index].append(render_state[4])
+
+		return (visible_objects, visible_rects)
+
+	def merge_dirty_rects(self, screen_rect):
+		#Merge the overlapping dirty rects so no area is drawn twice
+		merged_rects = []
+
+		for cur_rect in self.dirty_rects:
+			cur_rect = cur_rect.clip(screen_rect)
+
+			if cur_rect.width == 0 or cur_rect.height == 0:
+				continue
+
+			index = cur_rect.collidelist(merged_rects)
+
+			while index != -1:
+				cur_rect.union_ip(merged_rects.pop(index))
+				index = cur_rect.collidelist(merged_rects)
+
+			merged_rects.append(cur_rect)
+
+		return merged_rects
+
+	def render(self, backbuffer, background):
+		#Redraw the dirty areas of the backbuffer and send only those areas to the display
+		visible_objects, visible_rects = self.update_render_states()
+		screen_rect = backbuffer.get_rect()
+
+		if self.needs_full_redraw:
+			self.needs_full_redraw = False
+			self.dirty_rects = [screen_rect]
+
+		dirty_rects = self.merge_dirty_rects(screen_rect)
+		self.dirty_rects = []
+		self.blit_count = 0
+		self.dirty_area = 0
+
+		for dirty_rect in dirty_rects:
+			self.dirty_area += dirty_rect.width * dirty_rect.height
+
+			backbuffer.set_clip(dirty_rect)
+			backbuffer.blit(background, dirty_rect, dirty_rect)
+			self.blit_count += 1
+
+			for layer_index in range(0, len(visible_objects)):
+				cur_visible_objects = visible_objects[layer_index]
+
+				for index in dirty_rect.collidelistall(visible_rects[layer_index]):
+					cur_game_obj = cur_visible_objects[index]
+					backbuffer.blit(cur_game_obj.cur_sprite_image.image, \
+							visible_rects[layer_index][index])
+					self.blit_count += 1
+
+		backbuffer.set_clip(None)
+
+		if len(dirty_rects) > 0:
+			pygame.display.update(dirty_rects)
+
+""" --------------------------------------------------
+    Initialize each RenderQueue object with:
+        - the game objects of each layer. Keys are the game object ids.
+	- the render state of each game object. Keys are the game object ids.
+	      It holds the sprite image, the x and y position and the
+	      visibility the game object was last drawn with, the rect
+	      it was drawn to and the layer bucket it is in.
+	- the rects that must be redrawn on the next frame.
+	- a flag to check if the whole screen must be redrawn.
+	- the number of blits of the last frame.
+	- the area in pixels sent to the display on the last frame.
+-----------------------------------------------------
+    RenderQueue()::add()
+
+    Add a newly created game object to the bucket of its layer.
+-----------------------------------------------------
+    RenderQueue()::remove()
+
+    Remove a destroyed game object. The area where it was
+    last drawn is redrawn on the next frame.
+-----------------------------------------------------
+    RenderQueue()::invalidate()
+
+    Redraw the whole screen on the next frame.
+-----------------------------------------------------
+    RenderQueue()::update_render_states()
+
+    Go through every bucket and compare each game object
+    with the state it was last drawn with. Only the game
+    objects that moved, changed sprite or were hidden get
+    a new rect. The old and new rects are marked dirty.
+    Returns the visible game objects and their rects by layer.
+-----------------------------------------------------
+    RenderQueue()::merge_dirty_rects()
+
+    Clip the dirty rects to the screen and merge the
+    overlapping ones.
+-----------------------------------------------------
+    RenderQueue()::render()
+
+    For every dirty rect, blit the background under it
+    and then every visible game object touching it,
+    layer by layer. Lastly, update only the dirty rects
+    of the display.
+-------------------------------------------------- """
@@ -0,0 +1,266 @@
+import bisect
+import struct
+import zlib
+
+from game_snapshot import GameSnapshot
+
+""" ---------------------------------------------------------------
+    Replay Class
+
+    A recorded game. The tetronimos of a game only depend on its
+    seed, and the game logic only reads a few keys, so a game is
+    stored as its seed and the frames on which those keys change.
+    The stats of the game when it was recorded are kept too, so
+    playing the replay again checks that the game still plays
+    the same.
+    Every few tetronimos a snapshot of the game is compressed
+    and kept as a keyframe, so a viewer can jump to any frame
+    by restoring the last keyframe before it and playing only
+    the frames after it.
+--------------------------------------------------------------- """
+class Replay():
+	# The first bytes of every replay file and the version of its layout.
+	file_magic = b"TTRP"
+	file_version = 3
+
+	# The header of the replay: the magic, the version, the seed, the number of frames,
+	# the score, the rows cleared, the pieces placed and the number of key changes.
+	header_format = "<4sHQIIIII"
+
+	# After the key changes: the keyframe interval and the number of keyframes, then the
+	# index of the keyframes. Every entry of the index is the frame of the keyframe, the
+	# pieces placed, and the offset and the size of the keyframe in the replay.
+	keyframe_header_format = "<II"
+	keyframe_index_format = "<IIII"
+
+	# The keys read by the game logic, by their bit in the key mask.
+	key_names = ("pressed_down", "pressed_left", "pressed_right", "pressed_z", \
+			"pressed_x", "tapped_c")
+
+	def __init__(self, seed, keyframe_interval = 100):
+		#initialize the seed, the number of frames, the stats, the key changes and the keyframes
+		self.seed = seed
+		self.tick_count = 0
+		self.score = 0
+		self.rows_cleared = 0
+		self.pieces_placed = 0
+		self.key_changes = []
+		self.cur_key_mask = 0
+		self.keyframe_interval = keyframe_interval
+		self.keyframe_ticks = []
+		self.keyframes = []
+
+	@staticmethod
+	def get_key_mask(input_state):
+		#Get the keys read by the game logic as a bitmask
+		key_mask = 0
+
+		for index in range(0, len(Replay.key_names)):
+			if getattr(input_state, Replay.key_names[index]):
+				key_mask |= 1 << index
+
+		return key_mask
+
+	@staticmethod
+	def set_keys(input_state, key_mask):
+		#Set the keys read by the game logic from a bitmask
+		for index in range(0, len(Replay.key_names)):
+			setattr(input_state, Replay.key_names[index], (key_mask >> index) & 1 == 1)
+
+	def record_tick(self, simulation):
+		#Record the keys of the next frame of the simulation. Only the frames on which the keys
+		#change are kept. A keyframe is taken once every keyframe interval of pieces placed
+		tick = simulation.tick_count
+		key_mask = self.get_key_mask(simulation.input_manager)
+		pieces_placed = simulation.settings.pieces_placed
+
+		if key_mask != self.cur_key_mask:
+			self.key_changes.append((tick, key_mask))
+			self.cur_key_mask = key_mask
+
+		if pieces_placed >= (len(self.keyframes) + 1) * self.keyframe_interval and \
+				GameSnapshot.can_capture(simulation):
+			self.keyframe_ticks.append(tick)
+			self.keyframes.append((pieces_placed, \
+					zlib.compress(GameSnapshot.capture(simulation))))
+
+		self.tick_count = tick + 1
+
+	def get_keyframe(self, tick):
+		#Get the snapshot of the last keyframe taken on or before a frame, or None if there is none
+		index = bisect.bisect_right(self.keyframe_ticks, tick)
+
+		if index == 0:
+			return None
+
+		return zlib.decompress(self.keyframes[index - 1][1])
+
+	def record_stats(self, settings):
+		#Remember the stats of the game, to check them when the replay is played again
+		self.score = settings.score
+		self.rows_cleared = settings.rows_cleared
+		self.pieces_placed = settings.pieces_placed
+
+	def is_matching(self, settings):
+		#Check if a game played from the replay ended with the recorded stats
+		return settings.score == self.score and \
+				settings.rows_cleared == self.rows_cleared and \
+				settings.pieces_placed == self.pieces_placed
+
+	def to_bytes(self):
+		#Pack the replay. Every key change is the number of frames since the previous change
+		#as a variable length number, then the key mask
+		data = bytearray(struct.pack(self.header_format, self.file_magic, \
+				self.file_version, self.seed, self.tick_count, self.score, \
+				self.rows_cleared, self.pieces_placed, len(self.key_changes)))
+		prev_tick = 0
+
+		for tick, key_mask in self.key_changes:
+			tick_delta = tick - prev_tick
+			prev_tick = tick
+
+			while tick_delta >= 0x80:
+				data.append((tick_delta & 0x7f) | 0x80)
+				tick_delta >>= 7
+
+			data.append(tick_delta)
+			data.append(key_mask)
+
+		data.extend(struct.pack(self.keyframe_header_format, self.keyframe_interval, \
+				len(self.keyframes)))
+		offset = len(data) + struct.calcsize(self.keyframe_index_format) * len(self.keyframes)
+
+		for tick, (pieces_placed, keyframe) in zip(self.keyframe_ticks, self.keyframes):
+			data.extend(struct.pack(self.keyframe_index_format, tick, pieces_placed, offset, \
+					len(keyframe)))
+			offset += len(keyframe)
+
+		for pieces_placed, keyframe in self.keyframes:
+			data.extend(keyframe)
+
+		return bytes(data)
+
+	@staticmethod
+	def from_bytes(data):
+		#Unpack a replay packed by to_bytes(). Replays of the first version have no keyframes,
+		#and the keyframes of the second version are not snapshots, so they are left out
+		magic, version, seed, tick_count, score, rows_cleared, pieces_placed, \
+				change_count = struct.unpack_from(Replay.header_format, data, 0)
+
+		if magic != Replay.file_magic or version < 1 or version > Replay.file_version:
+			raise ValueError("Not a replay file")
+
+		replay = Replay(seed)
+		replay.tick_count = tick_count
+		replay.score = score
+		replay.rows_cleared = rows_cleared
+		replay.pieces_placed = pieces_placed
+
+		position = struct.calcsize(Replay.header_format)
+		tick = 0
+
+		for index in range(0, change_count):
+			tick_delta = 0
+			shift = 0
+
+			while data[position] & 0x80:
+				tick_delta |= (data[position] & 0x7f) << shift
+				shift += 7
+				position += 1
+
+			tick_delta |= data[position] << shift
+			tick += tick_delta
+			replay.key_changes.append((tick, data[position + 1]))
+			position += 2
+
+		if version < 3:
+			return replay
+
+		replay.keyframe_interval, keyframe_count = struct.unpack_from( \
+				Replay.keyframe_header_format, data, position)
+		position += struct.calcsize(Replay.keyframe_header_format)
+
+		for tick, pieces_placed, offset, size in struct.iter_unpack( \
+				Replay.keyframe_index_format, data[position:position + keyframe_count * \
+				struct.calcsize(Replay.keyframe_index_format)]):
+			replay.keyframe_ticks.append(tick)
+			replay.keyframes.append((pieces_placed, bytes(data[offset:offset + size])))
+
+		return replay
+
+	def save(self, file_url):
+		#Write the replay to a file
+		with open(file_url, "wb") as out_file:
+			out_file.write(self.to_bytes())
+
+	@staticmethod
+	def load(file_url):
+		#Read a replay from a file
+		with open(file_url, "rb") as in_file:
+			return Replay.from_bytes(in_file.read())
+
+""" --------------------------------------------------
+    Initialize each Replay object with:
+        - the seed of the tetronimos of the game.
+	- the number of frames of the game.
+	- the score, the rows cleared and the pieces placed
+	      when the game was recorded.
+	- the frames on which the keys changed and the keys
+	      from then on, as a bitmask.
+	- the keys of the last frame recorded.
+	- the number of pieces placed between keyframes.
+	- the frame of every keyframe, in order.
+	- the pieces placed and the compressed game snapshot
+	      of every keyframe.
+-----------------------------------------------------
+    Replay()::get_key_mask()
+
+    Get the keys read by the game logic as a bitmask.
+-----------------------------------------------------
+    Replay()::set_keys()
+
+    Set the keys read by the game logic from a bitmask.
+-----------------------------------------------------
+    Replay()::record_tick()
+
+    Record the keys of the next frame of the simulation.
+    Only the frames on which the keys change are kept.
+    Once every keyframe interval of pieces placed, the
+    game snapshot is compressed and kept as a keyframe at
+    the first frame a snapshot can be taken.
+-----------------------------------------------------
+    Replay()::get_keyframe()
+
+    Get the snapshot of the last keyframe taken on or
+    before a frame, with a binary search of the keyframe
+    frames. Returns None if there is none.
+-----------------------------------------------------
+    Replay()::record_stats()
+
+    Remember the stats of the game.
+-----------------------------------------------------
+    Replay()::is_matching()
+
+    Check if a game played from the replay ended with
+    the recorded stats.
+-----------------------------------------------------
+    Replay()::to_bytes()
+
+    Pack the replay into bytes: the header, then every
+    key change as the frames since the previous change
+    and the key mask, then the keyframe index and the
+    keyframes.
+-----------------------------------------------------
+    Replay()::from_bytes()
+
+    Unpack a replay packed by to_bytes(). The keyframes
+    are only decompressed when they are restored.
+-----------------------------------------------------
+    Replay()::save()
+
+    Write the replay to a file.
+-----------------------------------------------------
+    Replay()::load()
+
+    Read a replay from a file.
+-------------------------------------------------- """
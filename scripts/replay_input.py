@@ -0,0 +1,48 @@
+import bisect
+
+from replay import Replay
+
+""" ---------------------------------------------------------------
+    ReplayInput Class
+
+    An input source that plays a recorded game again. Before
+    every frame it sets the keys that were pressed on the same
+    frame when the game was recorded. It can start on any frame
+    of the replay, after the game is restored from a keyframe.
+--------------------------------------------------------------- """
+class ReplayInput():
+	def __init__(self, replay, start_tick = 0):
+		#initialize the replay being played and the next key change to apply
+		#The keys of the start frame are the keys of the last change before it
+		self.replay = replay
+		self.next_change_index = bisect.bisect_left(replay.key_changes, (start_tick, 0))
+		self.cur_key_mask = 0
+
+		if self.next_change_index > 0:
+			self.cur_key_mask = replay.key_changes[self.next_change_index - 1][1]
+
+	def update(self, simulation):
+		#Set the keys of the input state of the simulation for the next frame
+		key_changes = self.replay.key_changes
+		tick = simulation.tick_count
+
+		while self.next_change_index < len(key_changes) and \
+				key_changes[self.next_change_index][0] <= tick:
+			self.cur_key_mask = key_changes[self.next_change_index][1]
+			self.next_change_index += 1
+
+		Replay.set_keys(simulation.input_manager, self.cur_key_mask)
+
+""" --------------------------------------------------
+    Initialize each ReplayInput object with:
+        - the replay being played.
+	- the index of the next key change to apply, found
+	      with a binary search from the start frame.
+	- the keys of the current frame, as a bitmask.
+-----------------------------------------------------
+    ReplayInput()::update()
+
+    Set the keys of the input state of the simulation
+    for the next frame from the key changes of the
+    replay up to that frame.
+-------------------------------------------------- """
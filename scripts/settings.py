@@ -1,8 +1,8 @@
-import pygame
 import random
-import os.path
 
-"""The settings object for the game. It contains all the scoring and high score information, as well as the game state and the tetronimo assembly."""
+from tetronimo_board import TetronimoBoard
+
+"""The settings object for the game. It contains all the scoring and high score information, as well as the game state and the tetronimo assembly. It does not depend on pygame, so the tetronimo assembly can also run in the headless game simulation."""
 class Settings():
 	def __init__(self):
 		"""Initialized the settings."""
@@ -31,6 +31,9 @@ class Settings():
 		# The total number of rows cleared.
 		self.rows_cleared = 0
 		
+		# The total number of tetronimos that have landed.
+		self.pieces_placed = 0
+		
 		# The period at which the tetronimo timer accumulates frames. In milliseconds.
 		self.tetronimo_timer_period = 1000.0
 		
@@ -60,6 +63,11 @@ class Settings():
 		# The bounds of the tetronimo container. left, right, top, bottom.
 		self.tetronimo_container_bounds = (160, 480, 16, 784)
 		
+		# The board of landed tetronimo blocks. One cell for every 32 by 32 pixels of the 
+		# tetronimo container.
+		self.board = TetronimoBoard(10, 24, self.tetronimo_container_bounds[0], \
+				self.tetronimo_container_bounds[2], 32)
+		
 		# The spawn position of the O tetronimo.
 		self.tetronimo_spawn_pos_O = (320, 48)
 		
@@ -84,9 +92,13 @@ class Settings():
 		# is removed.
 		self.tetronimo_type_queue = []
 		
-		# A list of references to the tetronimo displays.
+		# A list of references to the tetronimo displays. The headless game simulation 
+		# has no tetronimo displays.
 		self.tetronimo_displays = []
 		
+		# The index of the tetronimo display for the saved tetronimo.
+		self.saved_tetronimo_display_index = 4
+		
 		# The saved tetronimo that the player saved.
 		self.cached_tetronimo_falling = None
 		
@@ -108,7 +120,8 @@ class Settings():
 		# The input manager for checking the user input.
 		self.input_manager = None
 		
-		# A reference to the game system.
+		# A reference to the game system, or to the game simulation when running 
+		# headless. It loads the game over map once the player loses.
 		self.game_system = None
 		
 		#text box score
@@ -117,66 +130,58 @@ class Settings():
 		#text box highscore
 		self.text_box_highscore = None
 		
-		# The sound buffer for the background sounds.
-		self.channel_1 = None
-		self.channel_2 = None
-		self.channel_3 = None
-		
-		# The song for the background music.
-		self.tetris_a_url = "../audio/tetris_a.ogg"
-		
-		# The sound effects.
-		self.sound_hit_floor = None
-		self.sound_rotate = None
-		self.sound_tetris = None
+		# The audio manager for playing the sounds. There is none when running headless.
+		self.audio_manager = None
 
-		# Set up the random seed.
-		random.seed()
+		# The random number generator for the tetronimo types. Every settings object has 
+		# its own, so games can be seeded and run side by side.
+		self.random = random.Random()
 
 		# The score for each line clear 
 		self.score = 0
 		
+		# The store that keeps the high score in memory and writes it to the high score 
+		# file.
+		self.high_score_store = None
 		
-		#Highscore 
-		highscore = 0
-		
-		#open high_score txt file and read in file. First check if it exists. If not, add it.
-		if not os.path.isfile("../data/high_score.txt"):
-			highscore= open("../data/high_score.txt", "w+")
-			highscore.close()
-		
-		highscore = open("../data/high_score.txt", "r+")
-		highscore = highscore.read()
-		#if file is emppty where there no highscore 
-
-		if not highscore:
-			# Then write 0 in high_score.txt file 
-			whighscore= open("../data/high_score.txt", "w+")
-			whighscore.write(str(0))
-			whighscore.close()
-
-		# if score is greater than highscore then output the score to the txt file 
-		if int(self.score) > int(highscore):
-			writehighscore= open("../data/high_score.txt", "w+")
-			writehighscore.write(str(self.score))
-			writehighscore.close()
-		
-	def init_audio(self):
-		# Initialize the sound mixer.
-		pygame.mixer.init(44100, -16, 1, 512)
-		
-		# The sound buffer for the background sounds.
-		self.channel_1 = pygame.mixer.Channel(0)
-		self.channel_2 = pygame.mixer.Channel(1)
-		self.channel_3 = pygame.mixer.Channel(2)
-		
-		# The song for the background music.
-		self.tetris_a_url = "../audio/tetris_a.ogg"
+	def play_sound(self, channel_index, sound_name):
+		"""Queues a sound effect for a sound channel, if there is an audio manager. The queued sounds are played once per frame."""
+		if self.audio_manager is not None:
+			self.audio_manager.queue_sound(channel_index, sound_name)
+			
+	def stop_music(self):
+		"""Stops the background music, if there is an audio manager."""
+		if self.audio_manager is not None:
+			self.audio_manager.stop_music()
+			
+	def set_tetronimo_display_type(self, index, image_type):
+		"""Sets the image type of a tetronimo display, if the tetronimo display exists."""
+		if index < len(self.tetronimo_displays):
+			self.tetronimo_displays[index].image_type = image_type
+			
+	def reset_game(self):
+		"""Resets the score and the timers after a game is over."""
+		self.score = 0
+		self.tetronimo_assembly_state = 0
+		self.tetronimo_timer_cur = 0
+		self.next_tetronimo_type = 0
+		self.rows_cleared = 0
+		self.pieces_placed = 0
+		self.tetronimo_timer_period = 1000.0
+		self.tetronimo_timer_min_period = 50.0
+		self.remove_row_timer_period = 1000.0
+		self.block_flash_period = 200.0
+		self.tetronimo_timer_period_cache = self.tetronimo_timer_period
+		self.delta_time_accum = 0.0
+		self.delta_time_accum_remove_row = 0.0
+		self.delta_time_accum_block_flash = 0.0
+		self.block_fill_pos_y = self.tetronimo_container_bounds[3]
+		self.tetronimo_inc = False
 		
-		# The sound effects.
-		self.sound_hit_floor = pygame.mixer.Sound("../audio/hit_floor.ogg")
-		self.sound_rotate = pygame.mixer.Sound("../audio/rotate.ogg")
-		self.sound_tetris = pygame.mixer.Sound("../audio/tetris.ogg")
+		# The falling tetronimos of the previous game are given back to the object pool and
+		# handed out again, so they must not be kept.
+		self.cur_tetronimo_falling = None
+		self.cached_tetronimo_falling = None
 		
 	def reset_tetronimo_assembly(self):
 		"""Resets the tetronimo assembly. Must be called after every game start."""
@@ -190,6 +195,7 @@ class Settings():
 		self.tetronimo_assembly_state = 5
 		self.block_fill_pos_y = self.tetronimo_container_bounds[3]
 		self.tetronimo_rows.clear()
+		self.board.clear()
 		
 		# Add 3 random tetronimos.
 		self.tetronimo_type_queue.append(self.rand_tetronimo_type())
@@ -197,15 +203,19 @@ class Settings():
 		self.tetronimo_type_queue.append(self.rand_tetronimo_type())
 		self.tetronimo_type_queue.append(self.rand_tetronimo_type())
 		
-		# Set the image type of the last tetronimo display to none.
-		self.tetronimo_displays[len(self.tetronimo_displays) - 1].image_type = 7
+		# Set the image type of the saved tetronimo display to none.
+		self.set_tetronimo_display_type(self.saved_tetronimo_display_index, 7)
 		
 	def rand_tetronimo_type(self):
 		"""Generates a random number for the tetronimo type."""
 		# The random number being generated.
-		random_number = random.randint(0, 6)
+		random_number = self.random.randint(0, 6)
 		return random_number
 		
+	def seed_random(self, seed):
+		"""Seeds the random number generator for the tetronimo types. The same seed gives the same tetronimos."""
+		self.random.seed(seed)
+		
 	def update_tetronimo_type_queue(self):
 		"""Updates the tetronimo type queue by adding a new tetronimo type and deleting the old one."""
 		self.tetronimo_type_queue.append(self.rand_tetronimo_type())
@@ -213,16 +223,7 @@ class Settings():
 		
 		# Update the tetronimo displays with the new tetronimos in the tetronimo queue.
 		for x in range(0, 4):
-			# The index for the tetronimo display.
-			index = 4 - (x + 1)
-			
-			# The current tetronimo type.
-			cur_tetronimo_type = self.tetronimo_type_queue[x]
-			
-			# The current tetronimo display.
-			cur_tetronimo_display = self.tetronimo_displays[x]
-			
-			cur_tetronimo_display.image_type = cur_tetronimo_type
+			self.set_tetronimo_display_type(x, self.tetronimo_type_queue[x])
 	
 	
 		
@@ -233,17 +234,9 @@ class Settings():
 			self.text_box_score.set_text(str(self.score))
 		#high score text 
 		if self.text_box_highscore is not None:
-			
-			#read in highscore from high_score.txt file
-			highscore = open("../data/high_score.txt", "r+")
-			highscore = highscore.read()
 			#if score higher then update highscore
-			if int(self.score) > int(highscore):
-				self.text_box_highscore.set_text(str(self.score))
-				writehighscore= open("../data/high_score.txt", "w+")
-				writehighscore.write(str(self.score))
-			if int(self.score) <= int(highscore):
-				self.text_box_highscore.set_text(str(highscore))
+			highscore = self.high_score_store.submit_score(self.score)
+			self.text_box_highscore.set_text(str(highscore))
 
 		# Game state for when the game is playing classic mode.
 		if self.game_state == 0:
@@ -273,154 +266,7 @@ class Settings():
 				# Check if the c key is tapped so that the player can save or swap a falling 
 				# tetronimo.
 				if self.input_manager.tapped_c:
-					
-					# If there is no cached tetronimo, then cache one.
-					if self.cached_tetronimo_falling is None:
-						
-						# Deactivate the current tetronimo falling.
-						self.cur_tetronimo_falling.is_active = False
-						
-						# Also deactivate the blocks of the tetronimo falling.
-						for block in self.cur_tetronimo_falling.tetronimo_blocks:
-							block.is_active = False
-						
-						self.cached_tetronimo_falling = self.cur_tetronimo_falling
-						self.tetronimo_assembly_state = 5
-						
-						# Update the tetronimo display for the saved tetronimo.
-						self.tetronimo_displays[len(self.tetronimo_displays) - 1]. \
-							image_type = self.cur_tetronimo_falling.tetronimo_type
-							
-						self.channel_2.play(self.sound_rotate, False)
-						
-					else:		
-						# Tetronimos may differ in their central coordinate depending 
-						# on their tetronimo type, so choose the correct offsets for 
-						# assigning the position of the cached tetronimo.
-						
-						# The type of the cached tetronimo.
-						type_cache = self.cached_tetronimo_falling.tetronimo_type
-						
-						# The type of the current tetronimo.
-						type_cur = self.cur_tetronimo_falling.tetronimo_type
-						
-						# The type cache type. Types are 'D' for L, J, S, Z, and T,
-						# 'O' for O, and 'I' for I. They all have a different 
-						# coordinate.
-						type_cache_type = 'D'
-						type_cur_type = 'D'
-						
-						if type_cache == 0:
-							type_cache_type = 'O'
-						elif type_cache == 1:
-							type_cache_type = 'I'
-							
-						if type_cur == 0:
-							type_cur_type = 'O'
-						elif type_cur == 1:
-							type_cur_type = 'I'
-							
-						# The extra offset for the x coordinate when switching between 
-						# tetronimo type types.
-						extra_offset_x = 0
-						
-						# The extra offset for the y coordinate when switching between 
-						# tetronimo type types.
-						extra_offset_y = 0
-							
-						# Choose the correct offset types based on the tetronimo type 
-						# types.
-						if type_cache_type == 'O' and type_cur_type == 'D':
-							extra_offset_x = -16
-							extra_offset_y = -16
-						elif type_cache_type == 'D' and type_cur_type == 'O':
-							extra_offset_x = 16
-							extra_offset_y = 16
-						elif type_cache_type == 'I' and type_cur_type == 'D':
-							extra_offset_x = -16
-							extra_offset_y = -32
-						elif type_cache_type == 'D' and type_cur_type == 'I':
-							extra_offset_x = 16
-							extra_offset_y = 32
-						elif type_cache_type == 'O' and type_cur_type == 'I':
-							extra_offset_y = 16
-						elif type_cache_type == 'I' and type_cur_type == 'O':
-							extra_offset_y = -16
-							
-						# Update the position of the tetronimo blocks of the cached 
-						# tetronimo falling.
-						for cur_block in self.cached_tetronimo_falling.tetronimo_blocks:
-								
-							cur_block.position_x += \
-									self.cur_tetronimo_falling.position_x - \
-									self.cached_tetronimo_falling.position_x + \
-									extra_offset_x
-							cur_block.position_y += \
-									self.cur_tetronimo_falling.position_y - \
-									self.cached_tetronimo_falling.position_y + \
-									extra_offset_y
-							
-						# Also update the position of the cached tetronimo.
-						self.cached_tetronimo_falling.position_x = \
-								self.cur_tetronimo_falling.position_x + extra_offset_x
-								
-						self.cached_tetronimo_falling.position_y = \
-								self.cur_tetronimo_falling.position_y + extra_offset_y
-								
-						# Check if the tetronimo is colliding with any other tetronimos 
-						# before swapping.
-						
-						# Checks if a collision with a block occured.
-						collision_occured = False
-						
-						for cur_block in self.cached_tetronimo_falling.tetronimo_blocks:
-							for key in self.tetronimo_blocks:
-							
-								# The current tetronimo block being tested for collision.
-								cur_block_other = self.tetronimo_blocks[key]
-								
-								if cur_block_other.block_state == 1:
-									if cur_block.position_x == \
-											cur_block_other.position_x and \
-										cur_block.position_y == \
-											cur_block_other.position_y:
-										collision_occured = True
-										break
-										
-							if collision_occured:
-								break
-								
-							# Also check if the new piece is colliding with the walls
-							if cur_block.position_x <= \
-									self.tetronimo_container_bounds[0] or \
-									cur_block.position_x >= \
-									self.tetronimo_container_bounds[1] or \
-									cur_block.position_y >= \
-									self.tetronimo_container_bounds[3]:
-								collision_occured = True
-								break
-								
-						if not collision_occured:
-							# Deactivate the current tetronimo falling.
-							self.cur_tetronimo_falling.is_active = False
-							for block in self.cur_tetronimo_falling.tetronimo_blocks:
-								block.is_active = False
-						
-							# Activate the cached tetronimo falling.
-							self.cached_tetronimo_falling.is_active = True
-							for block in self.cached_tetronimo_falling.tetronimo_blocks:
-								block.is_active = True
-								
-							# Swap the cached tetronimo and the current tetronimo falling.
-							temp = self.cached_tetronimo_falling
-							self.cached_tetronimo_falling = self.cur_tetronimo_falling
-							self.cur_tetronimo_falling = temp
-							
-							# Update the tetronimo display for the saved tetronimo.
-							self.tetronimo_displays[len(self.tetronimo_displays) - 1]. \
-								image_type = self.cached_tetronimo_falling.tetronimo_type
-								
-							self.channel_2.play(self.sound_rotate, False)
+					self.hold_tetronimo_falling()
 						
 			self.delta_time_accum += delta_time
 			
@@ -440,128 +286,24 @@ class Settings():
 			# tetronimos on top of the screen.
 			if self.tetronimo_assembly_state == 1:
 				# Check if there are any blocks at the top of the screen.
-				for key in self.tetronimo_blocks:
-					cur_block = self.tetronimo_blocks[key]
-					
-					if cur_block.is_active and cur_block.block_state == 1 and \
-							cur_block.position_y == 64:
-						self.tetronimo_assembly_state = 4
-						
-						pygame.mixer.music.stop()
-						
-						self.change_all_blocks_to_grey()
-						break
-						
-				# The row count values.
-				row_counts = {}
-				
-				# The row tetronimo objects.
-				row_objs = {}
-				
-				# Check for a line of tetronimos.
-				for key in self.tetronimo_blocks:
-					# The current tetronimo block being checked for being in a row.
-					cur_block = self.tetronimo_blocks[key]
+				if self.board.rows[self.board.get_row(64)] != 0:
+					self.tetronimo_assembly_state = 4
 					
-					# Only check the block if it is active and is in the block state 1.
-					if cur_block.is_active and cur_block.block_state == 1:
+					self.stop_music()
 					
-						# The y position of the current block.
-						pos_y = cur_block.position_y
-						
-						# Create the row array and count if it isn't created already for 
-						# this row.
-						if not pos_y in row_counts:
-							row_counts[pos_y] = 0
-							row_objs[pos_y] = []
-							
-						# Increment the number of blocks in the row and add the block to 
-						# the row block list that it belongs to.
-						row_counts[pos_y] += 1
-						row_objs[pos_y].append(cur_block)
-			
-				# Find the rows that have 10 blocks in them.
-				for key in row_counts:
-					# The current row cound that was found.
-					cur_row_count = row_counts[key]
-			
-					# If the row count is 10, then we found a row with 10 blocks.
-					if cur_row_count == 10:
-						#self.score += 40
-						#print(self.score)
-						# Add the rows with row count 10 to the list of rows found.
-						for key2 in row_counts:	
-												
-							# The current row count for the secondary row count.
-							cur_row_count2 = row_counts[key2]
-	
-							# If the row has 10 blocks, then add the row object to the 
-							# tetronimo rows list.
-							if cur_row_count2 == 10:
-								self.tetronimo_rows[key2] = row_objs[key2]
-								#increment score by 40 for each row clear
-								self.score += 40
-								
-						self.tetronimo_assembly_state = 2
+					self.change_all_blocks_to_grey()
 						
-						self.channel_3.play(self.sound_tetris, False)
-						
-						break
+				# The board keeps the rows that have 10 blocks in them up to date as the 
+				# blocks land, so a line of tetronimos is found without going through 
+				# every block.
+				if len(self.board.full_rows) > 0:
+					self.find_full_rows()
 						
 			# The state for destroying the rows of tetronimo blocks.
 			if self.tetronimo_assembly_state == 2:
 				# Once the timer is finished, destroy the row of blocks.
 				if self.delta_time_accum_remove_row >= self.remove_row_timer_period:
-					self.tetronimo_assembly_state = 3
-					self.delta_time_accum = 0.0
-					self.delta_time_accum_remove_row = 0.0
-					self.delta_time_accum_block_flash = 0.0
-					
-					# The sorted list of keys in ascending order.
-					key_list_sorted = []
-					
-					# First, sort all the row y value keys in ascending order.
-					for key in self.tetronimo_rows:
-						key_list_sorted.append(key)
-						
-					key_list_sorted.sort()
-					
-					# Destroy all the blocks in each row. Also move down blocks that are 
-					# above the row.
-					for key in key_list_sorted:
-					
-						# The current tetronimo row.
-						cur_tetronimo_row = self.tetronimo_rows[key]
-						
-						# Go through every block and mark it for deletion.
-						for block in cur_tetronimo_row:
-							block.marked_for_deletion = True
-					
-							
-						# Also increment the y value of the blocks above the row of blocks 
-						# being deleted.
-						for key2 in self.tetronimo_blocks:
-							# The current block being incremented.
-							cur_block = self.tetronimo_blocks[key2]
-							
-							# Only increment the block if it is active and has a block 
-							# state of 1.
-							if cur_block.is_active and cur_block.block_state == 1:
-								# If the block has a y value that is less than or equal to the 
-								# row y value, then increment the y value of the current 
-								# block.
-								if cur_block.position_y <= key:
-									cur_block.position_y += 32
-									
-						self.rows_cleared += 1
-						
-						# For every 4 rows cleared, decrease the tetronimo timer period by 
-						# 10 to increase the difficulty.
-						if self.tetronimo_timer_period > 50.0 and \
-								self.rows_cleared % 4 == 0:
-							self.tetronimo_timer_period -= 50.0
-								
-					self.tetronimo_rows.clear()
+					self.remove_full_rows()
 					
 				else:
 					self.delta_time_accum_remove_row += delta_time
@@ -591,19 +333,7 @@ class Settings():
 				
 			# Check if filling the screen with blocks after the player loses.
 			if self.tetronimo_assembly_state == 4:
-				# If the screen isn't already filled with blocks, fill it with blocks.
-				if self.block_fill_pos_y >= 32:
-					# Add 10 blocks to a single row two times.
-					self.create_row_of_grey_blocks()
-					self.create_row_of_grey_blocks()
-					
-				# After a certain amount of time, switch to the game over game state and 
-				# load the game over map.
-				elif self.block_fill_pos_y < -1024:
-					self.game_state = 2
-					self.game_system.load_map_game_over()
-				else:
-					self.block_fill_pos_y -= 32
+				self.fill_screen_with_grey_blocks()
 				
 			# Game state for when the tetronimo is first being created.
 			if self.tetronimo_assembly_state == 5:
@@ -633,6 +363,205 @@ class Settings():
 
 		
 	
+	def hold_tetronimo_falling(self):
+		"""Saves the tetronimo falling for later, or swaps it with the saved tetronimo if it fits."""
+		# If there is no cached tetronimo, then cache one.
+		if self.cached_tetronimo_falling is None:
+		
+			# Deactivate the current tetronimo falling.
+			self.cur_tetronimo_falling.is_active = False
+		
+			# Also deactivate the blocks of the tetronimo falling.
+			for block in self.cur_tetronimo_falling.tetronimo_blocks:
+				block.is_active = False
+		
+			self.cached_tetronimo_falling = self.cur_tetronimo_falling
+			self.tetronimo_assembly_state = 5
+		
+			# Update the tetronimo display for the saved tetronimo.
+			self.set_tetronimo_display_type( \
+				self.saved_tetronimo_display_index, \
+				self.cur_tetronimo_falling.tetronimo_type)
+		
+			self.play_sound(1, "rotate")
+		
+		else:		
+			# Tetronimos may differ in their central coordinate depending 
+			# on their tetronimo type, so choose the correct offsets for 
+			# assigning the position of the cached tetronimo.
+		
+			# The type of the cached tetronimo.
+			type_cache = self.cached_tetronimo_falling.tetronimo_type
+		
+			# The type of the current tetronimo.
+			type_cur = self.cur_tetronimo_falling.tetronimo_type
+		
+			# The type cache type. Types are 'D' for L, J, S, Z, and T,
+			# 'O' for O, and 'I' for I. They all have a different 
+			# coordinate.
+			type_cache_type = 'D'
+			type_cur_type = 'D'
+		
+			if type_cache == 0:
+				type_cache_type = 'O'
+			elif type_cache == 1:
+				type_cache_type = 'I'
+		
+			if type_cur == 0:
+				type_cur_type = 'O'
+			elif type_cur == 1:
+				type_cur_type = 'I'
+		
+			# The extra offset for the x coordinate when switching between 
+			# tetronimo type types.
+			extra_offset_x = 0
+		
+			# The extra offset for the y coordinate when switching between 
+			# tetronimo type types.
+			extra_offset_y = 0
+		
+			# Choose the correct offset types based on the tetronimo type 
+			# types.
+			if type_cache_type == 'O' and type_cur_type == 'D':
+				extra_offset_x = -16
+				extra_offset_y = -16
+			elif type_cache_type == 'D' and type_cur_type == 'O':
+				extra_offset_x = 16
+				extra_offset_y = 16
+			elif type_cache_type == 'I' and type_cur_type == 'D':
+				extra_offset_x = -16
+				extra_offset_y = -32
+			elif type_cache_type == 'D' and type_cur_type == 'I':
+				extra_offset_x = 16
+				extra_offset_y = 32
+			elif type_cache_type == 'O' and type_cur_type == 'I':
+				extra_offset_y = 16
+			elif type_cache_type == 'I' and type_cur_type == 'O':
+				extra_offset_y = -16
+		
+			# Update the position of the tetronimo blocks of the cached 
+			# tetronimo falling.
+			for cur_block in self.cached_tetronimo_falling.tetronimo_blocks:
+		
+				cur_block.position_x += \
+						self.cur_tetronimo_falling.position_x - \
+						self.cached_tetronimo_falling.position_x + \
+						extra_offset_x
+				cur_block.position_y += \
+						self.cur_tetronimo_falling.position_y - \
+						self.cached_tetronimo_falling.position_y + \
+						extra_offset_y
+		
+			# Also update the position of the cached tetronimo.
+			self.cached_tetronimo_falling.position_x = \
+					self.cur_tetronimo_falling.position_x + extra_offset_x
+		
+			self.cached_tetronimo_falling.position_y = \
+					self.cur_tetronimo_falling.position_y + extra_offset_y
+		
+			# Check if the tetronimo is colliding with any other tetronimos 
+			# before swapping.
+		
+			# Checks if a collision with a block occured.
+			collision_occured = False
+		
+			for cur_block in self.cached_tetronimo_falling.tetronimo_blocks:
+				# Check the board for a landed block in the same cell.
+				if self.board.is_occupied(cur_block.position_x, \
+						cur_block.position_y):
+					collision_occured = True
+					break
+		
+				# Also check if the new piece is colliding with the walls
+				if cur_block.position_x <= \
+						self.tetronimo_container_bounds[0] or \
+						cur_block.position_x >= \
+						self.tetronimo_container_bounds[1] or \
+						cur_block.position_y >= \
+						self.tetronimo_container_bounds[3]:
+					collision_occured = True
+					break
+		
+			if not collision_occured:
+				# Deactivate the current tetronimo falling.
+				self.cur_tetronimo_falling.is_active = False
+				for block in self.cur_tetronimo_falling.tetronimo_blocks:
+					block.is_active = False
+		
+				# Activate the cached tetronimo falling.
+				self.cached_tetronimo_falling.is_active = True
+				for block in self.cached_tetronimo_falling.tetronimo_blocks:
+					block.is_active = True
+		
+				# Swap the cached tetronimo and the current tetronimo falling.
+				temp = self.cached_tetronimo_falling
+				self.cached_tetronimo_falling = self.cur_tetronimo_falling
+				self.cur_tetronimo_falling = temp
+		
+				# Update the tetronimo display for the saved tetronimo.
+				self.set_tetronimo_display_type( \
+					self.saved_tetronimo_display_index, \
+					self.cached_tetronimo_falling.tetronimo_type)
+		
+				self.play_sound(1, "rotate")
+		
+	
+	def find_full_rows(self):
+		"""Adds the full rows of the board to the rows being cleared and scores them."""
+		# Add the rows with 10 blocks to the list of rows found.
+		for row in self.board.get_full_rows():
+			self.tetronimo_rows[self.board.get_position_y(row)] = \
+					self.board.get_blocks_in_row(row)
+			#increment score by 40 for each row clear
+			self.score += 40
+		
+		self.tetronimo_assembly_state = 2
+		
+		self.play_sound(2, "tetris")
+		
+	
+	def remove_full_rows(self):
+		"""Removes the full rows from the board once they have flashed, and speeds up the game every 4 rows cleared."""
+		self.tetronimo_assembly_state = 3
+		self.delta_time_accum = 0.0
+		self.delta_time_accum_remove_row = 0.0
+		self.delta_time_accum_block_flash = 0.0
+		
+		# Remove every full row from the board in one pass. The rows above are 
+		# moved down together with their blocks. Then destroy all the blocks 
+		# in the full rows.
+		for block in self.board.collapse_full_rows():
+			block.mark_for_deletion()
+		
+		for key in self.tetronimo_rows:
+			self.rows_cleared += 1
+		
+			# For every 4 rows cleared, decrease the tetronimo timer period by 
+			# 10 to increase the difficulty.
+			if self.tetronimo_timer_period > 50.0 and \
+					self.rows_cleared % 4 == 0:
+				self.tetronimo_timer_period -= 50.0
+		
+		self.tetronimo_rows.clear()
+		
+	
+	def fill_screen_with_grey_blocks(self):
+		"""Fills the screen with grey blocks after the player loses, then shows the game over screen."""
+		# If the screen isn't already filled with blocks, fill it with blocks.
+		if self.block_fill_pos_y >= 32:
+			# Add 10 blocks to a single row two times.
+			self.create_row_of_grey_blocks()
+			self.create_row_of_grey_blocks()
+		
+		# After a certain amount of time, switch to the game over game state and 
+		# load the game over map.
+		elif self.block_fill_pos_y < -1024:
+			self.game_state = 2
+			self.game_system.load_map_game_over()
+		else:
+			self.block_fill_pos_y -= 32
+		
+	
 	def change_all_blocks_to_grey(self):
 		"""Changes all the blocks to grey. Also removes any blocks past the tetronimo container bounds."""
 		for key in self.tetronimo_blocks:
@@ -643,7 +572,7 @@ class Settings():
 			# Also mark the block for deletion if it is below the threshold of the 
 			# tetronimo container bounds.
 			if cur_block.position_y < self.tetronimo_container_bounds[2]:
-				cur_block.marked_for_deletion = True
+				cur_block.mark_for_deletion()
 			else:
 				cur_block.change_to_grey_block_sprite()
 			
@@ -0,0 +1,175 @@
+import hashlib
+import os
+
+import pygame
+
+"""The sprite atlas. The sprites of the image folder are packed into a single surface in the display format, and every sprite is handed out as a subsurface of it. The packed atlas is cached on disk and only rebuilt when a source image changes."""
+class SpriteAtlas():
+	def __init__(self, image_folder_url, cache_folder_url, atlas_width, asset_bundle):
+		"""Initialized the sprite atlas."""
+
+		# The folder of the source images.
+		self.image_folder_url = image_folder_url
+
+		# The folder where the packed atlases are cached.
+		self.cache_folder_url = cache_folder_url
+
+		# The width of the atlas surface. The sprites are packed in rows of this width.
+		self.atlas_width = atlas_width
+
+		# The asset bundle the source images are loaded from.
+		self.asset_bundle = asset_bundle
+
+		# The hash of the source images the atlas was built from.
+		self.atlas_hash = None
+
+		# The packed atlas surface.
+		self.surface = None
+
+		# The area of every sprite on the atlas surface. Keys are the sprite names.
+		self.sprite_rects = {}
+
+		# Checks if the atlas surface is in the display format.
+		self.is_converted = False
+
+	def load(self, sprite_names):
+		"""Loads the atlas of the sprites and returns the sprite surfaces by name."""
+		self.load_surface(sprite_names)
+
+		return self.get_sprites(sprite_names)
+
+	def load_surface(self, sprite_names):
+		"""Loads the atlas surface of the sprites without converting it, so it can be called on a worker thread. Uses the cached atlas if no source image has changed."""
+		atlas_hash = self.get_hash(sprite_names)
+
+		# The file names of the cached atlas and of its index of sprite rects.
+		cache_url = os.path.join(self.cache_folder_url, "atlas_" + atlas_hash + ".png")
+		index_url = os.path.join(self.cache_folder_url, "atlas_" + atlas_hash + ".txt")
+
+		surface = None
+		sprite_rects = None
+
+		if os.path.isfile(cache_url) and os.path.isfile(index_url):
+			try:
+				surface = pygame.image.load(cache_url)
+				sprite_rects = self.load_index(index_url)
+			except (OSError, ValueError, pygame.error):
+				surface = None
+
+		if surface is None or any(sprite_name not in sprite_rects for sprite_name in sprite_names):
+			surface, sprite_rects = self.pack(sprite_names)
+			self.save(surface, sprite_rects, cache_url, index_url)
+
+		self.atlas_hash = atlas_hash
+		self.surface = surface
+		self.sprite_rects = sprite_rects
+		self.is_converted = False
+
+	def get_sprites(self, sprite_names):
+		"""Returns the sprite surfaces of the loaded atlas by name. The atlas is first converted to the display format so that blitting the sprites is fast."""
+		if not self.is_converted and pygame.display.get_surface() is not None:
+			self.surface = self.surface.convert_alpha()
+			self.is_converted = True
+
+		surface = self.surface
+		sprite_rects = self.sprite_rects
+		sprites = {}
+
+		for sprite_name in sprite_names:
+			sprites[sprite_name] = surface.subsurface(sprite_rects[sprite_name])
+
+		return sprites
+
+	def get_hash(self, sprite_names):
+		"""Hashes the names and the asset stamps of the source images. Any changed source image gives a new hash."""
+		atlas_hash = hashlib.sha1(str(self.atlas_width).encode("utf-8"))
+
+		for sprite_name in sprite_names:
+			asset_stamp = self.asset_bundle.get_asset_stamp(os.path.join( \
+					self.image_folder_url, sprite_name))
+			atlas_hash.update((sprite_name + " " + asset_stamp + "\n").encode("utf-8"))
+
+		return atlas_hash.hexdigest()
+
+	def pack(self, sprite_names):
+		"""Loads the source images and packs them in rows, tallest first. Returns the atlas surface and the sprite rects."""
+		images = {}
+
+		for sprite_name in sprite_names:
+			images[sprite_name] = pygame.image.load(self.asset_bundle.get_asset_source( \
+					os.path.join(self.image_folder_url, sprite_name)), sprite_name)
+
+		# The top left position of the next sprite and the height of the current row.
+		cur_position_x = 0
+		cur_position_y = 0
+		row_height = 0
+
+		sprite_rects = {}
+
+		for sprite_name in sorted(sprite_names, key = lambda name: \
+				(-images[name].get_height(), name)):
+			width, height = images[sprite_name].get_size()
+
+			if cur_position_x + width > self.atlas_width:
+				cur_position_x = 0
+				cur_position_y += row_height
+				row_height = 0
+
+			sprite_rects[sprite_name] = pygame.Rect(cur_position_x, cur_position_y, \
+					width, height)
+			cur_position_x += width
+			row_height = max(row_height, height)
+
+		surface = pygame.Surface((self.atlas_width, max(1, cur_position_y + row_height)), \
+				pygame.SRCALPHA, 32)
+		surface.fill((0, 0, 0, 0))
+
+		# Copy the pixels and their alpha as they are, instead of blending them.
+		for sprite_name in sprite_rects:
+			image = images[sprite_name]
+
+			if image.get_flags() & pygame.SRCALPHA:
+				surface.blit(image, sprite_rects[sprite_name], special_flags = pygame.BLEND_RGBA_ADD)
+			else:
+				surface.blit(image, sprite_rects[sprite_name])
+
+		return surface, sprite_rects
+
+	def load_index(self, index_url):
+		"""Reads the sprite rects of a cached atlas. Every line holds a sprite name and its rect."""
+		sprite_rects = {}
+
+		with open(index_url, "r") as in_file:
+			for line in in_file:
+				values = line.split()
+
+				if len(values) != 5:
+					raise ValueError("Bad sprite atlas index line: " + line)
+
+				sprite_rects[values[0]] = pygame.Rect(int(values[1]), int(values[2]), \
+						int(values[3]), int(values[4]))
+
+		return sprite_rects
+
+	def save(self, surface, sprite_rects, cache_url, index_url):
+		"""Writes the atlas and its index to the cache folder. A failed write only skips the cache."""
+		temp_url = cache_url + ".tmp.png"
+		temp_index_url = index_url + ".tmp"
+
+		try:
+			os.makedirs(self.cache_folder_url, exist_ok=True)
+			pygame.image.save(surface, temp_url)
+
+			with open(temp_index_url, "w") as out_file:
+				for sprite_name in sorted(sprite_rects):
+					sprite_rect = sprite_rects[sprite_name]
+					out_file.write(sprite_name + " " + str(sprite_rect.x) + " " + \
+							str(sprite_rect.y) + " " + str(sprite_rect.width) + " " + \
+							str(sprite_rect.height) + "\n")
+
+			os.replace(temp_url, cache_url)
+			os.replace(temp_index_url, index_url)
+		except (OSError, pygame.error):
+			for cur_url in (temp_url, temp_index_url):
+				if os.path.exists(cur_url):
+					os.remove(cur_url)
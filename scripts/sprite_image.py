@@ -1,9 +1,7 @@
-import pygame
-
-from pygame.sprite import Sprite
-
-"""The sprite image object for containing an image and an image rect."""
+"""The sprite image object for containing an image and an image rect. The sprite images made by the object factory are shared by many game objects, so they are never changed once created."""
 class SpriteImage():
+	__slots__ = ("image_layer", "image", "image_rect")
+	
 	def __init__(self, image_layer, image):
 		"""Initialized the sprite image."""
 		
@@ -13,14 +11,5 @@ class SpriteImage():
 		# The sprite image that can be rendered.
 		self.image = image
 		
-		# The current image rect of the original rect.
-		cur_image_rect = image.get_rect()
-		
 		# The new copy of the original image rect.
-		self.image_rect = pygame.Rect(0, 0, 
-			cur_image_rect.width, cur_image_rect.height)
-		
-	def update_image_rect(self, position_x, position_y):
-		"""Updates the image rect's position."""
-		self.image_rect.centerx = position_x
-		self.image_rect.centery = position_y
+		self.image_rect = image.get_rect()
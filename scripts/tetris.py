@@ -1,4 +1,11 @@
+import argparse
+import os
+import sys
+import time
+
 from game_system import GameSystem
+from game_simulation import GameSimulation
+from replay import Replay
 from button import Button
 
 import pygame
@@ -6,5 +13,59 @@ pygame.init()
 
 
 """This is the primary python script for running the game. You must run this script to run the game and the other scripts."""
+parser = argparse.ArgumentParser(description = "Tired of Tetris' Team - Tetris Game")
+parser.add_argument("--turbo", action = "store_true", \
+		help = "run the game as fast as possible instead of at 60 frames per second")
+parser.add_argument("--autoplay", action = "store_true", \
+		help = "let the bot play the game by itself. Press a to take over")
+parser.add_argument("--record", metavar = "FILE", \
+		help = "record every game to a replay file. The last game is kept")
+parser.add_argument("--play", metavar = "FILE", \
+		help = "play a replay file again as fast as possible without a window and check its stats")
+parser.add_argument("--seek", metavar = "FRAME", type = int, \
+		help = "with --play, jump to a frame of the replay from its nearest keyframe and show the stats there")
+parser.add_argument("--trace", metavar = "FILE", default = os.environ.get("TETRIS_TRACE"), \
+		help = "trace the last frames to a Chrome trace file when the game quits or F4 is pressed. " + \
+		"Can also be set with the TETRIS_TRACE environment variable")
+arguments = parser.parse_args()
+
+if arguments.play is not None and arguments.seek is not None:
+	# Jump to a frame of the replay on the headless game simulation, then exit.
+	replay = Replay.load(arguments.play)
+	simulation = GameSimulation()
+	start_time = time.perf_counter()
+	simulation.seek_replay(replay, arguments.seek)
+	seek_time = time.perf_counter() - start_time
+	settings = simulation.settings
+
+	print("Frame " + str(simulation.tick_count) + " reached in " + \
+			"{:.1f}".format(seek_time * 1000.0) + " milliseconds, score " + str(settings.score) + \
+			", rows " + str(settings.rows_cleared) + ", pieces " + str(settings.pieces_placed))
+	sys.exit(0)
+
+if arguments.play is not None:
+	# Play the replay on the headless game simulation, then exit.
+	replay = Replay.load(arguments.play)
+	simulation = GameSimulation()
+	start_time = time.perf_counter()
+	is_matching = simulation.play_replay(replay)
+	play_time = time.perf_counter() - start_time
+	settings = simulation.settings
+
+	print(str(simulation.tick_count) + " frames played in " + "{:.2f}".format(play_time) + \
+			" seconds, score " + str(settings.score) + ", rows " + str(settings.rows_cleared) + \
+			", pieces " + str(settings.pieces_placed))
+	print("Matches the recorded game." if is_matching else \
+			"Does not match the recorded game: score " + str(replay.score) + ", rows " + \
+			str(replay.rows_cleared) + ", pieces " + str(replay.pieces_placed) + ".")
+	sys.exit(0 if is_matching else 1)
+
 primary_game_system = GameSystem()  # The primary game system.
-primary_game_system.start_program() # Start the game system.
\ No newline at end of file
+primary_game_system.is_turbo = arguments.turbo
+primary_game_system.replay_url = arguments.record
+primary_game_system.trace_url = arguments.trace
+
+if arguments.autoplay:
+	primary_game_system.input_manager.toggle_autoplay()
+
+primary_game_system.start_program() # Start the game system.
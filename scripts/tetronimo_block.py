@@ -1,10 +1,10 @@
-import pygame
-
-from pygame.sprite import Sprite
 from game_object import GameObject
 
 """The tetronimo block class. Created every time a new tetronimo falling is created."""
 class TetronimoBlock(GameObject):
+	__slots__ = ("tetronimo_type", "block_state", "owner", "settings", "board", \
+			"primary_block_sprite_name")
+	
 	def __init__(self, object_id, tag, position_x, position_y, tetronimo_type, owner, settings, collision_box, sprite_images):
 		"""Initialized the tetronimo block game object."""
 	
@@ -61,30 +61,45 @@ class TetronimoBlock(GameObject):
 		# A reference to the settings object.
 		self.settings = settings
 		
-		# A reference to the tetronimo blocks.
-		self.tetronimo_blocks = self.settings.tetronimo_blocks
+		# A reference to the board of landed tetronimo blocks.
+		self.board = self.settings.board
+		
+		self.primary_block_sprite_name = None
+		
+		self.change_to_primary_block_type()
+			
+	def reset(self, object_id, position_x, position_y, tetronimo_type, owner):
+		"""Resets a tetronimo block taken from the object pool."""
+		super(TetronimoBlock, self).reset(object_id, position_x, position_y)
+		
+		self.tetronimo_type = tetronimo_type
+		self.block_state = 0
+		self.owner = owner
+		
+		self.change_to_primary_block_type()
 		
-		self.primary_block_sprite = None
+	def change_to_primary_block_type(self):
+		"""Sets the primary block sprite based on the tetronimo type."""
 		
 		# Set the correct image sprite based on the tetronimo type.
 		if self.tetronimo_type == 0:
-			self.primary_block_sprite = self.sprite_images["block_yellow.png"]
+			self.primary_block_sprite_name = "block_yellow.png"
 		elif self.tetronimo_type == 1:
-			self.primary_block_sprite = self.sprite_images["block_skyblue.png"]
+			self.primary_block_sprite_name = "block_skyblue.png"
 		elif self.tetronimo_type == 2:
-			self.primary_block_sprite = self.sprite_images["block_blue.png"]
+			self.primary_block_sprite_name = "block_blue.png"
 		elif self.tetronimo_type == 3:
-			self.primary_block_sprite = self.sprite_images["block_orange.png"]
+			self.primary_block_sprite_name = "block_orange.png"
 		elif self.tetronimo_type == 4:
-			self.primary_block_sprite = self.sprite_images["block_green.png"]
+			self.primary_block_sprite_name = "block_green.png"
 		elif self.tetronimo_type == 5:
-			self.primary_block_sprite = self.sprite_images["block_red.png"]
+			self.primary_block_sprite_name = "block_red.png"
 		elif self.tetronimo_type == 6:
-			self.primary_block_sprite = self.sprite_images["block_purple.png"]
+			self.primary_block_sprite_name = "block_purple.png"
 		elif self.tetronimo_type == 7:
-			self.primary_block_sprite = self.sprite_images["block_grey.png"]
+			self.primary_block_sprite_name = "block_grey.png"
 			
-		self.cur_sprite_image = self.primary_block_sprite
+		self.set_sprite(self.primary_block_sprite_name)
 			
 	def update(self, delta_time):
 		"""Updates the tetronimo block object."""
@@ -104,15 +119,8 @@ class TetronimoBlock(GameObject):
 					self.owner.is_falling = False
 					
 			# Check to see if the tetronimo bloc is on top of another tetronimo block.
-			for key in self.tetronimo_blocks:
-				# The current tetronimo block being tested against.
-				cur_block = self.tetronimo_blocks[key]
-				
-				# Only check for blocks that are in the landed state.
-				if cur_block.block_state == 1:
-					if cur_block.position_y == self.position_y + 32 and \
-							cur_block.position_x == self.position_x:
-						self.owner.is_falling = False
+			if self.board.is_occupied(self.position_x, self.position_y + 32):
+				self.owner.is_falling = False
 					
 			# Check if the tetronimo owner can move left.
 			if self.owner.can_move_left:
@@ -122,17 +130,9 @@ class TetronimoBlock(GameObject):
 				if self.position_x - 16 <= self.settings.tetronimo_container_bounds[0]:
 					self.owner.can_move_left = False
 					
-				# Also check if there are any other blocks to the left of this block.
-				for key in self.tetronimo_blocks:
-					# The other block being checked for.
-					cur_block_other = self.tetronimo_blocks[key]
-					
-					# Only check for blocks that have the same y position value and are 
-					# just to the left of the block.
-					if cur_block_other.position_y == self.position_y and \
-							cur_block_other.block_state == 1 and \
-							cur_block_other.position_x + 32 == self.position_x:
-						self.owner.can_move_left = False
+				# Also check if there is a landed block just to the left of this block.
+				if self.board.is_occupied(self.position_x - 32, self.position_y):
+					self.owner.can_move_left = False
 					
 			# Check if the tetronimo owner can move right.
 			if self.owner.can_move_right:
@@ -142,23 +142,16 @@ class TetronimoBlock(GameObject):
 				if self.position_x + 16 >= self.settings.tetronimo_container_bounds[1]:
 					self.owner.can_move_right = False
 					
-				# Also check if there are any other blocks to the right of this block.
-				for key in self.tetronimo_blocks:
-					# The other block being checked for.
-					cur_block_other = self.tetronimo_blocks[key]
-					
-					# Only check for blocks that have the same y position value and are 
-					# just to the right of the block.
-					if cur_block_other.position_y == self.position_y and \
-							cur_block_other.block_state == 1 and \
-							cur_block_other.position_x - 32 == self.position_x:
-						self.owner.can_move_right = False
+				# Also check if there is a landed block just to the right of this block.
+				if self.board.is_occupied(self.position_x + 32, self.position_y):
+					self.owner.can_move_right = False
 			
 	def change_block_to_landed(self):
 		self.block_state = 1
+		self.board.occupy(self.position_x, self.position_y, self)
 
 	def change_to_grey_block_sprite(self):
-		self.cur_sprite_image = self.sprite_images["block_grey.png"]
+		self.set_sprite("block_grey.png")
 		
 	def change_to_primary_block_sprite(self):
-		self.cur_sprite_image = self.primary_block_sprite
+		self.set_sprite(self.primary_block_sprite_name)
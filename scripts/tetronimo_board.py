@@ -0,0 +1,237 @@
+"""The tetronimo board. A compact model of the landed tetronimo blocks inside the tetronimo container, stored as one bitmask per row. Kept in sync when blocks land and when rows are removed, so a cell can be checked without going through every tetronimo block. Each row also keeps its number of filled cells and the landed blocks in it, so full rows are known as soon as the last block lands. Each column keeps its top filled row, so the landing position of a tetronimo takes a lookup per block."""
+class TetronimoBoard():
+	def __init__(self, column_count, row_count, origin_x, origin_y, cell_size):
+		"""Initialized the tetronimo board."""
+
+		# The number of columns and rows of the board.
+		self.column_count = column_count
+		self.row_count = row_count
+
+		# The position of the top left corner of the board, in pixels.
+		self.origin_x = origin_x
+		self.origin_y = origin_y
+
+		# The width and height of a single cell, in pixels.
+		self.cell_size = cell_size
+
+		# The bitmask of a row with every column filled.
+		self.full_row_mask = (1 << column_count) - 1
+
+		# The bitmask of every row, from the top row to the bottom row. Bit x is set if
+		# the cell in column x is filled.
+		self.rows = [0] * row_count
+
+		# The number of filled cells of every row.
+		self.row_counts = [0] * row_count
+
+		# The landed block in every cell of every row, or None if the cell is empty.
+		self.row_blocks = [[None] * column_count for row in range(0, row_count)]
+
+		# The rows that have every column filled.
+		self.full_rows = set()
+
+		# The top filled row of every column, or the row count if the column is empty.
+		self.column_tops = [row_count] * column_count
+
+	def get_column(self, position_x):
+		"""Gets the column of the cell at the x position of a block center."""
+		return (position_x - self.origin_x) // self.cell_size
+
+	def get_row(self, position_y):
+		"""Gets the row of the cell at the y position of a block center."""
+		return (position_y - self.origin_y) // self.cell_size
+
+	def get_position_y(self, row):
+		"""Gets the y position of the block centers in a row."""
+		return self.origin_y + row * self.cell_size + self.cell_size // 2
+
+	def is_occupied(self, position_x, position_y):
+		"""Checks if the cell at a block center position is filled. Cells outside of the board are never filled."""
+		column = (position_x - self.origin_x) // self.cell_size
+		row = (position_y - self.origin_y) // self.cell_size
+
+		if column < 0 or column >= self.column_count or row < 0 or \
+				row >= self.row_count:
+			return False
+
+		return (self.rows[int(row)] >> int(column)) & 1 == 1
+
+	def occupy(self, position_x, position_y, block = None):
+		"""Fills the cell at a block center position with a landed block."""
+		column = (position_x - self.origin_x) // self.cell_size
+		row = (position_y - self.origin_y) // self.cell_size
+
+		if column < 0 or column >= self.column_count or row < 0 or \
+				row >= self.row_count:
+			return
+
+		row = int(row)
+		column = int(column)
+		self.row_blocks[row][column] = block
+
+		if (self.rows[row] >> column) & 1 == 0:
+			self.rows[row] |= 1 << column
+			self.row_counts[row] += 1
+
+			if self.row_counts[row] == self.column_count:
+				self.full_rows.add(row)
+
+			if row < self.column_tops[column]:
+				self.column_tops[column] = row
+
+	def vacate(self, position_x, position_y):
+		"""Empties the cell at a block center position."""
+		column = (position_x - self.origin_x) // self.cell_size
+		row = (position_y - self.origin_y) // self.cell_size
+
+		if column < 0 or column >= self.column_count or row < 0 or \
+				row >= self.row_count:
+			return
+
+		row = int(row)
+		column = int(column)
+		self.row_blocks[row][column] = None
+
+		if (self.rows[row] >> column) & 1 == 1:
+			self.rows[row] &= ~(1 << column)
+			self.row_counts[row] -= 1
+			self.full_rows.discard(row)
+
+			# Find the next filled row below, if the top of the column was emptied.
+			if row == self.column_tops[column]:
+				self.column_tops[column] = self.row_count
+
+				for next_row in range(row + 1, self.row_count):
+					if (self.rows[next_row] >> column) & 1 == 1:
+						self.column_tops[column] = next_row
+						break
+
+	def get_full_rows(self):
+		"""Gets the full rows, from the top row to the bottom row."""
+		return sorted(self.full_rows)
+
+	def get_blocks_in_row(self, row):
+		"""Gets the landed blocks of a row."""
+		return [block for block in self.row_blocks[row] if block is not None]
+
+	def collapse_full_rows(self):
+		"""Removes every full row in a single pass from the bottom row to the top row. Every row
+		left is moved down by the number of full rows below it, together with the y position of
+		its blocks. Returns the blocks of the removed rows."""
+		removed_blocks = []
+		offset = 0
+
+		for row in range(self.row_count - 1, -1, -1):
+			if row in self.full_rows:
+				removed_blocks.extend(self.get_blocks_in_row(row))
+				offset += 1
+			elif offset > 0:
+				target_row = row + offset
+				cur_row_blocks = self.row_blocks[row]
+
+				if self.row_counts[row] > 0:
+					for block in cur_row_blocks:
+						if block is not None:
+							block.position_y += offset * self.cell_size
+
+				self.rows[target_row] = self.rows[row]
+				self.row_counts[target_row] = self.row_counts[row]
+				self.row_blocks[target_row] = cur_row_blocks
+
+		# The rows at the top are left empty.
+		for row in range(0, offset):
+			self.rows[row] = 0
+			self.row_counts[row] = 0
+			self.row_blocks[row] = [None] * self.column_count
+
+		self.full_rows.clear()
+
+		if offset > 0:
+			self.update_column_tops()
+
+		return removed_blocks
+
+	def update_column_tops(self):
+		"""Finds the top filled row of every column again, in a single pass over the row bitmasks from the top row down. The pass stops once every column has been found."""
+		remaining_mask = self.full_row_mask
+
+		for column in range(0, self.column_count):
+			self.column_tops[column] = self.row_count
+
+		for row in range(0, self.row_count):
+			found_mask = self.rows[row] & remaining_mask
+
+			if found_mask != 0:
+				for column in range(0, self.column_count):
+					if (found_mask >> column) & 1 == 1:
+						self.column_tops[column] = row
+
+				remaining_mask &= ~found_mask
+
+				if remaining_mask == 0:
+					break
+
+	def get_landing_distance(self, position_x, position_y):
+		"""Gets how far down a block at a block center position can fall, in pixels, before it lands on a filled cell or on the bottom of the board. Above the top of its column this is a single lookup."""
+		column = (position_x - self.origin_x) // self.cell_size
+
+		# The y position of a block center in the row below the board, so the bottom of the
+		# board counts as a filled row.
+		landing_position_y = self.get_position_y(self.row_count)
+
+		if 0 <= column < self.column_count:
+			top_position_y = self.get_position_y(self.column_tops[int(column)])
+
+			if position_y < top_position_y:
+				landing_position_y = top_position_y
+			else:
+				# The block is below the top of its column, under an overhang, so look for the
+				# next filled cell below it.
+				column = int(column)
+
+				for row in range(max(0, int((position_y - self.origin_y) // self.cell_size) + 1), \
+						self.row_count):
+					if (self.rows[row] >> column) & 1 == 1:
+						landing_position_y = self.get_position_y(row)
+						break
+
+		return landing_position_y - position_y - self.cell_size
+
+	def get_drop_distance(self, blocks):
+		"""Gets how far down the blocks of a tetronimo can fall together, in pixels, before one of them lands."""
+		drop_distance = None
+
+		for block in blocks:
+			landing_distance = self.get_landing_distance(block.position_x, block.position_y)
+
+			if drop_distance is None or landing_distance < drop_distance:
+				drop_distance = landing_distance
+
+		return drop_distance
+
+	def clear(self):
+		"""Empties every cell of the board."""
+		for row in range(0, self.row_count):
+			self.rows[row] = 0
+			self.row_counts[row] = 0
+			self.row_blocks[row] = [None] * self.column_count
+
+		self.full_rows.clear()
+
+		for column in range(0, self.column_count):
+			self.column_tops[column] = self.row_count
+
+	def load_blocks(self, blocks):
+		"""Fills an empty board with landed blocks in one pass. The full rows and the column tops are found once at the end instead of for every block."""
+		for block in blocks:
+			row = int((block.position_y - self.origin_y) // self.cell_size)
+			column = int((block.position_x - self.origin_x) // self.cell_size)
+			self.row_blocks[row][column] = block
+			self.rows[row] |= 1 << column
+			self.row_counts[row] += 1
+
+		for row in range(0, self.row_count):
+			if self.row_counts[row] == self.column_count:
+				self.full_rows.add(row)
+
+		self.update_column_tops()
@@ -1,10 +1,14 @@
-import pygame
-
-from pygame.sprite import Sprite
 from game_object import GameObject
 
 """The tetronimo display class. Displays a tetronimo as an image. Only used for the GUI."""
 class TetronimoDisplay(GameObject):
+	__slots__ = ("image_type",)
+	
+	# The sprite names of the image types.
+	image_type_sprite_names = ("display_O.png", "display_I.png", "display_L.png", \
+			"display_J.png", "display_S.png", "display_Z.png", "display_T.png", \
+			"display_none.png")
+	
 	def __init__(self, object_id, tag, position_x, position_y, collision_box, sprite_images):
 		"""Initialized the tetronimo image game object."""
 	
@@ -22,32 +26,13 @@ class TetronimoDisplay(GameObject):
 		# 7 - n/a
 		self.image_type = 0
 			
-		self.cur_sprite_image = self.sprite_images["display_none.png"]
+		self.set_sprite("display_none.png")
 			
 	def update(self, delta_time):
 		"""Updates the tetronimo display object."""
 		
-		if self.image_type == 0 and \
-				not self.cur_sprite_image == self.sprite_images["display_O.png"]:
-			self.cur_sprite_image = self.sprite_images["display_O.png"]
-		elif self.image_type == 1 and \
-				not self.cur_sprite_image == self.sprite_images["display_I.png"]:
-			self.cur_sprite_image = self.sprite_images["display_I.png"]
-		elif self.image_type == 2 and \
-				not self.cur_sprite_image == self.sprite_images["display_L.png"]:
-			self.cur_sprite_image = self.sprite_images["display_L.png"]
-		elif self.image_type == 3 and \
-				not self.cur_sprite_image == self.sprite_images["display_J.png"]:
-			self.cur_sprite_image = self.sprite_images["display_J.png"]
-		elif self.image_type == 4 and \
-				not self.cur_sprite_image == self.sprite_images["display_S.png"]:
-			self.cur_sprite_image = self.sprite_images["display_S.png"]
-		elif self.image_type == 5 and \
-				not self.cur_sprite_image == self.sprite_images["display_Z.png"]:
-			self.cur_sprite_image = self.sprite_images["display_Z.png"]
-		elif self.image_type == 6 and \
-				not self.cur_sprite_image == self.sprite_images["display_T.png"]:
-			self.cur_sprite_image = self.sprite_images["display_T.png"]
-		elif self.image_type == 7 and \
-				not self.cur_sprite_image == self.sprite_images["display_none.png"]:
-			self.cur_sprite_image = self.sprite_images["display_none.png"]
+		# The sprite name of the current image type.
+		sprite_name = self.image_type_sprite_names[self.image_type]
+		
+		if not self.cur_sprite_name == sprite_name:
+			self.set_sprite(sprite_name)
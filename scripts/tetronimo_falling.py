@@ -1,10 +1,16 @@
-import pygame
-
-from pygame.sprite import Sprite
 from game_object import GameObject
+from tetronimo_tables import TetronimoTables
 
 """The falling tetronimo class. Created every time a new tetronimo must fall from the top of the screen."""
 class TetronimoFalling(GameObject):
+	__slots__ = ("is_falling", "can_move_left", "can_move_right", "can_rotate", \
+			"pressed_left", "pressed_right", "pressed_rotate", "pressed_autoland", \
+			"tetronimo_type", "rotation_state", "cur_horizontal_frame", "tetronimo_blocks", \
+			"rotations", "kick_positions", "object_factory", "settings", "input_manager")
+	
+	# The maximum horizontal frame for horizontal movement.
+	max_horizontal_frame = 8
+	
 	def __init__(self, object_id, tag, position_x, position_y, tetronimo_type, \
 			object_factory, settings, input_manager, collision_box, sprite_images):
 		"""Initialized the tetronimo falling game object."""
@@ -80,23 +86,22 @@ class TetronimoFalling(GameObject):
 		# The current horizontal frame for horizontal movement.
 		self.cur_horizontal_frame = 0
 		
-		# The maximum horizontal frame for horizontal movement.
-		self.max_horizontal_frame = 8
-		
 		# A list of all the tetronimo blocks that belong to this game object.
 		self.tetronimo_blocks = []
 		
-		# The four rotations of the tetronimo. Contains a list of tuples for the x and y 
-		# positions of each block.
-		self.rotations = []
+		# The four rotations of the tetronimo. Contains a tuple of the x and y positions of 
+		# each block. Shared by every tetronimo of the same type.
+		self.rotations = TetronimoTables.rotations[tetronimo_type]
 		
-		# The kick positions for the tetronimo for all 4 rotations. Contains tuples with 4 
+		# The kick positions for the tetronimo for all 4 rotations. Contains tuples with 5 
 		# values:
 		# 0 - position_x,
 		# 1 - position_y,
-		# 2 - direction - 0 - left, 1 - right, 2 - up, 3 - down,
-		# 3 - kick_offset,
-		self.kick_positions = []
+		# 2 - kick_x - kick on the x axis instead of the y axis,
+		# 3 - kick_positive - kick right or down instead of left or up,
+		# 4 - kick_offset,
+		# Shared by every tetronimo of the same type.
+		self.kick_positions = TetronimoTables.kick_positions[tetronimo_type]
 		
 		# A reference to the game object factory. It is used to create the tetronimo 
 		# blocks.
@@ -111,309 +116,30 @@ class TetronimoFalling(GameObject):
 		# Create the tetronimo blocks that belong to this game object.
 		self.create_tetronimo_blocks()
 		
-	def create_tetronimo_blocks(self):
-		"""Create the tetronimo blocks for the falling tetronimo."""
+	def reset(self, object_id, position_x, position_y, tetronimo_type):
+		"""Resets a falling tetronimo taken from the object pool and creates its blocks."""
+		super(TetronimoFalling, self).reset(object_id, position_x, position_y)
 		
-		# The cached x and y position of the tetronimo.
-		pos_x = self.position_x
-		pos_y = self.position_y
-			
-		# The rotation position lists of the tetronimo.
-		rotation1 = []
-		rotation2 = []
-		rotation3 = []
-		rotation4 = []
-		
-		# The kick position arrays of the tetronimos for different rotations.
-		kick1 = []
-		kick2 = []
-		kick3 = []
-		kick4 = []
-		
-		# Different types of tetronimo blocks will have different block positions and 
-		# colors.
-		if self.tetronimo_type == 0:
-			
-			# .OO.
-			# .OO.
-			# ....
-			rotation1.append((-16, -16))
-			rotation1.append((16, -16))
-			rotation1.append((-16, 16))
-			rotation1.append((16, 16))
-			
-			rotation2 = rotation1
-			rotation3 = rotation1
-			rotation4 = rotation1
-			
-		elif self.tetronimo_type == 1:
-			
-			# 1(I) - ....  ..O.  ....  .O..
-			#        OOOO  ..O.  ....  .O..
-			#        ....  ..O.  OOOO  .O..
-			#        ....  ..O.  ....  .O..
-			rotation1.append((-48, 32))
-			rotation1.append((-16, 32))
-			rotation1.append((16, 32))
-			rotation1.append((48, 32))
-			
-			rotation2.append((16, 96))
-			rotation2.append((16, 64))
-			rotation2.append((16, 32))
-			rotation2.append((16, 0))
-			
-			rotation3.append((-48, 64))
-			rotation3.append((-16, 64))
-			rotation3.append((16, 64))
-			rotation3.append((48, 64))
-			
-			rotation4.append((-16, 96))
-			rotation4.append((-16, 64))
-			rotation4.append((-16, 32))
-			rotation4.append((-16, 0))
-			
-			kick1.append((-16, 32, 0, 64))
-			kick1.append((-48, 32, 0, 32))
-			kick1.append((48, 32, 1, -32))
-			kick1.append((16, 32, 1, -64))
-			
-			kick2.append((16, 0, 2, 32))
-			kick2.append((16, 64, 3, -64))
-			kick2.append((16, 96, 3, -32))
-			
-			kick3.append((-16, 64, 0, 64))
-			kick3.append((-48, 64, 0, 32))
-			kick3.append((48, 64, 1, -32))
-			kick3.append((16, 64, 1, -64))
-			
-			kick4.append((-16, 0, 2, 32))
-			kick4.append((-16, 32, 2, 64))
-			kick4.append((-16, 96, 3, -32))
-			
-		elif self.tetronimo_type == 2:
-			
-			# 2(L) - ..O   .O.   ...   OO.
-			#        OOO   .O.   OOO   .O.
-			#        ...   .OO   O..   .O.
-			rotation1.append((0, 0))
-			rotation1.append((-32, 0))
-			rotation1.append((32, 0))
-			rotation1.append((32, -32))
-			
-			rotation2.append((0, 0))
-			rotation2.append((0, -32))
-			rotation2.append((0, 32))
-			rotation2.append((32, 32))
-			
-			rotation3.append((0, 0))
-			rotation3.append((-32, 0))
-			rotation3.append((32, 0))
-			rotation3.append((-32, 32))
-			
-			rotation4.append((0, 0))
-			rotation4.append((0, -32))
-			rotation4.append((0, 32))
-			rotation4.append((-32, -32))
-			
-			kick1.append((-32, 0, 0, 32))
-			kick1.append((32, 0, 2, 32))
-			kick1.append((32, -32, 1, -32))
-			kick1.append((32, -32, 2, 32))
-			
-			kick2.append((0, -32, 2, 32))
-			kick2.append((0, 32, 3, -32))
-			kick2.append((32, 32, 3, -32))
-			kick2.append((32, 32, 1, -32))
-			
-			kick3.append((-32, 0, 0, 32))
-			kick3.append((32, 0, 1, -32))
-			kick3.append((-32, 32, 3, -32))
-			kick3.append((-32, 32, 0, 32))
-			
-			kick4.append((0, -32, 2, 32))
-			kick4.append((0, 32, 3, -32))
-			kick4.append((-32, -32, 2, 32))
-			kick4.append((-32, -32, 0, 32))
+		self.is_falling = True
+		self.can_move_left = True
+		self.can_move_right = True
+		self.can_rotate = True
+		self.pressed_left = False
+		self.pressed_right = False
+		self.pressed_rotate = False
+		self.pressed_autoland = False
+		self.tetronimo_type = tetronimo_type
+		self.rotation_state = 0
+		self.cur_horizontal_frame = 0
+		self.tetronimo_blocks = []
+		self.rotations = TetronimoTables.rotations[tetronimo_type]
+		self.kick_positions = TetronimoTables.kick_positions[tetronimo_type]
 		
-		elif self.tetronimo_type == 3:
-			
-			# 3(J) - O..   .OO   ...   .O.
-			#        OOO   .O.   OOO   .O.
-			#        ...   .O.   ..O   OO.
-			rotation1.append((0, 0))
-			rotation1.append((-32, 0))
-			rotation1.append((32, 0))
-			rotation1.append((-32, -32))
-			
-			rotation2.append((0, 0))
-			rotation2.append((0, -32))
-			rotation2.append((0, 32))
-			rotation2.append((32, -32))
-			
-			rotation3.append((0, 0))
-			rotation3.append((-32, 0))
-			rotation3.append((32, 0))
-			rotation3.append((32, 32))
-			
-			rotation4.append((0, 0))
-			rotation4.append((0, 32))
-			rotation4.append((0, -32))
-			rotation4.append((-32, 32))
-			
-			kick1.append((-32, 0, 0, 32))
-			kick1.append((32, 0, 1, -32))
-			kick1.append((-32, -32, 0, 32))
-			kick1.append((-32, -32, 2, 32))
-			
-			kick2.append((0, -32, 3, -32))
-			kick2.append((0, 32, 2, 32))
-			kick2.append((32, -32, 3, -32))
-			kick2.append((32, -32, 1, -32))
-			
-			kick3.append((-32, 0, 0, 32))
-			kick3.append((32, 0, 1, -32))
-			kick3.append((32, 32, 3, -32))
-			kick3.append((32, 32, 1, -32))
-			
-			kick4.append((0, -32, 2, 32))
-			kick4.append((0, 32, 3, -32))
-			kick4.append((-32, 32, 3, -32))
-			kick4.append((-32, 32, 1, -32))
-			
-		elif self.tetronimo_type == 4:
-			
-			# 4(S) - .OO   O..   .OO   O..
-			#        OO.   OO.   OO.   OO.
-			#        ...   .O.   ...   .O.
-			rotation1.append((0, 0))
-			rotation1.append((0, -32))
-			rotation1.append((32, -32))
-			rotation1.append((-32, 0))
-			
-			rotation2.append((0, 0))
-			rotation2.append((-32, 0))
-			rotation2.append((-32, -32))
-			rotation2.append((0, 32))
-			
-			rotation3.append((0, 0))
-			rotation3.append((0, -32))
-			rotation3.append((32, -32))
-			rotation3.append((-32, 0))
-			
-			rotation4.append((0, 0))
-			rotation4.append((-32, 0))
-			rotation4.append((-32, -32))
-			rotation4.append((0, 32))
-			
-			kick1.append((-32, 0, 0, 32))
-			kick1.append((0, -32, 2, 32))
-			kick1.append((32, -32, 1, -32))
-			kick1.append((32, -32, 2, 32))
-			
-			kick2.append((-32, 0, 0, 32))
-			kick2.append((0, 32, 3, -32))
-			kick2.append((-32, -32, 0, 32))
-			kick2.append((-32, -32, 2, 32))
-			
-			kick3.append((-32, 0, 0, 32))
-			kick3.append((0, -32, 2, 32))
-			kick3.append((32, -32, 1, -32))
-			kick3.append((32, -32, 2, 32))
-			
-			kick4.append((-32, 0, 0, 32))
-			kick4.append((0, 32, 3, -32))
-			kick4.append((-32, -32, 0, 32))
-			kick4.append((-32, -32, 2, 32))
-			
-		elif self.tetronimo_type == 5:
-			
-			# 5(Z) - OO.   ..O   OO.   ..O
-			#        .OO   .OO   .OO   .OO
-			#        ...   .O.   ...   .O.
-			rotation1.append((0, 0))
-			rotation1.append((0, -32))
-			rotation1.append((-32, -32))
-			rotation1.append((32, 0))
-			
-			rotation2.append((0, 0))
-			rotation2.append((0, 32))
-			rotation2.append((32, 0))
-			rotation2.append((32, -32))
-			
-			rotation3.append((0, 0))
-			rotation3.append((0, -32))
-			rotation3.append((-32, -32))
-			rotation3.append((32, 0))
-			
-			rotation4.append((0, 0))
-			rotation4.append((0, 32))
-			rotation4.append((32, 0))
-			rotation4.append((32, -32))
-			
-			kick1.append((32, 0, 1, -32))
-			kick1.append((0, -32, 2, 32))
-			kick1.append((-32, -32, 0, 32))
-			kick1.append((-32, -32, 2, 32))
-			
-			kick2.append((32, 0, 1, -32))
-			kick2.append((0, 32, 3, -32))
-			kick2.append((32, -32, 0, 32))
-			kick2.append((32, -32, 2, 32))
-			
-			kick3.append((32, 0, 1, -32))
-			kick3.append((0, -32, 2, 32))
-			kick3.append((-32, -32, 0, 32))
-			kick3.append((-32, -32, 2, 32))
-			
-			kick4.append((32, 0, 1, -32))
-			kick4.append((0, 32, 3, -32))
-			kick4.append((32, -32, 0, 32))
-			kick4.append((32, -32, 2, 32))
-			
-		elif self.tetronimo_type == 6:
-			
-			# 6(T) - .O.   .O.   ...   .O.
-			#        OOO   .OO   OOO   OO.
-			#        ...   .O.   .O.   .O.
-			rotation1.append((0, 0))
-			rotation1.append((-32, 0))
-			rotation1.append((32, 0))
-			rotation1.append((0, -32))
-			
-			rotation2.append((0, 0))
-			rotation2.append((0, -32))
-			rotation2.append((0, 32))
-			rotation2.append((32, 0))
-			
-			rotation3.append((0, 0))
-			rotation3.append((-32, 0))
-			rotation3.append((32, 0))
-			rotation3.append((0, 32))
-			
-			rotation4.append((0, 0))
-			rotation4.append((0, -32))
-			rotation4.append((0, 32))
-			rotation4.append((-32, 0))
-			
-			kick1.append((32, 0, 1, -32))
-			
-			kick2.append((0, 32, 3, -32))
-			
-			kick3.append((-32, 0, 0, 32))
-			
-			kick4.append((0, -32, 1, 32))
-			
-		self.rotations.append(rotation1)
-		self.rotations.append(rotation2)
-		self.rotations.append(rotation3)
-		self.rotations.append(rotation4)
-			
-		self.kick_positions.append(kick1)
-		self.kick_positions.append(kick2)
-		self.kick_positions.append(kick3)
-		self.kick_positions.append(kick4)
+		self.create_tetronimo_blocks()
 		
-		self.create_4_tetronimo_blocks(pos_x, pos_y, rotation1)
+	def create_tetronimo_blocks(self):
+		"""Create the tetronimo blocks for the falling tetronimo."""
+		self.create_4_tetronimo_blocks(self.position_x, self.position_y, self.rotations[0])
 			
 	def create_4_tetronimo_blocks(self, pos_x, pos_y, rotation):
 		"""Creates the 4 tetronimo blocks for the tetronimo using the first rotation."""
@@ -483,36 +209,10 @@ class TetronimoFalling(GameObject):
 					# Before keeping a rotation, check to see if the tetronimo can 
 					# actually rotate, or if it needs to kick a wall. If not, change back 
 					# to the previous rotation.
-					for kick in self.kick_positions[self.rotation_state]:
-						# The kick direction.
-						kick_direction = kick[2]
-						
-						# The kick position in the x coordinate.
-						kick_pos_x = kick[0]
-						
-						# The kick position in the y coordinate.
-						kick_pos_y = kick[1]
-						
-						# The kick offset, in either the x or y coordinate.
-						kick_offset = kick[3]
-						
-						return_values = None
-						
-						if kick_direction == 0:
-							return_values = self.kick_tetronimo_attempt(
-								kick_pos_x, kick_pos_y, kick_offset, True, False)
-						elif kick_direction == 1:
-							return_values = self.kick_tetronimo_attempt(
-								kick_pos_x, kick_pos_y, kick_offset, True, True)
-						elif kick_direction == 2:
-							return_values = self.kick_tetronimo_attempt(
-								kick_pos_x, kick_pos_y, kick_offset, False, False)
-						elif kick_direction == 3:
-							return_values = self.kick_tetronimo_attempt(
-								kick_pos_x, kick_pos_y, kick_offset, False, True)
-								
-						can_rotate = return_values[0]
-						kicked = return_values[1]
+					for kick_pos_x, kick_pos_y, kick_x, kick_positive, kick_offset in \
+							self.kick_positions[self.rotation_state]:
+						can_rotate, kicked = self.kick_tetronimo_attempt( \
+							kick_pos_x, kick_pos_y, kick_offset, kick_x, kick_positive)
 								
 						# If the tetronimo was kicked, exit the kicking loop.
 						if kicked or not can_rotate:
@@ -530,7 +230,7 @@ class TetronimoFalling(GameObject):
 							
 						self.rotate_blocks()
 					else:
-						self.settings.channel_2.play(self.settings.sound_rotate, False)
+						self.settings.play_sound(1, "rotate")
 					
 				self.pressed_rotate = True
 			else:
@@ -538,62 +238,16 @@ class TetronimoFalling(GameObject):
 				
 			# Check if pressig the auto land key.
 			if self.input_manager.pressed_x:
-				# Get the largest block value and use that as the offset for the landing 
-				# position.
-				largest_y = 0 
-				
-				# First, check if the tetronimo can land on another tetronimo.
-				
-				# Checks if the tetronimo landed on another tetronimo.
-				land_on_tetronimo = False
-				
 				# The amount by which to offset the tetronimo falling so that it reaches 
 				# the bottom of the screen or on top of another tetronimo.
 				offset_amount_y = 0
 				
-				# The shortest y distance found. It will be used as the offset amount for
-				# the tetronimo.
-				shortest_y_distance = 999.0
-				
-				self.settings.channel_1.play(self.settings.sound_hit_floor, False)
-				
-				# First, check for the shortest distance between the owner's tetronimo 
-				# blocks and the other tetronimo blocks.
-				for cur_block in self.tetronimo_blocks:
-					for key in self.settings.tetronimo_blocks:
-						# The current tetronimo block other.
-						cur_block_other = self.settings.tetronimo_blocks[key]
-						
-						# Check if the other block has the same x coordinate as the 
-						# current block and is in the landed block state.
-						if cur_block_other.block_state == 1 and \
-								cur_block.position_x == cur_block_other.position_x and \
-								cur_block.position_y < cur_block_other.position_y:
-								
-							cur_y_distance = cur_block_other.position_y - \
-									cur_block.position_y - 32
-									
-							# If the distance is shorter than the previous distance, 
-							# update the shortest y distance.
-							if cur_y_distance < shortest_y_distance:
-								shortest_y_distance = cur_y_distance
-				
-				# Next, check if the tetronimo can also reach the bottom of the screen.
+				self.settings.play_sound(0, "hit_floor")
 				
-				# Get the largest y position of the tetronimo.
-				for block in self.tetronimo_blocks:
-					if block.position_y > largest_y:
-						largest_y = block.position_y
-				
-				# The amount by which to offset the tetronimo falling so that it reaches 
-				# the bottom of the screen.
-				cur_y_distance = self.settings.tetronimo_container_bounds[3] - \
-						largest_y - 16
-						
-				# If the distance is shorter than the previous distance, 
-				# update the shortest y distance.
-				if cur_y_distance < shortest_y_distance:
-					shortest_y_distance = cur_y_distance
+				# The shortest y distance any block of the tetronimo can fall before it lands
+				# on another tetronimo or on the bottom of the screen. The board knows the top
+				# of every column, so it is a single lookup for each block.
+				shortest_y_distance = self.settings.board.get_drop_distance(self.tetronimo_blocks)
 				
 				offset_amount_y = shortest_y_distance
 				
@@ -620,10 +274,11 @@ class TetronimoFalling(GameObject):
 				if not self.is_falling:
 					# Destroy the falling tetronimo. This will not destroy the blocks that make 
 					# the tetronimo, and the blocks will be landed.
-					self.marked_for_deletion = True
+					self.mark_for_deletion()
 					
-					self.settings.channel_1.play(self.settings.sound_hit_floor, False)
+					self.settings.play_sound(0, "hit_floor")
 					self.settings.tetronimo_assembly_state = 1
+					self.settings.pieces_placed += 1
 					
 					# If moving downwards, switch over to the default speed to prevent too 
 					# many pieces from falling all at once.
@@ -689,18 +344,8 @@ class TetronimoFalling(GameObject):
 		# Check if the tetronimo is intersecting any other 
 		# tetronimos.
 		for cur_block in self.tetronimo_blocks:
-			for key in self.settings.tetronimo_blocks:
-				# The other tetronimo block being collided with.
-				cur_block_other = self.settings.tetronimo_blocks[key]
-				
-				if cur_block_other.block_state == 1 and \
-					cur_block.position_x >= cur_block_other.position_x - 16 and \
-					cur_block.position_x < cur_block_other.position_x + 16 and \
-					cur_block.position_y >= cur_block_other.position_y - 16 and \
-					cur_block.position_y < cur_block_other.position_y + 16:
-					found_collision = True
-					break;
-			if found_collision:
+			if self.settings.board.is_occupied(cur_block.position_x, cur_block.position_y):
+				found_collision = True
 				break
 		return found_collision
 		
@@ -749,24 +394,11 @@ class TetronimoFalling(GameObject):
 					
 		# Check if kicking the other blocks.
 		if not kicked:
-			# Iterate through every other tetronimo block and check for collisions with 
-			# this tetronimo's blocks.
-			for key in self.settings.tetronimo_blocks:
-			
-				# The other block being collided with.
-				cur_block_other = self.settings.tetronimo_blocks[key]
-				
-				# Only collide with blocks that are in the block_state landed.
-				if cur_block_other.block_state == 1:
-				
-					# Check if the x and y coordinates are the same.
-					if kick_position_global_x >= cur_block_other.position_x - 8 and \
-						kick_position_global_x < cur_block_other.position_x + 8 and \
-						kick_position_global_y >= cur_block_other.position_y - 8 and \
-						kick_position_global_y < cur_block_other.position_y + 8:
-						
-						kicked = True
-						can_rotate = self.apply_kick(kick_offset, kick_x, kick_positive)
+			# Check the board for a landed block at the kick position.
+			if self.settings.board.is_occupied(kick_position_global_x, \
+					kick_position_global_y):
+				kicked = True
+				can_rotate = self.apply_kick(kick_offset, kick_x, kick_positive)
 						
 		# If it cannot rotate, then it cannot be kicked either.
 		if can_rotate == False:
@@ -0,0 +1,63 @@
+from game_object import GameObject
+
+"""The tetronimo ghost class. Shows where the current falling tetronimo would land with a hard drop, with faded blocks. Only used for the GUI."""
+class TetronimoGhost(GameObject):
+	__slots__ = ("settings", "board", "ghost_blocks")
+
+	# The sprite names of the ghost blocks for every tetronimo type.
+	ghost_sprite_names = ("ghost_yellow.png", "ghost_skyblue.png", "ghost_blue.png", \
+			"ghost_orange.png", "ghost_green.png", "ghost_red.png", "ghost_purple.png")
+
+	def __init__(self, object_id, tag, position_x, position_y, settings, ghost_blocks, \
+			collision_box, sprite_images):
+		"""Initialized the tetronimo ghost game object."""
+
+		# Call the inherited class constructor.
+		super(TetronimoGhost, self).__init__(object_id, tag, position_x, position_y, \
+				collision_box, sprite_images)
+
+		# A reference to the game settings.
+		self.settings = settings
+
+		# A reference to the board of landed tetronimo blocks.
+		self.board = settings.board
+
+		# The 4 game objects that show the blocks of the ghost.
+		self.ghost_blocks = ghost_blocks
+
+		self.hide()
+
+	def update(self, delta_time):
+		"""Moves the ghost blocks under the current falling tetronimo, where it would land. Hidden when no tetronimo is falling."""
+		cur_tetronimo_falling = self.settings.cur_tetronimo_falling
+
+		if cur_tetronimo_falling is None or not cur_tetronimo_falling.is_active or \
+				not cur_tetronimo_falling.is_falling or \
+				cur_tetronimo_falling.marked_for_deletion or \
+				self.settings.tetronimo_assembly_state != 0:
+			self.hide()
+			return
+
+		# The board knows the top of every column, so this is a single lookup for each block.
+		drop_distance = self.board.get_drop_distance(cur_tetronimo_falling.tetronimo_blocks)
+		sprite_name = self.ghost_sprite_names[cur_tetronimo_falling.tetronimo_type]
+
+		for ghost_block, block in zip(self.ghost_blocks, cur_tetronimo_falling.tetronimo_blocks):
+			ghost_block.position_x = block.position_x
+			ghost_block.position_y = block.position_y + drop_distance
+			ghost_block.is_active = True
+
+			if ghost_block.cur_sprite_name != sprite_name:
+				ghost_block.set_sprite(sprite_name)
+
+	def hide(self):
+		"""Hides the ghost blocks."""
+		for ghost_block in self.ghost_blocks:
+			ghost_block.is_active = False
+
+	def mark_for_deletion(self):
+		"""Marks the ghost and its ghost blocks for deletion."""
+		super(TetronimoGhost, self).mark_for_deletion()
+
+		for ghost_block in self.ghost_blocks:
+			ghost_block.mark_for_deletion()
@@ -0,0 +1,121 @@
+def compile_kick_positions(kick_positions):
+	"""Turns the kick directions of the kick positions into the two flags used by the kick attempt. Returns the kick positions as tuples of kick_pos_x, kick_pos_y, kick_x, kick_positive and kick_offset."""
+	# The kick flags of each direction: 0 - left, 1 - right, 2 - up, 3 - down.
+	direction_flags = ((True, False), (True, True), (False, False), (False, True))
+
+	return tuple(tuple(tuple((kick[0], kick[1]) + direction_flags[kick[2]] + (kick[3],) \
+			for kick in rotation_kicks) for rotation_kicks in type_kicks) \
+			for type_kicks in kick_positions)
+
+"""The rotation and kick tables of every tetronimo type. Built once when the module is imported and shared by every falling tetronimo, so creating a tetronimo only has to look up its tables."""
+class TetronimoTables():
+	# The positions of the 4 blocks of every rotation, relative to the center of the
+	# tetronimo. Indexed by tetronimo type and then by rotation state. This follows the SRS
+	# Tetris format (except the s and z tetronimos).
+	rotations = (
+		# 0(O) - .OO.  .OO.  .OO.  .OO.
+		#        .OO.  .OO.  .OO.  .OO.
+		#        ....  ....  ....  ....
+		(((-16, -16), (16, -16), (-16, 16), (16, 16)),
+		((-16, -16), (16, -16), (-16, 16), (16, 16)),
+		((-16, -16), (16, -16), (-16, 16), (16, 16)),
+		((-16, -16), (16, -16), (-16, 16), (16, 16))),
+
+		# 1(I) - ....  ..O.  ....  .O..
+		#        OOOO  ..O.  ....  .O..
+		#        ....  ..O.  OOOO  .O..
+		#        ....  ..O.  ....  .O..
+		(((-48, 32), (-16, 32), (16, 32), (48, 32)),
+		((16, 96), (16, 64), (16, 32), (16, 0)),
+		((-48, 64), (-16, 64), (16, 64), (48, 64)),
+		((-16, 96), (-16, 64), (-16, 32), (-16, 0))),
+
+		# 2(L) - ..O   .O.   ...   OO.
+		#        OOO   .O.   OOO   .O.
+		#        ...   .OO   O..   .O.
+		(((0, 0), (-32, 0), (32, 0), (32, -32)),
+		((0, 0), (0, -32), (0, 32), (32, 32)),
+		((0, 0), (-32, 0), (32, 0), (-32, 32)),
+		((0, 0), (0, -32), (0, 32), (-32, -32))),
+
+		# 3(J) - O..   .OO   ...   .O.
+		#        OOO   .O.   OOO   .O.
+		#        ...   .O.   ..O   OO.
+		(((0, 0), (-32, 0), (32, 0), (-32, -32)),
+		((0, 0), (0, -32), (0, 32), (32, -32)),
+		((0, 0), (-32, 0), (32, 0), (32, 32)),
+		((0, 0), (0, 32), (0, -32), (-32, 32))),
+
+		# 4(S) - .OO   O..   .OO   O..
+		#        OO.   OO.   OO.   OO.
+		#        ...   .O.   ...   .O.
+		(((0, 0), (0, -32), (32, -32), (-32, 0)),
+		((0, 0), (-32, 0), (-32, -32), (0, 32)),
+		((0, 0), (0, -32), (32, -32), (-32, 0)),
+		((0, 0), (-32, 0), (-32, -32), (0, 32))),
+
+		# 5(Z) - OO.   ..O   OO.   ..O
+		#        .OO   .OO   .OO   .OO
+		#        ...   .O.   ...   .O.
+		(((0, 0), (0, -32), (-32, -32), (32, 0)),
+		((0, 0), (0, 32), (32, 0), (32, -32)),
+		((0, 0), (0, -32), (-32, -32), (32, 0)),
+		((0, 0), (0, 32), (32, 0), (32, -32))),
+
+		# 6(T) - .O.   .O.   ...   .O.
+		#        OOO   .OO   OOO   OO.
+		#        ...   .O.   .O.   .O.
+		(((0, 0), (-32, 0), (32, 0), (0, -32)),
+		((0, 0), (0, -32), (0, 32), (32, 0)),
+		((0, 0), (-32, 0), (32, 0), (0, 32)),
+		((0, 0), (0, -32), (0, 32), (-32, 0))),
+	)
+
+	# The kick positions of every rotation, indexed by tetronimo type and then by rotation
+	# state. They are written as tuples with 4 values:
+	# 0 - position_x,
+	# 1 - position_y,
+	# 2 - direction - 0 - left, 1 - right, 2 - up, 3 - down,
+	# 3 - kick_offset,
+	# and compiled into tuples of position_x, position_y, kick_x, kick_positive and
+	# kick_offset.
+	kick_positions = compile_kick_positions((
+		# 0(O)
+		((), (), (), ()),
+
+		# 1(I)
+		(((-16, 32, 0, 64), (-48, 32, 0, 32), (48, 32, 1, -32), (16, 32, 1, -64)),
+		((16, 0, 2, 32), (16, 64, 3, -64), (16, 96, 3, -32)),
+		((-16, 64, 0, 64), (-48, 64, 0, 32), (48, 64, 1, -32), (16, 64, 1, -64)),
+		((-16, 0, 2, 32), (-16, 32, 2, 64), (-16, 96, 3, -32))),
+
+		# 2(L)
+		(((-32, 0, 0, 32), (32, 0, 2, 32), (32, -32, 1, -32), (32, -32, 2, 32)),
+		((0, -32, 2, 32), (0, 32, 3, -32), (32, 32, 3, -32), (32, 32, 1, -32)),
+		((-32, 0, 0, 32), (32, 0, 1, -32), (-32, 32, 3, -32), (-32, 32, 0, 32)),
+		((0, -32, 2, 32), (0, 32, 3, -32), (-32, -32, 2, 32), (-32, -32, 0, 32))),
+
+		# 3(J)
+		(((-32, 0, 0, 32), (32, 0, 1, -32), (-32, -32, 0, 32), (-32, -32, 2, 32)),
+		((0, -32, 3, -32), (0, 32, 2, 32), (32, -32, 3, -32), (32, -32, 1, -32)),
+		((-32, 0, 0, 32), (32, 0, 1, -32), (32, 32, 3, -32), (32, 32, 1, -32)),
+		((0, -32, 2, 32), (0, 32, 3, -32), (-32, 32, 3, -32), (-32, 32, 1, -32))),
+
+		# 4(S)
+		(((-32, 0, 0, 32), (0, -32, 2, 32), (32, -32, 1, -32), (32, -32, 2, 32)),
+		((-32, 0, 0, 32), (0, 32, 3, -32), (-32, -32, 0, 32), (-32, -32, 2, 32)),
+		((-32, 0, 0, 32), (0, -32, 2, 32), (32, -32, 1, -32), (32, -32, 2, 32)),
+		((-32, 0, 0, 32), (0, 32, 3, -32), (-32, -32, 0, 32), (-32, -32, 2, 32))),
+
+		# 5(Z)
+		(((32, 0, 1, -32), (0, -32, 2, 32), (-32, -32, 0, 32), (-32, -32, 2, 32)),
+		((32, 0, 1, -32), (0, 32, 3, -32), (32, -32, 0, 32), (32, -32, 2, 32)),
+		((32, 0, 1, -32), (0, -32, 2, 32), (-32, -32, 0, 32), (-32, -32, 2, 32)),
+		((32, 0, 1, -32), (0, 32, 3, -32), (32, -32, 0, 32), (32, -32, 2, 32))),
+
+		# 6(T)
+		(((32, 0, 1, -32),),
+		((0, 32, 3, -32),),
+		((-32, 0, 0, 32),),
+		((0, -32, 1, 32),)),
+	))
@@ -1,13 +1,13 @@
-import pygame
-
-from pygame.sprite import Sprite
 from game_object import GameObject
 from sprite_image import SpriteImage
 
 """The primary game object abstract class. All game object types are inherited from  this class. It contains a dictionary of sprite images, a position in 2D world space, and a collision box. The selection of the default sprite must be chosen by the inherited constuctor."""
 class TextBox(GameObject):
+	__slots__ = ("align_bottom_left", "original_x", "original_y", "text", "color", "font", \
+			"text_surface_cache", "rendered_text", "rendered_color")
+	
 	def __init__(self, object_id, tag, position_x, position_y, text, font, color, \
-			align_bottom_left, collision_box, sprite_images):
+			align_bottom_left, text_surface_cache, collision_box, sprite_images):
 		super(TextBox, self).__init__(object_id, tag, position_x, position_y, collision_box, sprite_images)
 		"""Initialized the game object."""
 		
@@ -29,22 +29,41 @@ class TextBox(GameObject):
 		# The font being used to render the text in the text box.
 		self.font = font
 		
+		# The shared cache of rendered text surfaces.
+		self.text_surface_cache = text_surface_cache
+		
+		# The text and color of the current sprite image. Used to skip rendering when 
+		# neither has changed.
+		self.rendered_text = None
+		self.rendered_color = None
+		
 		self.set_text(self.text)
 
 	def set_text(self, text):
 		self.text = text
 		
+		# Only render the text again if the text or the color has changed.
+		if self.text == self.rendered_text and self.color == self.rendered_color:
+			return
+			
+		self.rendered_text = self.text
+		self.rendered_color = self.color
+		
 		# The current sprite image object being used for rendering.
-		self.cur_sprite_image = SpriteImage(1, self.font.render(self.text, True, self.color))
+		self.cur_sprite_image = SpriteImage(1, self.text_surface_cache.render( \
+				self.font, self.text, self.color))
 
 		if self.align_bottom_left:
-			self.image_rect.centerx = self.original_x
-			self.image_rect.centery = self.original_y
-			self.position_x = self.image_rect.right
-			self.position_y = self.image_rect.bottom
-			self.image_rect.centerx = self.position_x
-			self.image_rect.centery = self.position_y
-
+			# The image rect of the rendered text.
+			image_rect = self.cur_sprite_image.image_rect
+			
+			image_rect.centerx = self.original_x
+			image_rect.centery = self.original_y
+			self.position_x = image_rect.right
+			self.position_y = image_rect.bottom
+			image_rect.centerx = self.position_x
+			image_rect.centery = self.position_y
+			
 	def get_text(self):
 		return self.text
 		
\ No newline at end of file
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+"""The text surface cache. Keeps the most recently rendered text surfaces so that the same text is only rendered once by the font. Shared by the text boxes and the buttons."""
+class TextSurfaceCache():
+	def __init__(self, max_size):
+		"""Initialized the text surface cache."""
+
+		# The maximum number of rendered text surfaces kept in the cache.
+		self.max_size = max_size
+
+		# The rendered text surfaces. The keys are tuples of the font, the text and the
+		# color. The least recently used surface is at the front.
+		self.surfaces = OrderedDict()
+
+		# The number of renders that were found in the cache.
+		self.hit_count = 0
+
+		# The number of renders that had to be rendered by the font.
+		self.miss_count = 0
+
+	def render(self, font, text, color):
+		"""Returns the surface of the text rendered with the font and color."""
+
+		# The key of the rendered text surface.
+		key = (font, text, color)
+
+		surface = self.surfaces.get(key)
+
+		if surface is not None:
+			self.surfaces.move_to_end(key)
+			self.hit_count += 1
+			return surface
+
+		surface = font.render(text, True, color)
+		self.surfaces[key] = surface
+		self.miss_count += 1
+
+		# Drop the least recently used surface if the cache is full.
+		if len(self.surfaces) > self.max_size:
+			self.surfaces.popitem(last=False)
+
+		return surface
+
+	def clear(self):
+		"""Removes every rendered text surface from the cache."""
+		self.surfaces.clear()